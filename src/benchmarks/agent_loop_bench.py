@@ -0,0 +1,124 @@
+"""
+Measures the time ToolAgent.run spends in our own code, with a zero-latency fake LLM standing in for OpenAI.
+"""
+import copy
+import json
+import os
+import random
+import tempfile
+from openai.types.chat import ChatCompletion
+
+import tools
+from benchmarks.bench_utils import measure
+from core.cost_helper import num_tokens_from_message
+from core.file_based_bank_account import FileBasedBankAccount
+from core.file_based_context import FileBasedContext
+from core.joe_types import ObjectConfig, TextConfig
+from core.openai_stub_server import make_chat_completion
+from core.tool_agent import ToolAgent
+from core.tool_registry import ToolRegistry
+
+MODEL = "gpt-4-1106-preview"
+AGENT_KEY = "task_agent"
+WORDS = "agent tool memory kanban context token budget search file shell graph vector query result".split()
+
+
+class ZeroLatencyTransport:
+    """Answers every completion instantly: one asteval tool call, then a final message."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create_chat_completion(self, model, messages, fallback_models=None, **kwargs):
+        self.calls += 1
+        if messages[-1].get("role") == "tool":
+            payload = make_chat_completion(model, content="done")
+        else:
+            payload = make_chat_completion(model, tool_calls=[{"name": "asteval", "arguments": {"expression": "6 * 7"}}])
+        return ChatCompletion.model_validate(payload), model
+
+
+def synthetic_history(size: int, seed: int = 0) -> list:
+    """Build a history cycling through user, tool-calling assistant, tool, foreign assistant and reply messages."""
+    rng = random.Random(seed)
+
+    def text(words=40):
+        return " ".join(rng.choice(WORDS) for _ in range(words))
+
+    history = []
+    while len(history) < size:
+        call_id = f"call_{len(history)}"
+        history.extend([
+            {"role": "user", "name": "user", "content": text()},
+            {"role": "assistant", "content": None, "tool_calls": [
+                {"id": call_id, "type": "function", "function": {"name": "asteval", "arguments": json.dumps({"expression": "1 + 1"})}}
+            ]},
+            {"tool_call_id": call_id, "role": "tool", "name": "asteval", "content": json.dumps({"result": 2})},
+            {"role": "assistant", "name": "advisor agent!", "content": text()},
+            {"role": "assistant", "content": text()},
+        ])
+    return history[:size]
+
+
+def make_agent(folder: str, agent_id: str) -> ToolAgent:
+    text_config = TextConfig(
+        agent_key=AGENT_KEY,
+        model=MODEL,
+        available_functions=["asteval"],
+        system_message="You are a benchmark agent.",
+        kwargs={},
+    )
+    object_config = ObjectConfig(
+        agent_id=agent_id,
+        agent_service=FileBasedContext(agent_id=agent_id, folder=os.path.join(folder, "context")),
+        bank_account=FileBasedBankAccount(account_id="bench", folder=os.path.join(folder, "bank_account")),
+        chroma_db_collection=None,
+        kanban_board=None,
+        neo4j=None,
+    )
+    return ToolAgent(text_config, object_config, transport=ZeroLatencyTransport())
+
+
+def run_benchmarks(sizes, repeat):
+    results = []
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)  # ToolAgent writes its request logs relative to the working directory
+        try:
+            for size in sizes:
+                history = synthetic_history(size)
+                agent = make_agent(tmp_dir, f"bench_{size}")
+                context = agent.agent_service
+                builder = agent.message_stack_builder
+                handler = agent.function_call_handler
+                asteval_tool = ToolRegistry.functions["asteval"]
+                context_path = f"{context.folder}/{context.agent_id}_context_memory.json"
+
+                def reset_context():
+                    with open(context_path, "w") as file:
+                        json.dump(history, file, indent=2)
+
+                context.update_context_memory()  # Creates the context folder
+                reset_context()
+                stack = builder.build_message_stack()
+                reset_context()
+                kwargs = {"tools": handler.get_available_fn_defn()}
+
+                phases = {
+                    "context_read": (lambda: context.update_context_memory(), None),
+                    "context_append": (lambda: context.update_context_memory([{"role": "user", "content": "x"}]), reset_context),
+                    "tokenize": (lambda: [num_tokens_from_message(m, MODEL) for m in history], None),
+                    "clean_message_names": (builder.clean_message_names, lambda: copy.deepcopy(history)),
+                    "flip_roles": (builder.flip_foreign_assistant_roles, lambda: copy.deepcopy(history)),
+                    "build_message_stack": (lambda: builder.build_message_stack(), reset_context),
+                    "schema_validation": (lambda: asteval_tool.validate_args({"expression": "1 + 1"}, handler), None),
+                    "request_logging": (lambda: agent.log_completion_request(stack, kwargs), None),
+                    "bank_read": (lambda: agent.bank_account.get_balance(), None),
+                    "agent_run": (lambda: agent.run(), reset_context),
+                }
+
+                for phase, (fn, setup) in phases.items():
+                    results.append({"benchmark": "agent_loop", "size": size, "phase": phase, **measure(fn, repeat, setup)})
+        finally:
+            os.chdir(original_cwd)
+    return results
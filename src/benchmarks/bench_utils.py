@@ -0,0 +1,35 @@
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Optional
+
+
+def measure(fn: Callable, repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """
+    Time fn over `repeat` runs and measure its peak allocations in one extra traced run.
+
+    If setup is given it runs untimed before every call; when it returns a value, that value is passed to fn.
+    """
+    def call():
+        state = setup() if setup else None
+        start_time = time.perf_counter()
+        fn() if state is None else fn(state)
+        return time.perf_counter() - start_time
+
+    call()  # Warm up caches (tokenizer, imports, file system) outside the measurement.
+    timings = [call() for _ in range(repeat)]
+
+    state = setup() if setup else None
+    tracemalloc.start()
+    try:
+        fn() if state is None else fn(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "min_ms": min(timings) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "mean_ms": statistics.mean(timings) * 1000,
+        "peak_kib": peak / 1024,
+    }
@@ -0,0 +1,60 @@
+"""
+Measures agent startup cost from the tool registry: each phase runs in a fresh interpreter, since what it times is
+module imports. "eager_import" imports every tool module, as tools/__init__.py used to.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each script prints the peak RSS of its interpreter in KiB once done
+PEAK_RSS = "import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+PHASES = {
+    "import_tools": "import tools",
+    "agent_tool_definitions": """
+import json, tools
+from types import SimpleNamespace
+from core.function_call_handler import FunctionCallHandler
+functions = json.load(open("agent_config.json"))["task_agent"]["available_functions"]
+handler = FunctionCallHandler("task_agent", SimpleNamespace(available_functions=functions),
+                              SimpleNamespace(agent_service=None, agent_id="bench"))
+assert len(handler.get_available_fn_defn()) == len(functions)
+""",
+    "eager_import": """
+import importlib, os
+for name in sorted(os.listdir("tools")):
+    if name.endswith(".py") and name != "__init__.py":
+        importlib.import_module("tools." + name[:-3])
+""",
+}
+
+
+def time_script(script: str) -> tuple:
+    """(wall seconds, peak RSS KiB) of running script in a new interpreter from src/."""
+    wrapper = f"import time\n_start = time.perf_counter()\n{script}\nprint(time.perf_counter() - _start)\n{PEAK_RSS}"
+    output = subprocess.run([sys.executable, "-c", wrapper], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    seconds, peak_kib = output.stdout.split()[-2:]
+    return float(seconds), float(peak_kib)
+
+
+def run_benchmarks(sizes, repeat):
+    tool_count = len(json.load(open(os.path.join(SRC_DIR, "tools", "manifest.json")))["modules"])
+    results = []
+    for phase, script in PHASES.items():
+        time_script(script)  # Warm up the file system cache and bytecode outside the measurement
+        runs = [time_script(script) for _ in range(repeat)]
+        timings = [seconds for seconds, _ in runs]
+        results.append({
+            "benchmark": "startup",
+            "size": tool_count,
+            "phase": phase,
+            "min_ms": min(timings) * 1000,
+            "median_ms": statistics.median(timings) * 1000,
+            "mean_ms": statistics.mean(timings) * 1000,
+            "peak_kib": max(peak for _, peak in runs),
+        })
+    return results
@@ -0,0 +1,225 @@
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from core.agent_wakeup import AgentWakeup
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class AgentState:
+    """Scheduling state for one agent: priority, budget, error and idle backoff, and throughput counters."""
+
+    def __init__(self, agent, priority: int = 1, budget: Optional[Decimal] = None, wakeup: Optional[AgentWakeup] = None):
+        self.agent = agent
+        self.wakeup = wakeup
+        # True while waiting out an idle delay, which a wakeup event may cut short (error backoff may not).
+        self.idle = False
+        self.priority = max(int(priority), 1)
+        self.budget = Decimal(str(budget)) if budget is not None else None
+        self.credits = self.priority
+        self.next_turn_at = 0.0
+        self.consecutive_errors = 0
+        self.turns = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.retired_reason: Optional[str] = None
+
+    @property
+    def agent_key(self) -> str:
+        return self.agent.agent_key
+
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.agent.spent >= self.budget
+
+    def is_due(self, now: float) -> bool:
+        return self.next_turn_at <= now or (self.idle and self.wakeup is not None and self.wakeup.is_set())
+
+
+class AgentScheduler:
+    """
+    Runs turns for several agents on a thread pool. Each round an agent gets `priority` turns, handed out
+    round-robin so no agent starves. Failed turns back off exponentially per agent, and an agent is retired
+    after `max_consecutive_errors` failures in a row or when it exceeds its budget. Agents added with an
+    AgentWakeup back off while idle and are woken early by events. Everything stops when the shared bank
+    account is empty or no agents remain.
+    """
+
+    def __init__(
+        self,
+        bank_account,
+        run_turn: Callable[[Any], Optional[Dict[str, Any]]],
+        max_concurrency: int = 1,
+        turn_delay: float = 0.2,
+        max_consecutive_errors: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        report_interval: float = 300.0,
+    ):
+        self.bank_account = bank_account
+        self.run_turn = run_turn
+        self.max_concurrency = max(max_concurrency, 1)
+        self.turn_delay = turn_delay
+        self.max_consecutive_errors = max_consecutive_errors
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.report_interval = report_interval
+        self.states: List[AgentState] = []
+        self._cursor = 0
+        self._stop = threading.Event()
+        # Set whenever something may have changed: a turn finished, an agent was notified or stop() was called.
+        self._wake = threading.Event()
+        self._started_at = time.monotonic()
+
+    def add_agent(self, agent, priority: int = 1, budget: Optional[Decimal] = None, wakeup: Optional[AgentWakeup] = None) -> AgentState:
+        if wakeup is not None:
+            wakeup.on_notify = self._wake.set
+        state = AgentState(agent, priority, budget, wakeup)
+        self.states.append(state)
+        return state
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _active_states(self) -> List[AgentState]:
+        return [state for state in self.states if state.retired_reason is None]
+
+    def _next_ready(self, running: List[AgentState], slots: int) -> List[AgentState]:
+        """Pick up to `slots` agents in round-robin order, starting a new round when all credits are spent."""
+        now = time.monotonic()
+        active = self._active_states()
+        eligible = [state for state in active if state not in running and state.is_due(now)]
+        if eligible and not any(state.credits > 0 for state in eligible):
+            for state in active:
+                state.credits = state.priority
+
+        ready = []
+        for offset in range(len(self.states)):
+            if len(ready) >= slots:
+                break
+            state = self.states[(self._cursor + offset) % len(self.states)]
+            if state.retired_reason is None and state not in running and state.credits > 0 and state.is_due(now):
+                ready.append(state)
+
+        if ready:
+            self._cursor = (self.states.index(ready[-1]) + 1) % len(self.states)
+        return ready
+
+    def _execute(self, state: AgentState) -> Optional[Dict[str, Any]]:
+        if state.wakeup is not None:
+            reasons = state.wakeup.consume()
+            if reasons and state.idle:
+                logger.info(f"Agent {state.agent_key} woken by: {', '.join(reasons)}")
+        state.idle = False
+        try:
+            return self.run_turn(state.agent)
+        except Exception as e:
+            traceback.print_exc()
+            logger.error(f"Error in agent {state.agent_key}: {e}")
+            return None
+
+    def _finish_turn(self, state: AgentState, result: Optional[Dict[str, Any]], duration: float):
+        state.turns += 1
+        state.busy_seconds += duration
+        now = time.monotonic()
+
+        if result:
+            state.consecutive_errors = 0
+            delay = self.turn_delay
+            if state.wakeup is not None:
+                delay = state.wakeup.record_turn(bool(result.get("tool_execution_log")), self.turn_delay)
+                state.idle = True
+            state.next_turn_at = now + delay
+        else:
+            state.errors += 1
+            state.consecutive_errors += 1
+            backoff = min(self.backoff_max, self.backoff_base * (2 ** (state.consecutive_errors - 1)))
+            state.next_turn_at = now + backoff
+            logger.warning(f"Agent {state.agent_key} returned no output ({state.consecutive_errors} in a row), backing off {backoff:.1f}s")
+            if state.consecutive_errors >= self.max_consecutive_errors:
+                state.retired_reason = "max sequential errors reached"
+
+        if state.retired_reason is None and state.over_budget():
+            state.retired_reason = f"budget of ${state.budget} spent"
+
+        if state.retired_reason:
+            logger.warning(f"Retiring agent {state.agent_key}: {state.retired_reason}")
+
+    def run(self):
+        """Schedule turns until the bank account is empty, every agent is retired or stop() is called."""
+        self._started_at = time.monotonic()
+        last_report = self._started_at
+        running: Dict[Any, AgentState] = {}
+        started: Dict[Any, float] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="agent") as executor:
+            while not self._stop.is_set():
+                if not running and not self._active_states():
+                    logger.info("No active agents left, stopping scheduler.")
+                    break
+
+                if self.bank_account.get_balance() <= 0:
+                    logger.info("Bank account balance depleted, stopping scheduler.")
+                    break
+
+                for state in self._next_ready(list(running.values()), self.max_concurrency - len(running)):
+                    state.credits -= 1
+                    future = executor.submit(self._execute, state)
+                    running[future] = state
+                    started[future] = time.monotonic()
+                    future.add_done_callback(lambda _: self._wake.set())
+
+                # Sleep until a turn finishes, an agent is notified, or the next agent comes off its delay or backoff.
+                # Everything is re-checked after waking, so a set() racing with clear() is never lost.
+                waiting = [s.next_turn_at for s in self._active_states() if s not in running.values()]
+                timeout = max(min(waiting) - time.monotonic(), 0.01) if waiting else None
+                self._wake.wait(timeout)
+                self._wake.clear()
+
+                for future in [f for f in running if f.done()]:
+                    state = running.pop(future)
+                    self._finish_turn(state, future.result(), time.monotonic() - started.pop(future))
+
+                if time.monotonic() - last_report >= self.report_interval:
+                    self.log_report()
+                    last_report = time.monotonic()
+
+            # Let in-flight turns finish so their results and spending are accounted for.
+            for future in list(running):
+                self._finish_turn(running.pop(future), future.result(), time.monotonic() - started.pop(future))
+
+        self.log_report()
+        return self.report()
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Throughput and spending per agent since run() started."""
+        elapsed_minutes = max(time.monotonic() - self._started_at, 1e-9) / 60
+        return [
+            {
+                "agent": state.agent_key,
+                "priority": state.priority,
+                "turns": state.turns,
+                "errors": state.errors,
+                "turns_per_minute": state.turns / elapsed_minutes,
+                "busy_seconds": state.busy_seconds,
+                "spent": str(state.agent.spent),
+                "retired": state.retired_reason,
+            }
+            for state in self.states
+        ]
+
+    def log_report(self):
+        total_turns = sum(state.turns for state in self.states)
+        elapsed_minutes = max(time.monotonic() - self._started_at, 1e-9) / 60
+        logger.info(f"Scheduler throughput: {total_turns} turns, {total_turns / elapsed_minutes:.2f} turns/min")
+        for entry in self.report():
+            logger.info(
+                f"  {entry['agent']}: {entry['turns']} turns ({entry['turns_per_minute']:.2f}/min), "
+                f"{entry['errors']} errors, spent ${entry['spent']}" + (f", retired: {entry['retired']}" if entry["retired"] else "")
+            )
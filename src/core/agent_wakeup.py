@@ -0,0 +1,56 @@
+import logging
+import threading
+from typing import Callable, List, Optional
+
+from core.metrics import AGENT_IDLE_DELAY, AGENT_WAKEUPS
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class AgentWakeup:
+    """
+    Decides how long an agent sleeps between turns. A turn without tool calls means the agent had nothing
+    to do, so its idle delay doubles from idle_base up to idle_max; a productive turn resets it. Any event
+    (kanban change, inbox message, watched file) cuts an idle wait short through notify(). idle_max doubles
+    as the timer, so an agent with no events still wakes at least that often.
+    """
+
+    def __init__(self, agent_key: str, idle_base: float = 5.0, idle_max: float = 300.0, on_notify: Optional[Callable[[], None]] = None):
+        self.agent_key = agent_key
+        self.idle_base = idle_base
+        self.idle_max = max(idle_max, idle_base)
+        self.on_notify = on_notify
+        self.idle_delay = 0.0
+        self._event = threading.Event()
+        self._reasons: List[str] = []
+        self._lock = threading.Lock()
+
+    def notify(self, reason: str):
+        with self._lock:
+            if reason not in self._reasons:
+                self._reasons.append(reason)
+            self._event.set()
+        AGENT_WAKEUPS.inc(agent=self.agent_key, reason=reason)
+        if self.on_notify:
+            self.on_notify()
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def consume(self) -> List[str]:
+        """Clear pending events at the start of a turn and return what caused them."""
+        with self._lock:
+            reasons, self._reasons = self._reasons, []
+            self._event.clear()
+        return reasons
+
+    def record_turn(self, made_tool_calls: bool, turn_delay: float) -> float:
+        """Update the idle backoff after a turn and return how long to wait before the next one."""
+        if made_tool_calls:
+            self.idle_delay = 0.0
+        else:
+            self.idle_delay = min(self.idle_max, self.idle_delay * 2 if self.idle_delay else self.idle_base)
+            logger.info(f"Agent {self.agent_key} was idle, sleeping up to {self.idle_delay:.1f}s or until an event arrives")
+        AGENT_IDLE_DELAY.set(self.idle_delay, agent=self.agent_key)
+        return max(turn_delay, self.idle_delay)
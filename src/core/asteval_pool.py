@@ -0,0 +1,223 @@
+import atexit
+import io
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MAX_LIST_ITEMS = 10000  # Larger arrays and sequences are returned as their repr
+
+
+class AstevalTimeout(Exception):
+    pass
+
+
+def to_jsonable(value: Any, depth: int = 0) -> Any:
+    """Convert a result to something json.dumps accepts, falling back to repr() for anything else."""
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return value if value == value and value not in (float("inf"), float("-inf")) else repr(value)
+    if depth < 8:
+        if hasattr(value, "tolist") and getattr(value, "size", 0) <= MAX_LIST_ITEMS:
+            # numpy arrays and scalars
+            return to_jsonable(value.tolist(), depth + 1)
+        if isinstance(value, (list, tuple, set, frozenset)) and len(value) <= MAX_LIST_ITEMS:
+            return [to_jsonable(item, depth + 1) for item in value]
+        if isinstance(value, dict) and len(value) <= MAX_LIST_ITEMS:
+            return {str(key): to_jsonable(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, complex):
+        return repr(value)
+    return {"repr": repr(value)[:MAX_LIST_ITEMS]}
+
+
+def _vm_size() -> int:
+    """Current virtual memory size of this process, in bytes."""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmSize:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+class _Session:
+    """A pre-built interpreter and a snapshot of its pristine symbol table."""
+
+    def __init__(self, use_numpy: bool):
+        from asteval import Interpreter
+
+        self.output = io.StringIO()
+        self.interpreter = Interpreter(use_numpy=use_numpy, writer=self.output, err_writer=self.output)
+        self.snapshot = dict(self.interpreter.symtable)
+
+    def reset(self):
+        symtable = self.interpreter.symtable
+        for name in [name for name in symtable if name not in self.snapshot]:
+            del symtable[name]
+        for name, value in self.snapshot.items():
+            if symtable.get(name) is not value:
+                symtable[name] = value
+        self.interpreter.error = []
+        self.output.seek(0)
+        self.output.truncate()
+
+    def evaluate(self, expression: str) -> Dict[str, Any]:
+        try:
+            result = self.interpreter(expression)
+            errors = [error.get_error() for error in self.interpreter.error]
+            output = self.output.getvalue()
+            if errors:
+                name, message = errors[0]
+                if name == "MemoryError":
+                    return {"error": "Memory limit exceeded"}
+                return {"error": message.strip().splitlines()[-1] if message.strip() else name}
+            response = {"result": to_jsonable(result)}
+            if output and not output.isspace():
+                response["output"] = output[-MAX_LIST_ITEMS:]
+            return response
+        finally:
+            self.reset()
+
+
+def _worker_main(connection, default_memory_limit: Optional[int]):
+    """Worker process loop: evaluate requests with the memory limit set as an address space rlimit."""
+    # Keep BLAS from spawning threads that each reserve address space
+    os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+    sessions = {False: _Session(use_numpy=False)}
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        use_numpy = request["use_numpy"]
+        if use_numpy not in sessions:
+            sessions[use_numpy] = _Session(use_numpy=use_numpy)
+
+        memory_limit = request.get("memory_limit") or default_memory_limit
+        if memory_limit:
+            # Allow the current footprint plus the limit for this call
+            limit = _vm_size() + memory_limit
+            resource.setrlimit(resource.RLIMIT_AS, (limit if hard_limit == resource.RLIM_INFINITY else min(limit, hard_limit), hard_limit))
+        try:
+            response = sessions[use_numpy].evaluate(request["expression"])
+        except MemoryError:
+            response = {"error": "Memory limit exceeded"}
+        except Exception as e:
+            response = {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            if memory_limit:
+                resource.setrlimit(resource.RLIMIT_AS, (hard_limit, hard_limit))
+
+        try:
+            connection.send(json.dumps(response))
+        except (TypeError, ValueError) as e:
+            connection.send(json.dumps({"error": f"Result could not be serialized: {e}"}))
+
+
+class _Worker:
+    def __init__(self, context, memory_limit: Optional[int]):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_connection, memory_limit), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class AstevalPool:
+    """
+    A pool of worker processes, each holding pre-built asteval interpreters that are reset after every use.
+    Every evaluation runs under a wall-clock timeout and an address space limit. A worker that times out
+    is killed and replaced, so a runaway expression never stalls the caller. Workers are forked from a
+    forkserver with asteval preloaded, which keeps replacing them cheap.
+    """
+
+    def __init__(self, size: int = 2, timeout: float = 5.0, memory_limit_mb: Optional[int] = 512):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_forkserver_preload(["asteval", "core.asteval_pool"])
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The asteval pool is closed")
+            if self._idle.empty() and len(self._workers) < self.size:
+                worker = _Worker(self._context, self.memory_limit)
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def _replace(self, worker: _Worker):
+        """Kill a stuck or dead worker and hand a fresh one to the next caller."""
+        worker.kill()
+        with self._lock:
+            self._workers.remove(worker)
+            if self._closed:
+                return
+            replacement = _Worker(self._context, self.memory_limit)
+            self._workers.append(replacement)
+        self._idle.put(replacement)
+
+    def evaluate(self, expression: str, use_numpy: bool = False, timeout: Optional[float] = None, memory_limit_mb: Optional[int] = None) -> Dict[str, Any]:
+        timeout = timeout or self.timeout
+        worker = self._acquire()
+        try:
+            worker.connection.send({
+                "expression": expression,
+                "use_numpy": use_numpy,
+                "memory_limit": memory_limit_mb * 1024 * 1024 if memory_limit_mb else None,
+            })
+            if not worker.connection.poll(timeout):
+                raise AstevalTimeout(f"Evaluation timed out after {timeout}s")
+            response = json.loads(worker.connection.recv())
+        except (AstevalTimeout, EOFError, OSError) as e:
+            self._replace(worker)
+            if isinstance(e, AstevalTimeout):
+                return {"error": str(e)}
+            return {"error": "Evaluation failed, the worker process died (out of memory?)"}
+
+        self._idle.put(worker)
+        return response
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.kill()
+
+
+_pool: Optional[AstevalPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_asteval_pool() -> AstevalPool:
+    """The shared pool, created on first use. Size and limits come from ASTEVAL_POOL_SIZE, ASTEVAL_TIMEOUT and ASTEVAL_MEMORY_MB."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AstevalPool(
+                size=int(os.getenv("ASTEVAL_POOL_SIZE", "2")),
+                timeout=float(os.getenv("ASTEVAL_TIMEOUT", "5")),
+                memory_limit_mb=int(os.getenv("ASTEVAL_MEMORY_MB", "512")),
+            )
+            atexit.register(_pool.close)
+        return _pool
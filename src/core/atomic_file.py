@@ -0,0 +1,82 @@
+import contextlib
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from typing import BinaryIO, Callable, Dict, Tuple
+
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_lock = threading.Lock()
+
+
+def path_lock(path: str) -> threading.Lock:
+    """A lock per file, so read-modify-write updates from different threads don't lose each other's changes."""
+    key = os.path.realpath(path)
+    with _path_locks_lock:
+        return _path_locks.setdefault(key, threading.Lock())
+
+
+def _default_mode() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def atomic_write(path: str, write: Callable[[BinaryIO], None]) -> Tuple[int, str]:
+    """
+    Write a file through a temp file in the same directory, fsync it and os.replace() it into place, so
+    readers see either the old or the new file and never a torn one. write(file) produces the contents.
+    The file keeps its permissions. Returns the new size and sha256.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = _default_mode()
+
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+
+    # Persist the rename itself
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    return file_digest(path)
+
+
+def atomic_write_bytes(path: str, data: bytes) -> Tuple[int, str]:
+    return atomic_write(path, lambda file: file.write(data))
+
+
+def atomic_append(path: str, data: bytes) -> Tuple[int, str]:
+    """Append by copying the current file into the temp file first, without loading it into memory."""
+    def write(file: BinaryIO):
+        with contextlib.suppress(FileNotFoundError), open(path, "rb") as existing:
+            shutil.copyfileobj(existing, file, 1024 * 1024)
+        file.write(data)
+    return atomic_write(path, write)
+
+
+def file_digest(path: str) -> Tuple[int, str]:
+    """Size and sha256 hex digest of a file."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
@@ -0,0 +1,180 @@
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.idgen import generate_id
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class Job:
+    """A detached shell command whose stdout and stderr are spooled to files."""
+
+    def __init__(self, job_id: str, agent_id: str, command: str, spool_dir: str, timeout: Optional[float]):
+        self.job_id = job_id
+        self.agent_id = agent_id
+        self.command = command
+        self.spool_dir = spool_dir
+        self.stdout_path = os.path.join(spool_dir, "stdout")
+        self.stderr_path = os.path.join(spool_dir, "stderr")
+        self.timeout = timeout
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.exit_code: Optional[int] = None
+        self.state = "running"
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def runtime(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def summary(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "command": self.command,
+            "state": self.state,
+            "exit_code": self.exit_code,
+            "runtime": f"{self.runtime:.2f}s",
+            "stdout_bytes": _size(self.stdout_path),
+            "stderr_bytes": _size(self.stderr_path),
+        }
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def read_spool(path: str, cursor: int, max_bytes: int) -> Tuple[str, int]:
+    """
+    Read up to max_bytes of a spool file from a byte cursor. Returns the text and the cursor to continue from,
+    which stops before a UTF-8 character split by the read so the next call picks it up whole.
+    """
+    try:
+        with open(path, "rb") as file:
+            file.seek(cursor)
+            data = file.read(max_bytes)
+    except FileNotFoundError:
+        return "", cursor
+
+    try:
+        text = data.decode()
+    except UnicodeDecodeError as e:
+        if e.reason == "unexpected end of data" and len(data) - e.start < 4:
+            data = data[:e.start]
+        text = data.decode(errors="replace")
+    return text, cursor + len(data)
+
+
+class JobManager:
+    """
+    Runs shell commands in the background, each in its own process group with output spooled under
+    spool_dir/<job_id>. Jobs belong to the agent that started them. A waiter thread per job records the exit
+    code, enforces the timeout and calls on_finish. Finished jobs are forgotten after `retention` seconds.
+    """
+
+    def __init__(self, spool_dir: str = "tmp/jobs", max_running_per_agent: int = 8, retention: float = 24 * 3600):
+        self.spool_dir = spool_dir
+        self.max_running_per_agent = max_running_per_agent
+        self.retention = retention
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def start(self, command: str, agent_id: str, timeout: Optional[float] = None, on_finish: Optional[Callable[[Job], None]] = None) -> Job:
+        self.cleanup()
+        if len([job for job in self.list(agent_id) if job.state == "running"]) >= self.max_running_per_agent:
+            raise RuntimeError(f"Too many running jobs, the limit is {self.max_running_per_agent}. Cancel or wait for one first.")
+
+        job_id = generate_id(8)
+        job = Job(job_id, agent_id, command, os.path.join(self.spool_dir, job_id), timeout)
+        os.makedirs(job.spool_dir, exist_ok=True)
+        with open(job.stdout_path, "wb") as stdout, open(job.stderr_path, "wb") as stderr:
+            job.process = subprocess.Popen(
+                command,
+                shell=True,
+                stdin=subprocess.DEVNULL,
+                stdout=stdout,
+                stderr=stderr,
+                start_new_session=True,
+            )
+
+        with self._lock:
+            self.jobs[job_id] = job
+        threading.Thread(target=self._wait, args=(job, on_finish), name=f"job-{job_id}", daemon=True).start()
+        logger.info(f"Started job {job_id} for {agent_id}: {command}")
+        return job
+
+    def _wait(self, job: Job, on_finish: Optional[Callable[[Job], None]]):
+        try:
+            job.process.wait(timeout=job.timeout)
+        except subprocess.TimeoutExpired:
+            job.state = "timed_out"
+            self._kill(job)
+
+        job.exit_code = job.process.returncode
+        job.finished_at = time.time()
+        if job.state == "running":
+            job.state = "exited"
+        logger.info(f"Job {job.job_id} {job.state} with exit code {job.exit_code} after {job.runtime:.1f}s")
+
+        if on_finish:
+            try:
+                on_finish(job)
+            except Exception as e:
+                logger.error(f"Completion callback for job {job.job_id} failed: {e}")
+
+    @staticmethod
+    def _kill(job: Job, grace_period: float = 2):
+        """SIGTERM the job's process group, then SIGKILL whatever outlived the grace period."""
+        try:
+            os.killpg(job.process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        try:
+            job.process.wait(timeout=grace_period)
+        except subprocess.TimeoutExpired:
+            pass
+        try:
+            os.killpg(job.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def get(self, job_id: str, agent_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None or job.agent_id != agent_id:
+            raise ValueError(f"No job with id {job_id}")
+        return job
+
+    def list(self, agent_id: str) -> List[Job]:
+        with self._lock:
+            return [job for job in self.jobs.values() if job.agent_id == agent_id]
+
+    def cancel(self, job_id: str, agent_id: str) -> Job:
+        job = self.get(job_id, agent_id)
+        if job.state == "running":
+            job.state = "cancelled"
+            self._kill(job)
+            job.exit_code = job.process.wait()
+        return job
+
+    def cleanup(self):
+        """Forget finished jobs older than the retention period and delete their spool files."""
+        cutoff = time.time() - self.retention
+        with self._lock:
+            expired = [job for job in self.jobs.values() if job.finished_at and job.finished_at < cutoff]
+            for job in expired:
+                del self.jobs[job.job_id]
+        for job in expired:
+            shutil.rmtree(job.spool_dir, ignore_errors=True)
+
+
+# Shared by the bash_start, bash_poll and bash_cancel tools.
+job_manager = JobManager()
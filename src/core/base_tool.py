@@ -1,7 +1,12 @@
+from typing import Optional
 from jsonschema import ValidationError, validate
 from core.tool_agent import ToolAgent
+from core.tool_scheduler import EXCLUSIVE, ResourceKeys
 
 class BaseTool:
+    # Backends the tool uses (main.py names them: "chroma", "neo4j", "context_archive"), warmed up at startup when enabled
+    backends = ()
+
     @classmethod
     def get_name(cls) -> str:
         """Override this method to return the name of the function"""
@@ -17,6 +22,22 @@ class BaseTool:
         """Override this method to run the actual function"""
         raise NotImplementedError("This method should be overridden by subclass")
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        """
+        Override this method to return the resources a call reads and writes (see core.tool_scheduler), so calls
+        that do not conflict can run in parallel. By default a call conflicts with every call that touches a resource.
+        """
+        return EXCLUSIVE
+
+    @classmethod
+    def get_timeout(cls, args: dict, agent_self: ToolAgent) -> Optional[float]:
+        """
+        Override this method to return how many seconds a call may run before it is abandoned, for tools that take
+        longer than the default. None uses the agent's configured default.
+        """
+        return None
+
     @classmethod
     def validate_args(cls, args: dict, agent_self: ToolAgent) -> str:
         """Validate arguments based on the function's definition"""
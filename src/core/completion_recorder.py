@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List
+
+# Lines of the system message that change on every turn (see main.py) and must not affect the request key.
+VOLATILE_LINE_PATTERNS = [
+    re.compile(r"^Current Time: .*$", re.MULTILINE),
+    re.compile(r"^Current Account Balance: .*$", re.MULTILINE),
+]
+
+# Request parameters that do not change the response.
+IGNORED_REQUEST_KEYS = {"timeout", "stream_options", "user"}
+
+
+def normalize_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize a chat completion request (model, messages and any other create() kwargs) so that requests which
+    would produce the same response compare equal. The request is round-tripped through JSON so a payload
+    seen by the stub server and the kwargs passed to the client normalize identically.
+    """
+    normalized = json.loads(json.dumps(request, default=str))
+    for key in IGNORED_REQUEST_KEYS:
+        normalized.pop(key, None)
+
+    for message in normalized.get("messages", []):
+        if message.get("role") == "system" and isinstance(message.get("content"), str):
+            content = message["content"]
+            for pattern in VOLATILE_LINE_PATTERNS:
+                content = pattern.sub("", content)
+            message["content"] = content.rstrip()
+
+    return normalized
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    normalized = normalize_request(request)
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class CompletionRecorder:
+    """Appends request/response pairs to a JSONL file, keyed by the normalized request hash."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+    def record(self, request: Dict[str, Any], response: Dict[str, Any]):
+        entry = {
+            "key": request_key(request),
+            "request": normalize_request(request),
+            "response": response,
+        }
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            with open(self.file_path, "a", encoding="utf-8") as file:
+                file.write(line)
+
+
+def load_recordings(file_path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Load a recording file into a map of request key to responses, in the order they were recorded."""
+    recordings: Dict[str, List[Dict[str, Any]]] = {}
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                entry = json.loads(line)
+                recordings.setdefault(entry["key"], []).append(entry["response"])
+    return recordings
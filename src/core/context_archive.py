@@ -0,0 +1,201 @@
+import fcntl
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.atomic_file import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+MAX_DOCUMENT_CHARS = 4000  # Text embedded per message group; the archived group itself is kept whole
+INDEX_BATCH_SIZE = 32
+
+
+def group_messages(messages: List[Dict]) -> List[List[Dict]]:
+    """Split messages into groups that belong together: a message followed by the tool responses to its calls."""
+    groups = []
+    for message in messages:
+        if message.get("role") == "tool" and groups:
+            groups[-1].append(message)
+        else:
+            groups.append([message])
+    return groups
+
+
+def render_group(messages: List[Dict]) -> str:
+    """Plain text of a message group, for embedding and keyword search."""
+    lines = []
+    for message in messages:
+        speaker = message.get("role", "")
+        if message.get("name"):
+            speaker += f" ({message['name']})"
+        if message.get("content"):
+            lines.append(f"{speaker}: {message['content']}")
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call.get("function", {})
+            lines.append(f"{speaker} called {function.get('name')}({function.get('arguments', '')})")
+    return "\n".join(lines)
+
+
+class ContextArchive:
+    """
+    Cold storage for messages evicted from an agent's context. Evicted message groups are appended to gzip JSON lines
+    segments, one per agent and day (memory/context_archive/<agent_id>/<YYYY-MM-DD>.jsonl.gz). When a Chroma
+    collection is given, a background thread embeds new groups into it, resuming from a per-segment cursor, so the
+    archive can be searched by meaning; without one, search falls back to keywords.
+    """
+
+    def __init__(self, folder: str, collection: Any = None):
+        self.folder = folder
+        self.collection = collection
+        self._pending = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _agent_folder(self, agent_id: str) -> str:
+        return os.path.join(self.folder, agent_id)
+
+    def segments(self, agent_id: str) -> List[str]:
+        """The agent's archive segments, oldest first."""
+        return sorted(glob.glob(os.path.join(self._agent_folder(agent_id), "*.jsonl.gz")))
+
+    def append(self, agent_id: str, messages: List[Dict]) -> int:
+        """Archive evicted messages, returning how many groups were written."""
+        if not messages:
+            return 0
+        now = datetime.now(timezone.utc)
+        records = []
+        for group in group_messages(messages):
+            text = render_group(group)
+            digest = hashlib.sha256(json.dumps(group, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+            records.append({"id": f"{agent_id}-{digest}", "archived_at": now.isoformat(), "text": text, "messages": group})
+
+        path = os.path.join(self._agent_folder(agent_id), f"{now:%Y-%m-%d}.jsonl.gz")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+        # Every append is its own gzip member; readers see the concatenation as one stream
+        with open(path, "ab") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            file.write(gzip.compress(payload))
+        self._pending.set()
+        return len(records)
+
+    def read_segment(self, path: str) -> List[Dict]:
+        with open(path, "rb") as file:
+            # Shared lock, so a member being appended is never read half written
+            fcntl.flock(file, fcntl.LOCK_SH)
+            with gzip.GzipFile(fileobj=file) as segment:
+                return [json.loads(line) for line in segment.read().decode("utf-8").splitlines() if line]
+
+    def records(self, agent_id: str) -> Iterator[Dict]:
+        """Every archived group of the agent, newest first."""
+        for path in reversed(self.segments(agent_id)):
+            yield from reversed(self.read_segment(path))
+
+    # Indexing
+
+    def _state_path(self, agent_id: str) -> str:
+        return os.path.join(self._agent_folder(agent_id), "index_state.json")
+
+    def _load_state(self, agent_id: str) -> Dict[str, int]:
+        try:
+            with open(self._state_path(agent_id), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def index_pending(self) -> int:
+        """Embed the groups archived since the last call into the collection. Returns how many were indexed."""
+        if self.collection is None:
+            return 0
+        indexed = 0
+        with self._lock:
+            for agent_id in sorted(os.listdir(self.folder)) if os.path.isdir(self.folder) else []:
+                state = self._load_state(agent_id)
+                for path in self.segments(agent_id):
+                    segment = os.path.basename(path)
+                    records = self.read_segment(path)[state.get(segment, 0):]
+                    for start in range(0, len(records), INDEX_BATCH_SIZE):
+                        batch = records[start:start + INDEX_BATCH_SIZE]
+                        self.collection.upsert(
+                            ids=[record["id"] for record in batch],
+                            documents=[record["text"][:MAX_DOCUMENT_CHARS] for record in batch],
+                            metadatas=[{"agent_id": agent_id, "archived_at": record["archived_at"], "segment": segment,
+                                        "messages": len(record["messages"])} for record in batch],
+                        )
+                        state[segment] = state.get(segment, 0) + len(batch)
+                        atomic_write_bytes(self._state_path(agent_id), json.dumps(state).encode("utf-8"))
+                        indexed += len(batch)
+        return indexed
+
+    def start_indexer(self):
+        """Index new groups on a background thread whenever something is archived, starting with any backlog."""
+        if self.collection is None or self._thread is not None:
+            return
+        self._pending.set()
+        self._thread = threading.Thread(target=self._index_loop, name="context-archive-indexer", daemon=True)
+        self._thread.start()
+
+    def stop_indexer(self):
+        self._stopped.set()
+        self._pending.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _index_loop(self):
+        while not self._stopped.is_set():
+            # Wake on new archives, and retry now and then if the collection was unavailable
+            self._pending.wait(timeout=300)
+            self._pending.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                count = self.index_pending()
+                if count:
+                    logger.info(f"Indexed {count} archived context groups")
+            except Exception as e:
+                logger.warning(f"Context archive indexing failed, will retry: {e}")
+
+    # Search
+
+    def search(self, agent_id: str, query: str, n_results: int = 5) -> List[Dict]:
+        """The archived groups most related to `query`: by embedding when indexed, otherwise by keywords."""
+        if self.collection is not None:
+            try:
+                self.index_pending()
+                if self.collection.count() > 0:
+                    return self._semantic_search(agent_id, query, n_results)
+            except Exception as e:
+                logger.warning(f"Semantic context search failed, searching by keyword: {e}")
+        return self._keyword_search(agent_id, query, n_results)
+
+    def _semantic_search(self, agent_id: str, query: str, n_results: int) -> List[Dict]:
+        raw = self.collection.query(query_texts=[query], n_results=n_results, where={"agent_id": agent_id})
+        return [
+            {"id": id, "archived_at": metadata.get("archived_at"), "distance": distance, "text": document}
+            for id, distance, metadata, document in zip(raw["ids"][0], raw["distances"][0], raw["metadatas"][0], raw["documents"][0])
+        ]
+
+    def _keyword_search(self, agent_id: str, query: str, n_results: int) -> List[Dict]:
+        terms = set(re.findall(r"\w+", query.lower()))
+        scored = []
+        for position, record in enumerate(self.records(agent_id)):
+            words = re.findall(r"\w+", record["text"].lower())
+            score = sum(1 for word in words if word in terms)
+            if score:
+                # Newer groups win ties
+                scored.append((-score, position, record))
+        scored.sort(key=lambda item: item[:2])
+        return [
+            {"id": record["id"], "archived_at": record["archived_at"], "matches": -score, "text": record["text"][:MAX_DOCUMENT_CHARS]}
+            for score, _, record in scored[:n_results]
+        ]
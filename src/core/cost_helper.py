@@ -1,4 +1,5 @@
 from decimal import Decimal
+import functools
 import json
 import tiktoken
 from decimal import Decimal
@@ -44,8 +45,14 @@ def calculate_cost(usage: dict, model: str) -> Decimal:
         return Decimal("0.0")
     
 
+@functools.lru_cache(maxsize=None)
+def get_encoding(model="gpt-3.5-turbo") -> tiktoken.Encoding:
+    """The tokenizer for a model, loaded once per model."""
+    return tiktoken.encoding_for_model(model)
+
+
 def num_tokens_from_string(string: str, model="gpt-3.5-turbo") -> int:
-    encoding = tiktoken.encoding_for_model(model)
+    encoding = get_encoding(model)
     return len(encoding.encode(string, disallowed_special=()))
 
 def num_tokens_from_message(message: dict, model="gpt-3.5-turbo") -> int:
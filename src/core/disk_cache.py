@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Optional
+
+from core.atomic_file import atomic_write_bytes
+
+
+class DiskTTLCache:
+    """
+    JSON values cached on disk for `ttl` seconds, one file per key. Keys are any JSON-serializable value,
+    hashed into the filename. Writes are atomic, so concurrent readers and writers are safe.
+    """
+
+    def __init__(self, folder: str, ttl: float):
+        self.folder = folder
+        self.ttl = ttl
+
+    def _path(self, key: Any) -> str:
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+        return os.path.join(self.folder, digest[:2], f"{digest}.json")
+
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self.get_entry(key)
+        if entry is None or entry["expires"] < time.time():
+            return None
+        return entry["value"]
+
+    def get_entry(self, key: Any) -> Optional[dict]:
+        """The stored entry, expired or not, as {"value", "expires"}. Expired entries can still be revalidated."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None):
+        entry = {"value": value, "expires": time.time() + (self.ttl if ttl is None else ttl)}
+        atomic_write_bytes(self._path(key), json.dumps(entry).encode("utf-8"))
+
+    def prune(self) -> int:
+        """Delete expired entries, returning how many were removed."""
+        removed = 0
+        now = time.time()
+        for root, _, files in os.walk(self.folder):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    with open(path, "r", encoding="utf-8") as file:
+                        expired = json.load(file)["expires"] < now
+                except (OSError, ValueError, KeyError):
+                    expired = True
+                if expired:
+                    os.remove(path)
+                    removed += 1
+        return removed
@@ -3,6 +3,7 @@ import json
 import os
 import threading
 from datetime import datetime
+from core.tracing import traced
 
 class FileBasedBankAccount:
     _lock = threading.Lock()
@@ -47,11 +48,13 @@ class FileBasedBankAccount:
         with open(file_path, 'w') as file:
             json.dump(data, file, indent=2)
 
+    @traced("bank.get_balance")
     def get_balance(self) -> Decimal:
         with FileBasedBankAccount._lock:
             account_data = self._read_account_data(self.file_path)
             return account_data["balance"]
 
+    @traced("bank.subtract_balance")
     def subtract_balance(self, amount: Decimal, agent_id: str) -> bool:
         with FileBasedBankAccount._lock:
             account_data = self._read_account_data(self.file_path)
@@ -1,13 +1,18 @@
 import json
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
+from core.context_archive import ContextArchive
+from core.tracing import traced
 
 
 class FileBasedContext:
-    def __init__(self, agent_id: str, folder: str):
+    def __init__(self, agent_id: str, folder: str, archive: Optional[ContextArchive] = None):
         self.folder = folder
         self.agent_id = agent_id
+        # Messages dropped by final_count go to the archive, when there is one, instead of being lost
+        self.archive = archive
 
+    @traced("context.update")
     def update_context_memory(self, memory_elements: List[Dict] = [], final_count: int = 0) -> List[Dict]:
         file_path = f"{self.folder}/{self.agent_id}_context_memory.json"
         context_memory = []
@@ -26,6 +31,8 @@ class FileBasedContext:
 
         # Slice context memory if final_count is provided, we want to keep the most recent messages
         if final_count > 0:
+            if self.archive and final_count < len(context_memory):
+                self.archive.append(self.agent_id, context_memory[:-final_count])
             context_memory = context_memory[-final_count:]
 
         # Write updated context memory back to file
@@ -0,0 +1,51 @@
+import fcntl
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List
+
+
+class FileBasedInbox:
+    """
+    Per-agent queue of messages waiting to be delivered at the start of the agent's next turn.
+    Humans (or other processes) post to it without blocking the agent. Access is serialized with
+    an exclusive file lock so posting from another process is safe.
+    """
+
+    def __init__(self, agent_id: str, folder: str):
+        self.agent_id = agent_id
+        self.file_path = f"{folder}/{agent_id}_inbox.jsonl"
+        os.makedirs(folder, exist_ok=True)
+
+    def post(self, content: str, name: str = "user", role: str = "user"):
+        message = {"role": role, "name": name, "content": content, "posted": datetime.now().isoformat()}
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            file.write(json.dumps(message) + "\n")
+
+    def drain(self) -> List[Dict]:
+        """Return and remove all pending messages, as context messages (role, name, content)."""
+        if not os.path.exists(self.file_path):
+            return []
+        with open(self.file_path, "r+", encoding="utf-8") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            lines = file.readlines()
+            file.seek(0)
+            file.truncate()
+
+        messages = []
+        for line in lines:
+            if line.strip():
+                message = json.loads(line)
+                messages.append({"role": message["role"], "name": message["name"], "content": message["content"]})
+        return messages
+
+
+if __name__ == "__main__":
+    # Post a message for an agent: python -m core.file_based_inbox ta002 "Please look at card 1A2B"
+    if len(sys.argv) != 3:
+        print("Usage: python -m core.file_based_inbox <agent_id> <message>")
+        sys.exit(1)
+    FileBasedInbox(sys.argv[1], "memory/inbox").post(sys.argv[2])
+    print(f"Message posted to {sys.argv[1]}")
@@ -0,0 +1,144 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FileWatcher:
+    """
+    Calls callback(path) from a background thread whenever a file directly inside a watched directory is
+    created, written, moved or deleted. Uses inotify where available and falls back to polling mtimes.
+    """
+
+    def __init__(self, callback: Callable[[str], None], poll_interval: float = 1.0):
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._directories = set()
+        self._libc = _load_inotify()
+        self._fd = -1
+        self._watch_descriptors: Dict[int, str] = {}
+        self._snapshots: Dict[str, Dict[str, Tuple[int, int]]] = {}
+
+        if self._libc:
+            self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if self._fd < 0:
+                logger.warning("inotify unavailable, polling for file changes instead")
+                self._libc = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._libc is not None
+
+    def watch(self, directory: str):
+        directory = os.path.abspath(directory)
+        os.makedirs(directory, exist_ok=True)
+        if directory in self._directories:
+            return
+        self._directories.add(directory)
+
+        if self._libc:
+            wd = self._libc.inotify_add_watch(self._fd, directory.encode(), WATCH_MASK)
+            if wd >= 0:
+                self._watch_descriptors[wd] = directory
+                return
+            logger.warning(f"inotify_add_watch failed for {directory} (errno {ctypes.get_errno()}), polling it instead")
+        self._snapshots[directory] = self._snapshot(directory)
+
+    def start(self) -> "FileWatcher":
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    @staticmethod
+    def _snapshot(directory: str) -> Dict[str, Tuple[int, int]]:
+        try:
+            return {
+                entry.path: (entry.stat().st_mtime_ns, entry.stat().st_size)
+                for entry in os.scandir(directory)
+                if entry.is_file()
+            }
+        except FileNotFoundError:
+            return {}
+
+    def _notify(self, path: str):
+        try:
+            self.callback(path)
+        except Exception as e:
+            logger.error(f"File watcher callback failed for {path}: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._libc and self._watch_descriptors:
+                readable, _, _ = select.select([self._fd], [], [], self.poll_interval)
+                if readable:
+                    self._read_inotify_events()
+            else:
+                self._stop.wait(self.poll_interval)
+
+            for directory, previous in list(self._snapshots.items()):
+                current = self._snapshot(directory)
+                for path in set(previous) | set(current):
+                    if previous.get(path) != current.get(path):
+                        self._notify(path)
+                self._snapshots[directory] = current
+
+    def _read_inotify_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        changed = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b"\0").decode(errors="replace")
+            offset += name_length
+            directory = self._watch_descriptors.get(wd)
+            if directory and name:
+                path = os.path.join(directory, name)
+                if path not in changed:
+                    changed.append(path)
+
+        for path in changed:
+            self._notify(path)
@@ -1,14 +1,31 @@
 import json
 import concurrent.futures
 import logging
+import time
 import traceback
 from threading import Lock
 
+from core.metrics import TOOL_CALL_LATENCY, TOOL_CALLS, TOOL_OUTPUT_TRUNCATIONS, TOOL_TIMEOUTS
+from core.output_budget import apply_budget, budget_for, spill_path_for
 from core.tool_registry import ToolRegistry
+from core.tool_scheduler import (
+    DEFAULT_TURN_TIMEOUT, EXCLUSIVE, NO_RESOURCES, build_dependencies, run_detached, timeout_for
+)
+from core.tracing import tracer
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+def is_error_response(response) -> bool:
+    """Tools report failures as a JSON object with an "error" key."""
+    if not isinstance(response, str) or not response.lstrip().startswith("{"):
+        return False
+    try:
+        return "error" in json.loads(response)
+    except ValueError:
+        return False
+
+
 class FunctionCallHandler:
     def __init__(self, agent_key, text_config, object_config):
         self.agent_key = agent_key
@@ -25,6 +42,7 @@ class FunctionCallHandler:
         }
         self.log_lock = Lock()
         self.execution_log = []
+        self.abandoned_calls = set()  # Ids of calls answered with a timeout error, whose late results are dropped
 
     def get_available_fn_defn(self):
         # If the list is empty, return None to avoid an error
@@ -73,8 +91,20 @@ class FunctionCallHandler:
             return json.dumps({"error": f"Function {function_name} not found!"})
         else:
             logger.info(f"Executing function {function_name} with args {function_args}")
-            function_response = self.available_functions[function_name].run(function_args, self)
+            start_time = time.monotonic()
+            status = "error"
+            try:
+                with tracer.span("tool.call", agent=self.agent_key, tool=function_name) as span:
+                    function_response = self.available_functions[function_name].run(function_args, self)
+                    span.set_attribute("response_chars", len(function_response or ""))
+                status = "error" if is_error_response(function_response) else "ok"
+            finally:
+                TOOL_CALL_LATENCY.observe(time.monotonic() - start_time, tool=function_name)
+                TOOL_CALLS.inc(tool=function_name, status=status)
+            function_response = self.fit_to_budget(tool_call, function_name, function_response)
             with self.log_lock:
+                if tool_call.get("id") in self.abandoned_calls:
+                    return function_response
                 self.execution_log.append({
                     "function_name": function_name,
                     "args": function_args,
@@ -82,31 +112,153 @@ class FunctionCallHandler:
                 })
             return function_response
 
+    def fit_to_budget(self, tool_call, function_name, function_response):
+        """
+        Keep a tool response within the tool's output token budget. The full response of a truncated call is
+        spilled to a file the agent can read back with file_read.
+        """
+        budget = budget_for(function_name, getattr(self.text_config, "tool_output_budgets", None))
+        spill_path = spill_path_for(self.agent_id, function_name, tool_call.get("id"))
+        try:
+            function_response, truncated = apply_budget(function_response, budget, spill_path)
+        except Exception as e:
+            logger.warning(f"Could not apply the output budget of {function_name}, keeping the full response: {e}")
+            return function_response
+        if truncated:
+            TOOL_OUTPUT_TRUNCATIONS.inc(tool=function_name)
+            logger.info(f"Truncated {function_name} output to {budget} tokens, full output in {spill_path}")
+        return function_response
+
+    def get_resource_keys(self, tool_call):
+        """
+        The resources a tool call reads and writes. Calls that will fail before running touch nothing; tools
+        that do not say conflict with everything.
+        """
+        try:
+            function_name = tool_call["function"]["name"]
+            function_args = json.loads(tool_call["function"]["arguments"])
+        except Exception:
+            return NO_RESOURCES
+        if function_name not in self.available_functions:
+            return NO_RESOURCES
+        get_resource_keys = getattr(self.available_functions[function_name], "get_resource_keys", None)
+        if get_resource_keys is None:
+            return EXCLUSIVE
+        try:
+            return get_resource_keys(function_args, self)
+        except Exception as e:
+            logger.warning(f"Could not get the resource keys of {function_name}, running it on its own: {e}")
+            return EXCLUSIVE
+
+    def get_timeout(self, tool_call):
+        """Seconds the tool call may run before it is abandoned."""
+        function_name, tool_timeout = None, None
+        try:
+            function_name = tool_call["function"]["name"]
+            function_args = json.loads(tool_call["function"]["arguments"])
+            get_timeout = getattr(self.available_functions.get(function_name), "get_timeout", None)
+            if get_timeout is not None:
+                tool_timeout = get_timeout(function_args, self)
+        except Exception as e:
+            logger.warning(f"Could not get the timeout of {tool_call}, using the default: {e}")
+        return timeout_for(function_name, tool_timeout, getattr(self.text_config, "tool_timeouts", None))
+
+    def respond_with_error(self, tool_call, error, **details):
+        """Answer a tool call that did not produce a response of its own."""
+        response = json.dumps({"error": error, **details})
+        self.update_context_with_response(tool_call, response)
+        with self.log_lock:
+            self.execution_log.append({
+                "function_name": tool_call["function"]["name"],
+                "args": tool_call["function"]["arguments"],
+                "response": response
+            })
+
     def handle_fn_calls(self, tool_calls):
         """
-        Handle multiple function calls in parallel.
+        Handle multiple function calls in parallel. Calls that conflict over a resource one of them writes run
+        one after another, in the order they were made.
+
+        Every call has a deadline, and so does the turn as a whole. A call still running at its deadline is
+        abandoned with a timeout error, along with the calls waiting on it, since it may still be using their
+        resources; its thread is left to finish or hang on its own.
         """
         # Clear the execution log
         with self.log_lock:
             self.execution_log = []
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            # Dictionary for tracking correspondences
-            future_to_tool_call = {
-                executor.submit(self.execute_function_call, tool_call): tool_call
-                for tool_call in tool_calls
-            }
-
-            # Process return values and catch exceptions
-            for future in concurrent.futures.as_completed(future_to_tool_call):
-                tool_call = future_to_tool_call[future]
-                try:
-                    function_response = future.result()
-                    self.update_context_with_response(tool_call, function_response)
-                except Exception as exc:
-                    traceback.print_exc()
-                    logger.warn(f"Function call {tool_call} generated an exception: {exc}")
-                    self.update_context_with_response(tool_call, str(exc), is_error=True)
+        dependencies = build_dependencies([self.get_resource_keys(tool_call) for tool_call in tool_calls])
+        turn_timeout = getattr(self.text_config, "turn_timeout", None) or DEFAULT_TURN_TIMEOUT
+        turn_deadline = time.monotonic() + turn_timeout
+        pending = list(range(len(tool_calls)))
+        running = {}  # Future -> index of its tool call
+        deadlines = {}  # Future -> (deadline, seconds allowed, whether the turn's deadline is the one that applies)
+        abandoned = set()
+
+        with tracer.span("tool.batch", agent=self.agent_key, calls=len(tool_calls)) as span:
+            while pending or running:
+                unfinished = set(pending) | set(running.values())
+                for index in list(pending):
+                    tool_call = tool_calls[index]
+                    if dependencies[index] & abandoned:
+                        pending.remove(index)
+                        abandoned.add(index)
+                        waited_for = [tool_calls[earlier]["id"] for earlier in sorted(dependencies[index] & abandoned)]
+                        self.respond_with_error(
+                            tool_call, "Not run: it conflicts with tool calls that timed out and may still be running.",
+                            skipped=True, waiting_for=waited_for,
+                        )
+                    elif not dependencies[index] & unfinished:
+                        # Start every call whose conflicting predecessors have all finished
+                        pending.remove(index)
+                        timeout = self.get_timeout(tool_call)
+                        future = run_detached(self.execute_function_call, tool_call)
+                        running[future] = index
+                        deadline = time.monotonic() + timeout
+                        deadlines[future] = (min(deadline, turn_deadline), timeout, turn_deadline < deadline)
+
+                if not running:
+                    continue
+                next_deadline = min(deadline for deadline, _, _ in deadlines.values())
+                done, _ = concurrent.futures.wait(
+                    running, timeout=max(next_deadline - time.monotonic(), 0), return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    tool_call = tool_calls[running.pop(future)]
+                    del deadlines[future]
+                    try:
+                        function_response = future.result()
+                        self.update_context_with_response(tool_call, function_response)
+                    except Exception as exc:
+                        traceback.print_exc()
+                        logger.warn(f"Function call {tool_call} generated an exception: {exc}")
+                        self.update_context_with_response(tool_call, str(exc), is_error=True)
+
+                now = time.monotonic()
+                for future, (deadline, timeout, turn_limited) in list(deadlines.items()):
+                    if now < deadline:
+                        continue
+                    index = running.pop(future)
+                    del deadlines[future]
+                    abandoned.add(index)
+                    tool_call = tool_calls[index]
+                    with self.log_lock:
+                        self.abandoned_calls.add(tool_call["id"])
+                    function_name = tool_call["function"]["name"]
+                    TOOL_TIMEOUTS.inc(tool=function_name)
+                    limit = f"the turn's time limit of {turn_timeout:g}s" if turn_limited else f"its time limit of {timeout:g}s"
+                    logger.warning(f"Abandoning function call {tool_call['id']} ({function_name}) after {limit}")
+                    self.respond_with_error(
+                        tool_call, f"{function_name} did not finish within {limit} and was abandoned. It may still "
+                                   f"complete in the background, so check its effects before retrying.",
+                        timed_out=True, timeout=turn_timeout if turn_limited else timeout,
+                    )
+                if now >= turn_deadline:
+                    for index in pending:
+                        self.respond_with_error(tool_calls[index], "Not run: the turn's time limit ran out.", skipped=True)
+                    abandoned.update(pending)
+                    pending = []
+            span.set_attribute("abandoned", len(abandoned))
 
         # Return the logged execution details
         return self.execution_log
@@ -0,0 +1,43 @@
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds for every request made through the shared session
+DEFAULT_TIMEOUT = (5, 30)
+USER_AGENT = "joe-sim-ai/1.0 (+https://github.com/knarbmakes/joe-sim-ai)"
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def create_session(retries: int = 3, backoff_factor: float = 0.5, pool_maxsize: int = 20) -> requests.Session:
+    """
+    A session with keep-alive connection pools and retries with exponential backoff on connection errors,
+    429 and 5xx responses (honoring Retry-After). POST is retried too, as the APIs we call are idempotent.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=None,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=pool_maxsize)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """The process-wide session shared by the web tools, created on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
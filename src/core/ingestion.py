@@ -0,0 +1,263 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from core.atomic_file import atomic_write_bytes
+from core.cost_helper import get_encoding
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_EXTENSIONS = (".txt", ".md", ".pdf")
+DEFAULT_CHUNK_TOKENS = 400
+DEFAULT_OVERLAP_TOKENS = 40
+DEFAULT_BATCH_SIZE = 64
+CHECKPOINT_FILE = "memory/ingestion_checkpoint.json"
+MAX_PARAGRAPH_CHARS = 64 * 1024  # Text without blank lines is cut into pieces this long before tokenizing
+
+
+class Chunk(NamedTuple):
+    source: str
+    index: int
+    text: str
+    tokens: int
+
+    @property
+    def id(self) -> str:
+        # Content-addressed, so the same text is stored once however many files contain it
+        return hashlib.sha256(" ".join(self.text.split()).encode("utf-8")).hexdigest()[:32]
+
+
+def collect_files(paths: Iterable[str]) -> Iterator[str]:
+    """Document files under `paths`, in a stable order. A PDF converted by scripts/pdf_to_text.py is read from its .txt."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                names = set(files)
+                for name in sorted(files):
+                    stem, extension = os.path.splitext(name)
+                    if extension.lower() not in DOCUMENT_EXTENSIONS:
+                        continue
+                    if extension.lower() == ".pdf" and stem + ".txt" in names:
+                        continue
+                    yield os.path.join(root, name)
+        elif os.path.isfile(path):
+            yield path
+        else:
+            logger.warning(f"Skipping {path}: not a file or directory")
+
+
+def read_paragraphs(path: str) -> Iterator[str]:
+    """Paragraphs of a text file, read a line at a time."""
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        yield from _paragraphs(file)
+
+
+def read_pdf_paragraphs(path: str) -> Iterator[str]:
+    """Paragraphs of a PDF, extracted a page at a time with pdfminer."""
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    for page in extract_pages(path):
+        text = "".join(element.get_text() for element in page if isinstance(element, LTTextContainer))
+        yield from _paragraphs(text.splitlines(keepends=True))
+
+
+def _paragraphs(lines: Iterable[str]) -> Iterator[str]:
+    paragraph, size = [], 0
+    for line in lines:
+        if not line.strip() or size >= MAX_PARAGRAPH_CHARS:
+            if paragraph:
+                yield "".join(paragraph).strip()
+            paragraph, size = [], 0
+        if line.strip():
+            paragraph.append(line)
+            size += len(line)
+    if paragraph:
+        yield "".join(paragraph).strip()
+
+
+def read_document(path: str) -> Iterator[str]:
+    return read_pdf_paragraphs(path) if path.lower().endswith(".pdf") else read_paragraphs(path)
+
+
+def chunk_paragraphs(source: str, paragraphs: Iterable[str], max_tokens: int = DEFAULT_CHUNK_TOKENS,
+                     overlap: int = DEFAULT_OVERLAP_TOKENS) -> Iterator[Chunk]:
+    """
+    Pack paragraphs into chunks of at most `max_tokens` tokens, splitting paragraphs only when one alone is too long.
+    Each chunk after the first starts with the last `overlap` tokens of the one before it.
+    """
+    encoding = get_encoding()
+    overlap = min(overlap, max_tokens // 2)
+    tokens: List[int] = []
+    fresh = False  # Whether `tokens` holds anything beyond the overlap carried from the previous chunk
+    index = 0
+
+    for paragraph in paragraphs:
+        paragraph_tokens = encoding.encode(paragraph + "\n\n", disallowed_special=())
+        while paragraph_tokens:
+            room = max_tokens - len(tokens)
+            if len(paragraph_tokens) > room and fresh:
+                # Flush before splitting, so paragraphs that fit in a chunk of their own are kept whole
+                yield Chunk(source, index, encoding.decode(tokens).strip(), len(tokens))
+                index += 1
+                tokens, fresh = tokens[len(tokens) - overlap:] if overlap else [], False
+                continue
+            tokens.extend(paragraph_tokens[:room])
+            paragraph_tokens = paragraph_tokens[room:]
+            fresh = True
+
+    if fresh:
+        yield Chunk(source, index, encoding.decode(tokens).strip(), len(tokens))
+
+
+def dedupe(chunks: Iterable[Chunk], seen: set) -> Iterator[Chunk]:
+    """Drop chunks whose content hash is already in `seen`, adding the new ones to it."""
+    for chunk in chunks:
+        if chunk.text and chunk.id not in seen:
+            seen.add(chunk.id)
+            yield chunk
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class IngestionCheckpoint:
+    """
+    Progress of an ingestion, saved after every batch: the files finished (by size and mtime, so changed files are
+    ingested again) and how many chunks of the current file are already stored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+        except (FileNotFoundError, ValueError):
+            state = {}
+        self.files: Dict[str, Dict] = state.get("files", {})
+        self.current: Optional[Dict] = state.get("current")
+
+    @staticmethod
+    def _signature(path: str) -> Dict:
+        stat = os.stat(path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def is_done(self, path: str) -> bool:
+        done = self.files.get(os.path.abspath(path))
+        return done is not None and all(done.get(key) == value for key, value in self._signature(path).items())
+
+    def chunks_done(self, path: str) -> int:
+        if self.current and self.current["path"] == os.path.abspath(path) and \
+                self.current["signature"] == self._signature(path):
+            return self.current["chunks"]
+        return 0
+
+    def progress(self, path: str, chunks: int):
+        self.current = {"path": os.path.abspath(path), "signature": self._signature(path), "chunks": chunks}
+        self.save()
+
+    def finish(self, path: str, chunks: int):
+        self.files[os.path.abspath(path)] = {**self._signature(path), "chunks": chunks}
+        self.current = None
+        self.save()
+
+    def save(self):
+        atomic_write_bytes(self.path, json.dumps({"files": self.files, "current": self.current}).encode("utf-8"))
+
+
+def ingest(paths: Iterable[str], collection, checkpoint_path: str = CHECKPOINT_FILE,
+           max_tokens: int = DEFAULT_CHUNK_TOKENS, overlap: int = DEFAULT_OVERLAP_TOKENS,
+           batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Chunk the documents under `paths` and upsert them into a Chroma collection, `batch_size` chunks per call.
+    Chunks already in the collection are not embedded again, and a crashed run resumes from its checkpoint.
+    """
+    checkpoint = IngestionCheckpoint(checkpoint_path)
+    stats = {"files": 0, "files_skipped": 0, "files_failed": 0, "chunks": 0, "duplicates": 0, "upserted": 0}
+    seen = set()
+
+    for path in collect_files(paths):
+        if checkpoint.is_done(path):
+            stats["files_skipped"] += 1
+            continue
+
+        resume_from = checkpoint.chunks_done(path)
+        chunks_read = resume_from
+        try:
+            chunks = chunk_paragraphs(path, read_document(path), max_tokens, overlap)
+            for batch in batched(chunks, batch_size):
+                chunks_read = batch[-1].index + 1
+                batch = [chunk for chunk in batch if chunk.index >= resume_from]
+                stats["chunks"] += len(batch)
+                unique = list(dedupe(batch, seen))
+                unique = _drop_stored(collection, unique)
+                stats["duplicates"] += len(batch) - len(unique)
+                if unique:
+                    collection.upsert(ids=[chunk.id for chunk in unique], documents=[chunk.text for chunk in unique],
+                                      metadatas=[_metadata(chunk) for chunk in unique])
+                    stats["upserted"] += len(unique)
+                if chunks_read > resume_from:
+                    checkpoint.progress(path, chunks_read)
+        except Exception as e:
+            logger.error(f"Error ingesting {path}: {e}")
+            stats["files_failed"] += 1
+            continue
+
+        checkpoint.finish(path, chunks_read)
+        stats["files"] += 1
+        logger.info(f"Ingested {path}: {chunks_read} chunks")
+
+    return stats
+
+
+def _drop_stored(collection, chunks: List[Chunk]) -> List[Chunk]:
+    """Chunks not yet in the collection, so only new text is embedded."""
+    if not chunks:
+        return chunks
+    stored = set(collection.get(ids=[chunk.id for chunk in chunks], include=[])["ids"])
+    return [chunk for chunk in chunks if chunk.id not in stored]
+
+
+def _metadata(chunk: Chunk) -> Dict:
+    return {
+        "id": chunk.id,
+        "label": f"{os.path.basename(chunk.source)} #{chunk.index + 1}",
+        "type": "document",
+        "source": chunk.source,
+        "chunk": chunk.index,
+        "tokens": chunk.tokens,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+
+
+if __name__ == "__main__":
+    # Ingest documents into the agents' memory: python -m core.ingestion downloads notes.md
+    parser = argparse.ArgumentParser(description="Chunk documents and store them in the coder_db memory collection.")
+    parser.add_argument("paths", nargs="+", help="Files, or directories of .txt, .md and .pdf files")
+    parser.add_argument("--max-tokens", type=int, default=DEFAULT_CHUNK_TOKENS, help="Tokens per chunk")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP_TOKENS, help="Tokens repeated between chunks")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Chunks embedded per upsert")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="Where progress is saved")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    import chromadb
+    client = chromadb.PersistentClient(path="memory/chroma_db")
+    result = ingest(args.paths, client.get_or_create_collection(name="coder_db"), args.checkpoint,
+                    args.max_tokens, args.overlap, args.batch_size)
+    print(json.dumps(result))
+    sys.exit(1 if result["files_failed"] else 0)
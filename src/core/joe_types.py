@@ -1,7 +1,8 @@
 from core.file_based_bank_account import FileBasedBankAccount
 from core.file_based_context import FileBasedContext
+from core.file_based_inbox import FileBasedInbox
 from core.file_based_kanban import FileBasedKanbanBoard
-from typing import NamedTuple, Optional, Dict, Any
+from typing import NamedTuple, Optional, Dict, Any, List
 
 from core.neo4j_client import Neo4jClient
 
@@ -12,6 +13,15 @@ class TextConfig(NamedTuple):
     available_functions: list[str]
     system_message: Optional[str]
     kwargs: Dict[str, Any]
+    # Models to try, in order, when the primary model keeps timing out or failing.
+    # They should have at least the context window of the primary model.
+    fallback_models: Optional[List[str]] = None
+    # Token budgets for tool outputs, by tool name with an optional "default" (see core.output_budget).
+    tool_output_budgets: Optional[Dict[str, int]] = None
+    # Seconds a tool call, by tool name with an optional "default", and a turn of tool calls may run
+    # before they are abandoned (see core.tool_scheduler).
+    tool_timeouts: Optional[Dict[str, float]] = None
+    turn_timeout: Optional[float] = None
 
 
 class ObjectConfig(NamedTuple):
@@ -20,4 +30,6 @@ class ObjectConfig(NamedTuple):
     bank_account: FileBasedBankAccount
     chroma_db_collection: Any
     kanban_board: FileBasedKanbanBoard
-    neo4j: Neo4jClient
\ No newline at end of file
+    neo4j: Neo4jClient
+    # Messages posted for the agent while it runs, delivered at the start of its next turn.
+    inbox: Optional[FileBasedInbox] = None
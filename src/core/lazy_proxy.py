@@ -0,0 +1,56 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyProxy:
+    """
+    Stands in for a backend client (a Chroma collection, the Neo4j client) that is only created on first use.
+    Attribute access creates the client with `factory` and forwards to it. If creating it fails, the error goes to
+    the caller and the next use tries again, so the agents keep running while a backend is down.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str):
+        self._factory = factory
+        self._name = name
+        self._target = None
+        self._lock = threading.Lock()
+
+    def _get(self) -> Any:
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    start_time = time.monotonic()
+                    self._target = self._factory()
+                    logger.info(f"Backend {self._name} ready in {time.monotonic() - start_time:.2f}s")
+        return self._target
+
+    @property
+    def is_ready(self) -> bool:
+        return self._target is not None
+
+    def warm_up(self) -> threading.Thread:
+        """Create the client on a background thread, so it is likely ready by the time a tool needs it."""
+        def connect():
+            try:
+                self._get()
+            except Exception as e:
+                logger.warning(f"Backend {self._name} is not available yet: {e}")
+
+        thread = threading.Thread(target=connect, name=f"warm-up-{self._name}", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self, method: Optional[str] = "close"):
+        """Close the client if it was ever created."""
+        if self._target is not None and method and hasattr(self._target, method):
+            getattr(self._target, method)()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get(), name)
+
+    def __repr__(self) -> str:
+        return f"LazyProxy({self._name!r}, ready={self.is_ready})"
@@ -0,0 +1,122 @@
+import mmap
+import operator
+import os
+import threading
+from collections import OrderedDict
+from itertools import accumulate, repeat
+from typing import Optional, Tuple
+
+CHUNK_SIZE = 4 * 1024 * 1024
+STRIDE = 1024  # Lines between checkpoints
+
+
+class LineIndex:
+    """
+    Byte offsets of every STRIDE-th line start of a file, so any line can be reached with at most STRIDE
+    newline searches. The index is built lazily, a chunk at a time, only as far as the lines asked for.
+    Each chunk is split and measured in C, so even multi-gigabyte files index at memory bandwidth.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.checkpoints = [0]  # checkpoints[i] is the byte offset where line i * STRIDE starts
+        self.scan_pos = 0  # Bytes scanned so far
+        self.newlines = 0  # Newlines seen before scan_pos
+        self.last_byte = b""
+        self.lock = threading.Lock()
+
+    @property
+    def complete(self) -> bool:
+        return self.scan_pos >= self.size
+
+    @property
+    def total_lines(self) -> Optional[int]:
+        """Number of lines, once the whole file has been scanned. A last line without a newline still counts."""
+        if not self.complete:
+            return None
+        return self.newlines + (1 if self.size and self.last_byte != b"\n" else 0)
+
+    def _scan_chunk(self, mm: mmap.mmap):
+        chunk = mm[self.scan_pos:self.scan_pos + CHUNK_SIZE]
+        parts = chunk.split(b"\n")
+        # Absolute start of each line that begins right after a newline in this chunk
+        starts = list(accumulate(map(operator.add, map(len, parts[:-1]), repeat(1)), initial=self.scan_pos))[1:]
+        first = (-(self.newlines + 1)) % STRIDE
+        self.checkpoints.extend(starts[first::STRIDE])
+        self.newlines += len(starts)
+        self.scan_pos += len(chunk)
+        if self.complete:
+            self.last_byte = mm[self.size - 1:self.size] if self.size else b""
+
+    def line_offset(self, mm: mmap.mmap, line: int) -> Optional[int]:
+        """Byte offset where a 0-based line starts, or None when the file has fewer lines."""
+        with self.lock:
+            while len(self.checkpoints) <= line // STRIDE and not self.complete:
+                self._scan_chunk(mm)
+            if line // STRIDE >= len(self.checkpoints):
+                return None
+
+        offset = self.checkpoints[line // STRIDE]
+        for _ in range(line % STRIDE):
+            newline = mm.find(b"\n", offset)
+            if newline < 0:
+                return None
+            offset = newline + 1
+        return offset if offset < self.size or line == 0 else None
+
+    def count_lines(self, mm: mmap.mmap) -> int:
+        with self.lock:
+            while not self.complete:
+                self._scan_chunk(mm)
+        return self.total_lines
+
+
+class LineIndexCache:
+    """LRU of line indexes keyed by (path, mtime, size), so a file that changes gets a fresh index."""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int, int], LineIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, stat: os.stat_result) -> LineIndex:
+        key = (os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            index = self._entries.get(key)
+            if index is None:
+                index = self._entries[key] = LineIndex(stat.st_size)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            return index
+
+
+def count_newlines(mm: mmap.mmap, start: int, end: int) -> int:
+    """Count newlines in a byte range a chunk at a time, without copying the whole range."""
+    count = 0
+    for chunk_start in range(start, end, CHUNK_SIZE):
+        count += mm[chunk_start:min(chunk_start + CHUNK_SIZE, end)].count(b"\n")
+    return count
+
+
+def char_boundary(mm: mmap.mmap, offset: int) -> int:
+    """Move a byte offset forward past UTF-8 continuation bytes, so decoding starts on a whole character."""
+    end = min(offset + 3, len(mm))
+    while offset < end and mm[offset] & 0xC0 == 0x80:
+        offset += 1
+    return offset
+
+
+def decode_prefix(data: bytes) -> Tuple[str, int]:
+    """Decode bytes, dropping a character cut off at the end. Returns the text and the number of bytes used."""
+    try:
+        return data.decode("utf-8"), len(data)
+    except UnicodeDecodeError as e:
+        if e.reason == "unexpected end of data" and len(data) - e.start < 4:
+            data = data[:e.start]
+        return data.decode("utf-8", errors="replace"), len(data)
+
+
+# Shared by every file_read call in the process.
+line_index_cache = LineIndexCache()
@@ -2,6 +2,8 @@ import json
 import logging
 from core.cost_helper import get_context_window, num_tokens_from_message, num_tokens_from_string
 from core.joe_types import ObjectConfig, TextConfig
+from core.metrics import CONTEXT_EVICTED, CONTEXT_MESSAGES, CONTEXT_TOKENS, CONTEXT_TRIMS
+from core.tracing import traced, tracer
 from typing import Union
 
 logger = logging.getLogger(__name__)
@@ -37,6 +39,19 @@ class MessageStackBuilder:
 
         return messages
 
+    def flip_foreign_assistant_roles(self, messages):
+        # Iterate over all messages, and flip assistant to user if it is not us.
+        for msg in messages:
+            if (
+                msg["role"] == "assistant"
+                and msg.get("name")
+                and msg["name"] != self.agent_key
+            ):
+                msg["role"] = "user"
+
+        return messages
+
+    @traced("context.build_message_stack")
     def build_message_stack(self, sys_message_suffix: Union[str, None] = None):
             """
             Builds the latest message context stack for the agent.
@@ -63,6 +78,7 @@ class MessageStackBuilder:
 
             # Get the latest context memory.
             chat_history = self.agent_service.update_context_memory(memory_elements=[])
+            history_length = len(chat_history)
 
             # Pre-calculate the token counts for all messages in chat history.
             token_counts = [
@@ -85,19 +101,12 @@ class MessageStackBuilder:
                 final_count -= 1
 
             # Pop the messages from the database as well so we don't keep growing the list infinitely.
-            if final_count < len(chat_history):
+            if final_count < history_length:
                 self.agent_service.update_context_memory(
                     final_count=final_count,
                 )
 
-            # Iterate over all messages, and flip assistant to user if it is not us.
-            for msg in chat_history:
-                if (
-                    msg["role"] == "assistant"
-                    and msg.get("name")
-                    and msg["name"] != self.agent_key
-                ):
-                    msg["role"] = "user"
+            self.flip_foreign_assistant_roles(chat_history)
 
             # Build the message stack
             messages = [{"role": "system", "content": system_message}, *chat_history]
@@ -106,4 +115,14 @@ class MessageStackBuilder:
             )
 
             messages = self.clean_message_names(messages)
+            span = tracer.current_span()
+            span.set_attribute("messages", len(messages))
+            span.set_attribute("history_tokens", total_tokens)
+            span.set_attribute("evicted", history_length - len(chat_history))
+
+            CONTEXT_MESSAGES.set(len(messages), agent=self.agent_key)
+            CONTEXT_TOKENS.set(total_tokens, agent=self.agent_key)
+            if len(chat_history) < history_length:
+                CONTEXT_TRIMS.inc(agent=self.agent_key)
+                CONTEXT_EVICTED.inc(history_length - len(chat_history), agent=self.agent_key)
             return messages
@@ -1,5 +1,8 @@
 import os
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, unit_of_work
+
+# Seconds before the server terminates a query, so a stuck transaction cannot hold a tool call forever
+QUERY_TIMEOUT = float(os.getenv('NEO4J_QUERY_TIMEOUT', '60'))
 
 class Neo4jClient:
 
@@ -9,12 +12,13 @@ class Neo4jClient:
         password = os.getenv('NEO4J_PASSWORD', 'password')
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
 
-        # Execute a simple query to make sure we are connected
-        self.execute_query("MATCH (n) RETURN count(n)")
+        # Make sure we are connected, without a query that touches the whole graph
+        self.driver.verify_connectivity()
 
     def close(self):
         self.driver.close()
 
+    @unit_of_work(timeout=QUERY_TIMEOUT)
     def _transaction(self, tx, query, parameters=None):
         result = tx.run(query, parameters)
         return [record.data() for record in result]
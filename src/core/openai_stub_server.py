@@ -0,0 +1,239 @@
+import argparse
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from core.completion_recorder import load_recordings, request_key
+from core.idgen import generate_id
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class StubResponse(NamedTuple):
+    status: int
+    body: Dict[str, Any]
+    delay: float = 0.0
+
+
+def make_chat_completion(
+    model: str,
+    content: Optional[str] = None,
+    tool_calls: Optional[List[Dict[str, Any]]] = None,
+    prompt_tokens: int = 10,
+    completion_tokens: int = 5,
+) -> Dict[str, Any]:
+    """
+    Build a chat completion payload in the shape returned by the OpenAI API.
+
+    Tool calls may be given in the short form {"name": ..., "arguments": {...}}, they are
+    expanded into the full {"id", "type", "function"} structure.
+    """
+    full_tool_calls = None
+    if tool_calls:
+        full_tool_calls = []
+        for tool_call in tool_calls:
+            if "function" not in tool_call:
+                arguments = tool_call.get("arguments", {})
+                tool_call = {
+                    "id": tool_call.get("id", f"call_{generate_id()}"),
+                    "type": "function",
+                    "function": {
+                        "name": tool_call["name"],
+                        "arguments": arguments if isinstance(arguments, str) else json.dumps(arguments),
+                    },
+                }
+            full_tool_calls.append(tool_call)
+
+    return {
+        "id": f"chatcmpl-{generate_id()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "tool_calls": full_tool_calls},
+                "finish_reason": "tool_calls" if full_tool_calls else "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def make_error(status: int, message: str) -> StubResponse:
+    return StubResponse(status, {"error": {"message": message, "type": "stub_error", "code": status}})
+
+
+class ScriptedResponder:
+    """
+    Serves a fixed sequence of steps, one per request. Each step is either a StubResponse or a dict with
+    optional keys: status, delay, content, tool_calls, body. Once the script is exhausted the last step repeats.
+    """
+
+    def __init__(self, steps: List[Union[StubResponse, Dict[str, Any]]]):
+        self.steps = list(steps)
+        self.index = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request: Dict[str, Any]) -> StubResponse:
+        with self._lock:
+            step = self.steps[min(self.index, len(self.steps) - 1)]
+            self.index += 1
+
+        if isinstance(step, StubResponse):
+            return step
+
+        status = step.get("status", 200)
+        if "body" in step:
+            body = step["body"]
+        elif status >= 400:
+            body = make_error(status, step.get("message", "Scripted error")).body
+        else:
+            body = make_chat_completion(request.get("model", "stub"), step.get("content"), step.get("tool_calls"))
+        return StubResponse(status, body, step.get("delay", 0.0))
+
+
+class ReplayResponder:
+    """
+    Replays responses captured by CompletionRecorder. Requests are matched on their normalized key, and a key
+    recorded several times is answered in recording order. Unknown requests go to the fallback responder if
+    one is given, otherwise they fail with a 400 so the run stops instead of retrying.
+    """
+
+    def __init__(self, recordings_path: str, fallback: Optional[Callable[[Dict[str, Any]], StubResponse]] = None):
+        self.recordings = load_recordings(recordings_path)
+        self.fallback = fallback
+        self.misses: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, request: Dict[str, Any]) -> StubResponse:
+        key = request_key(request)
+        responses = self.recordings.get(key)
+        if not responses:
+            with self._lock:
+                self.misses.append(key)
+            if self.fallback:
+                return self.fallback(request)
+            logger.warning(f"No recorded response for request {key}")
+            return make_error(400, f"No recorded response for request {key}")
+
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+        return StubResponse(200, responses[min(position, len(responses) - 1)])
+
+
+class OpenAIStubServer:
+    """
+    Minimal OpenAI-compatible HTTP server. Point a client at `base_url` and every
+    POST /v1/chat/completions is answered by the responder callable.
+    """
+
+    def __init__(self, responder: Callable[[Dict[str, Any]], StubResponse], host: str = "127.0.0.1", port: int = 0):
+        self.responder = responder
+        self.requests: List[Dict[str, Any]] = []
+        self._requests_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._server.block_on_close = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    payload = {}
+
+                with server._requests_lock:
+                    server.requests.append(payload)
+
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    response = make_error(404, f"Unknown path {self.path}")
+                else:
+                    response = server.responder(payload)
+
+                if response.delay:
+                    time.sleep(response.delay)
+
+                data = json.dumps(response.body).encode("utf-8")
+                try:
+                    self.send_response(response.status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on us (timeout or hedged request won), nothing to do.
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "OpenAIStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OpenAIStubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded or scripted chat completions over an OpenAI-compatible API.")
+    parser.add_argument("--replay", help="JSONL recording file produced by CompletionRecorder")
+    parser.add_argument("--script", help="JSON file with a list of scripted steps (content / tool_calls / status / delay)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    cli_args = parser.parse_args()
+
+    if not cli_args.replay and not cli_args.script:
+        parser.error("one of --replay or --script is required")
+
+    responder = None
+    if cli_args.script:
+        with open(cli_args.script, "r") as file:
+            responder = ScriptedResponder(json.load(file))
+    if cli_args.replay:
+        responder = ReplayResponder(cli_args.replay, fallback=responder)
+
+    stub_server = OpenAIStubServer(responder, host=cli_args.host, port=cli_args.port)
+    print(f"Serving on {stub_server.base_url}, set OPENAI_BASE_URL to use it.")
+    try:
+        stub_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
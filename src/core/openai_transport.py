@@ -0,0 +1,222 @@
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+import openai
+
+from core.completion_recorder import CompletionRecorder
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class OpenAITransport:
+    """
+    Wraps the OpenAI client with a pooled HTTP connection, retries with exponential backoff and jitter,
+    optional hedged requests and a fallback model chain.
+
+    Hedging sends a duplicate request when the first one is slower than `hedge_after` seconds (or the
+    `hedge_quantile` of recent latencies) and takes whichever answers first. Both requests are billed,
+    so it is disabled unless configured.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 90.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        timeouts_before_fallback: int = 2,
+        hedge_after: Optional[float] = None,
+        hedge_quantile: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        latency_window: int = 500,
+        recorder: Optional[CompletionRecorder] = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeouts_before_fallback = max(timeouts_before_fallback, 1)
+        self.hedge_after = hedge_after
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.recorder = recorder
+
+        http_client = openai.DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            )
+        )
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=0,  # Retries are handled here so we can back off, hedge and fall back ourselves.
+            http_client=http_client,
+        )
+
+        # Latency of successful attempts, used for the hedging threshold.
+        self._latencies = deque(maxlen=latency_window)
+        # Every attempt made, successful or not.
+        self.attempt_log = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+
+        self._executor = None
+        if hedge_after is not None or hedge_quantile is not None:
+            self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="openai-hedge")
+
+    def create_chat_completion(
+        self, model: str, messages: List[Dict[str, Any]], fallback_models: Optional[List[str]] = None, **kwargs
+    ) -> Tuple[Any, str]:
+        """
+        Create a chat completion, retrying and falling back as configured.
+
+        Returns:
+            tuple: The completion and the model that produced it.
+        """
+        models = [model, *(fallback_models or [])]
+        last_error: Optional[Exception] = None
+
+        for model_index, current_model in enumerate(models):
+            has_fallback = model_index < len(models) - 1
+            consecutive_timeouts = 0
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    completion = self._attempt(current_model, messages, kwargs)
+                    if self.recorder:
+                        self.recorder.record({"model": current_model, "messages": messages, **kwargs}, completion.model_dump())
+                    return completion, current_model
+                except openai.APITimeoutError as e:
+                    last_error = e
+                    consecutive_timeouts += 1
+                    if has_fallback and consecutive_timeouts >= self.timeouts_before_fallback:
+                        break
+                except Exception as e:
+                    if not self.is_retryable(e):
+                        raise
+                    last_error = e
+                    consecutive_timeouts = 0
+
+                if attempt < self.max_retries:
+                    delay = self.backoff_delay(attempt, last_error)
+                    logger.warning(
+                        f"Completion attempt {attempt + 1} on {current_model} failed ({type(last_error).__name__}), retrying in {delay:.2f}s"
+                    )
+                    time.sleep(delay)
+
+            if has_fallback:
+                logger.warning(f"Model {current_model} keeps failing, falling back to {models[model_index + 1]}")
+
+        raise last_error
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS_CODES
+        return False
+
+    def backoff_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """Full jitter exponential backoff, honoring a Retry-After header when the server sends one."""
+        if isinstance(error, openai.APIStatusError):
+            retry_after = error.response.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def latency_quantile(self, quantile: float) -> Union[float, None]:
+        """Return the given quantile of recent successful attempt latencies, or None without enough samples."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.hedge_min_samples:
+            return None
+        index = min(int(quantile * len(samples)), len(samples) - 1)
+        return samples[index]
+
+    def get_hedge_threshold(self) -> Union[float, None]:
+        if self.hedge_after is not None:
+            return self.hedge_after
+        if self.hedge_quantile is not None:
+            return self.latency_quantile(self.hedge_quantile)
+        return None
+
+    def _record_attempt(self, model: str, latency: float, outcome: str, hedged: bool):
+        with self._lock:
+            if outcome == "ok":
+                self._latencies.append(latency)
+            self.attempt_log.append(
+                {"model": model, "latency": latency, "outcome": outcome, "hedged": hedged, "timestamp": time.time()}
+            )
+
+    def _timed_call(self, model: str, messages: List[Dict[str, Any]], kwargs: Dict[str, Any], hedged: bool = False):
+        start_time = time.monotonic()
+        try:
+            completion = self.client.chat.completions.create(model=model, messages=messages, **kwargs)
+        except Exception as e:
+            self._record_attempt(model, time.monotonic() - start_time, type(e).__name__, hedged)
+            raise
+        self._record_attempt(model, time.monotonic() - start_time, "ok", hedged)
+        return completion
+
+    def _attempt(self, model: str, messages: List[Dict[str, Any]], kwargs: Dict[str, Any]):
+        hedge_threshold = self.get_hedge_threshold()
+        if self._executor is None or hedge_threshold is None:
+            return self._timed_call(model, messages, kwargs)
+
+        primary = self._executor.submit(self._timed_call, model, messages, kwargs)
+        done, _ = wait([primary], timeout=hedge_threshold)
+        if done:
+            return primary.result()
+
+        logger.info(f"Completion on {model} slower than {hedge_threshold:.2f}s, sending hedged request")
+        pending = {primary, self._executor.submit(self._timed_call, model, messages, kwargs, True)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+
+_default_transport: Optional[OpenAITransport] = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> OpenAITransport:
+    """Create the shared transport on first use, configured from the environment."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            hedge_after = os.getenv("OPENAI_HEDGE_AFTER")
+            record_path = os.getenv("OPENAI_RECORD_PATH")
+            _default_transport = OpenAITransport(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=os.getenv("OPENAI_BASE_URL"),
+                timeout=float(os.getenv("OPENAI_TIMEOUT", 90)),
+                max_retries=int(os.getenv("OPENAI_MAX_RETRIES", 3)),
+                hedge_after=float(hedge_after) if hedge_after else None,
+                recorder=CompletionRecorder(record_path) if record_path else None,
+            )
+        return _default_transport
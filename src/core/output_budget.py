@@ -0,0 +1,125 @@
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.atomic_file import atomic_write_bytes
+from core.cost_helper import get_encoding
+
+# Tokens a tool response may take in the context before it is truncated, unless the agent config sets
+# tool_output_budgets ({"default": ..., "<tool name>": ...}, 0 for no limit).
+DEFAULT_TOOL_OUTPUT_BUDGET = 2000
+DEFAULT_TOOL_OUTPUT_BUDGETS = {
+    "web_search": 1500,
+    "cypher_query": 1500,
+    "memory_query": 1500,
+}
+SPILL_FOLDER = "tmp/tool_outputs"
+SPILL_RETENTION = 24 * 60 * 60  # Spilled outputs are deleted after a day
+
+
+def count_tokens(text: str) -> int:
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+
+def budget_for(tool_name: str, budgets: Optional[Dict[str, int]] = None) -> int:
+    budgets = {**DEFAULT_TOOL_OUTPUT_BUDGETS, **(budgets or {})}
+    return budgets.get(tool_name, budgets.get("default", DEFAULT_TOOL_OUTPUT_BUDGET))
+
+
+def shrink_json(value: Any, fits) -> Tuple[Any, Dict[str, int]]:
+    """
+    Shrink a JSON value until fits(value) holds, without breaking its structure: the largest list loses its last
+    half or, once no list is left to shrink, the longest string is cut in half. Returns the shrunk value and
+    {path: list items or characters omitted}.
+    """
+    holder = {"": value}  # Lets the top level value be replaced like any other
+    omitted: Dict[str, int] = {}
+    while not fits(holder[""]):
+        path, container, key = _largest(holder, lists=True)
+        if container is None:
+            path, container, key = _largest(holder, lists=False)
+            if container is None:
+                break
+        item = container[key]
+        keep = len(item) // 2
+        container[key] = item[:keep] + " ..." if isinstance(item, str) else item[:keep]
+        omitted[path] = omitted.get(path, 0) + len(item) - keep
+    return holder[""], omitted
+
+
+def _largest(holder: dict, lists: bool):
+    """(path, parent, key) of the largest non-empty list, or longest string over 80 characters, under holder[""]."""
+    best, best_size = ("", None, None), 0
+    stack: List[Tuple[str, Any, Any]] = [("", holder, "")]
+    while stack:
+        path, parent, key = stack.pop()
+        item = parent[key]
+        if isinstance(item, dict):
+            stack.extend((f"{path}.{child}" if path else str(child), item, child) for child in item)
+            continue
+        if isinstance(item, list):
+            stack.extend((f"{path}[{index}]", item, index) for index in range(len(item)))
+            size = len(json.dumps(item)) if lists and item else 0
+        else:
+            size = len(item) if not lists and isinstance(item, str) and len(item) > 80 else 0
+        if size > best_size:
+            best, best_size = (path or "$", parent, key), size
+    return best
+
+
+def apply_budget(response: str, budget: int, spill_path: str) -> Tuple[str, bool]:
+    """
+    Fit a tool response into `budget` tokens. A response over budget is saved whole to spill_path and replaced by a
+    structurally truncated copy, with a "truncated" entry saying what was left out and where the full output is.
+    Returns the response to put in the context, and whether it was truncated.
+    """
+    if not budget or not isinstance(response, str) or count_tokens(response) <= budget:
+        return response, False
+
+    try:
+        value = json.loads(response)
+        spilled = json.dumps(value, indent=2, ensure_ascii=False)
+    except ValueError:
+        value, spilled = None, response
+    _spill(spill_path, spilled)
+
+    note = {
+        "note": f"Output was {count_tokens(response)} tokens, over this tool's budget of {budget}. Read the full "
+                f"output with file_read from full_output.",
+        "full_output": spill_path,
+    }
+    # Leave room for the note itself
+    remaining = budget - count_tokens(json.dumps({"truncated": note})) - 20
+
+    if isinstance(value, (dict, list)):
+        value, omitted = shrink_json(value, lambda candidate: count_tokens(json.dumps(candidate)) <= remaining)
+        if count_tokens(json.dumps(value)) <= remaining:
+            note["omitted"] = omitted
+            result = {**value, "truncated": note} if isinstance(value, dict) else {"result": value, "truncated": note}
+            return json.dumps(result), True
+
+    # Plain text (or JSON that would not shrink): keep the beginning
+    text = response if value is None or isinstance(value, (dict, list)) else str(value)
+    tokens = get_encoding().encode(text, disallowed_special=())
+    return json.dumps({"result": get_encoding().decode(tokens[:max(remaining, 0)]), "truncated": note}), True
+
+
+def spill_path_for(agent_id: str, tool_name: str, call_id: str) -> str:
+    safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", call_id or str(time.time_ns()))
+    return os.path.join(SPILL_FOLDER, agent_id or "default", f"{tool_name}_{safe_id}.json")
+
+
+def _spill(path: str, text: str):
+    atomic_write_bytes(path, text.encode("utf-8"))
+    # Clear out old spills of the same agent while we are here
+    folder = os.path.dirname(path)
+    cutoff = time.time() - SPILL_RETENTION
+    for name in os.listdir(folder):
+        old_path = os.path.join(folder, name)
+        try:
+            if os.path.getmtime(old_path) < cutoff:
+                os.remove(old_path)
+        except OSError:
+            pass
@@ -0,0 +1,64 @@
+import os
+import threading
+
+
+class BoundedCapture:
+    """
+    Keeps the first head_bytes and the last tail_bytes of a byte stream, however long it is, and counts
+    everything seen. Memory stays bounded by head_bytes + tail_bytes.
+    """
+
+    def __init__(self, head_bytes: int, tail_bytes: int):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+
+    def feed(self, data: bytes):
+        with self._lock:
+            self.total_bytes += len(data)
+            room = self.head_bytes - len(self.head)
+            if room > 0:
+                self.head += data[:room]
+                data = data[room:]
+            if data:
+                self.tail += data[-self.tail_bytes:] if self.tail_bytes else b""
+                if len(self.tail) > self.tail_bytes:
+                    del self.tail[:len(self.tail) - self.tail_bytes]
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_bytes > len(self.head) + len(self.tail)
+
+    def render(self) -> str:
+        """
+        Decode the captured output. When bytes were dropped, a marker replaces them and the tail is shortened
+        by its length, so the result never exceeds head_bytes + tail_bytes characters for ASCII output.
+        """
+        with self._lock:
+            head, tail, total = bytes(self.head), bytes(self.tail), self.total_bytes
+        if total <= len(head) + len(tail):
+            return (head + tail).decode(errors="replace")
+
+        marker = f"\n... [{total - len(head) - len(tail)} bytes omitted] ...\n".encode()
+        tail = tail[len(marker):] if len(tail) > len(marker) else b""
+        return (head + marker + tail).decode(errors="replace")
+
+
+def pump(fd: int, capture: BoundedCapture, chunk_size: int = 64 * 1024) -> threading.Thread:
+    """Read a file descriptor into a capture on a daemon thread until EOF."""
+    def read_all():
+        while True:
+            try:
+                data = os.read(fd, chunk_size)
+            except OSError:
+                break
+            if not data:
+                break
+            capture.feed(data)
+
+    thread = threading.Thread(target=read_all, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,137 @@
+import logging
+import os
+import select
+import signal
+import subprocess
+import threading
+import time
+from typing import Optional, Tuple
+
+from core.idgen import generate_id
+from core.output_capture import BoundedCapture
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class ShellSession:
+    """
+    A long-lived bash process that keeps its working directory, variables and activated virtualenvs between
+    commands. Each command is sent as a quoted heredoc and eval'd, followed by sentinel lines on stdout and
+    stderr that carry its exit status. If the shell dies or a command times out, the session is restarted
+    on the next command.
+    """
+
+    def __init__(self, shell: str = "/bin/bash", cwd: Optional[str] = None):
+        self.shell = shell
+        self.cwd = cwd
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self._lock = threading.Lock()
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def _start(self):
+        if self.process is not None:
+            self.restarts += 1
+            logger.info(f"Restarting shell session (restart {self.restarts})")
+        self.process = subprocess.Popen(
+            [self.shell, "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.cwd,
+            start_new_session=True,
+        )
+
+    def close(self):
+        with self._lock:
+            self._kill()
+
+    def _kill(self):
+        if self.process is None:
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout, self.process.stderr):
+            stream.close()
+
+    def run(self, command: str, timeout: float, stdout: BoundedCapture, stderr: BoundedCapture) -> Tuple[Optional[int], bool, bool]:
+        """
+        Run a command in the session, streaming its output into the captures.
+        Returns (exit status, timed out, session was lost). Timing out kills the session so the next command gets a fresh one.
+        """
+        with self._lock:
+            restarted = False
+            if not self.is_alive():
+                restarted = self.process is not None
+                if restarted:
+                    self._kill()
+                self._start()
+
+            token = generate_id(16)
+            stdout_marker = f"\n__JOE_DONE_{token}__:".encode()
+            stderr_marker = f"\n__JOE_DONE_{token}__\n".encode()
+            script = (
+                f"IFS= read -r -d '' __joe_cmd <<'__JOE_CMD_{token}__'\n{command}\n__JOE_CMD_{token}__\n"
+                f"eval \"$__joe_cmd\" < /dev/null\n"
+                f"printf '\\n__JOE_DONE_{token}__:%d\\n' $?\n"
+                f"printf '\\n__JOE_DONE_{token}__\\n' >&2\n"
+            )
+            try:
+                self.process.stdin.write(script.encode())
+                self.process.stdin.flush()
+            except BrokenPipeError:
+                self._kill()
+                return self.process.returncode, False, True
+
+            status, timed_out, lost = self._read_until_sentinels(time.time() + timeout, stdout_marker, stderr_marker, stdout, stderr)
+            if timed_out or lost:
+                self._kill()
+                if lost:
+                    status = self.process.returncode
+            return status, timed_out, lost or timed_out or restarted
+
+    def _read_until_sentinels(self, deadline, stdout_marker, stderr_marker, stdout, stderr):
+        streams = {
+            self.process.stdout.fileno(): [stdout_marker, stdout, b""],
+            self.process.stderr.fileno(): [stderr_marker, stderr, b""],
+        }
+        status = None
+        while streams:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return status, True, False
+            readable, _, _ = select.select(list(streams), [], [], remaining)
+            for fd in readable:
+                marker, capture, pending = streams[fd]
+                data = os.read(fd, 64 * 1024)
+                if not data:
+                    # The command exited the shell
+                    capture.feed(pending)
+                    self.process.wait()
+                    return status, False, True
+
+                buffer = pending + data
+                index = buffer.find(marker)
+                if index < 0:
+                    # Hold back enough bytes to catch a marker split across reads
+                    keep = len(marker) - 1
+                    capture.feed(buffer[:-keep])
+                    streams[fd][2] = buffer[-keep:]
+                    continue
+
+                if marker is stdout_marker:
+                    end = buffer.find(b"\n", index + len(marker))
+                    if end < 0:
+                        capture.feed(buffer[:index])
+                        streams[fd][2] = buffer[index:]
+                        continue
+                    status = int(buffer[index + len(marker):end])
+                capture.feed(buffer[:index])
+                del streams[fd]
+        return status, False, False
@@ -0,0 +1,102 @@
+import re
+from typing import List, NamedTuple
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(ValueError):
+    pass
+
+
+class Hunk(NamedTuple):
+    old_start: int  # 1-based, as in the header
+    old_lines: List[str]
+    new_lines: List[str]
+
+
+def parse_unified_diff(diff: str) -> List[Hunk]:
+    """Parse the hunks of a single-file unified diff. File headers (---/+++) and other lines outside hunks are ignored."""
+    hunks = []
+    lines = diff.splitlines(keepends=True)
+    index = 0
+    while index < len(lines):
+        header = HUNK_HEADER.match(lines[index])
+        index += 1
+        if not header:
+            continue
+
+        # Hunks run until the next hunk or file header. The counts in the header are ignored, as generated diffs often get them wrong.
+        old_lines, new_lines = [], []
+        tag = " "
+        while index < len(lines) and not _is_header(lines, index):
+            line = lines[index]
+            index += 1
+            if line.startswith("\\"):
+                # "\ No newline at end of file" applies to the line before it
+                if tag in (" ", "-") and old_lines:
+                    old_lines[-1] = old_lines[-1].rstrip("\n")
+                if tag in (" ", "+") and new_lines:
+                    new_lines[-1] = new_lines[-1].rstrip("\n")
+                continue
+
+            tag, text = line[:1], line[1:]
+            if line in ("\n", "\r\n"):
+                # Some tools strip the space from empty context lines
+                tag, text = " ", line
+            if tag not in (" ", "-", "+"):
+                raise PatchError(f"Unexpected line in hunk: {line.rstrip()}")
+            if tag in (" ", "-"):
+                old_lines.append(text)
+            if tag in (" ", "+"):
+                new_lines.append(text)
+
+        hunks.append(Hunk(int(header.group(1)), old_lines, new_lines))
+
+    if not hunks:
+        raise PatchError("No hunks found, expected a unified diff with @@ -start,count +start,count @@ headers.")
+    return hunks
+
+
+def _is_header(lines: List[str], index: int) -> bool:
+    line = lines[index]
+    if HUNK_HEADER.match(line) or line.startswith("diff "):
+        return True
+    return line.startswith("--- ") and index + 1 < len(lines) and lines[index + 1].startswith("+++ ")
+
+
+def apply_unified_diff(text: str, diff: str, max_offset: int = 200) -> str:
+    """
+    Apply a unified diff to text. Each hunk must match exactly, but may have moved up to max_offset lines
+    from where its header says, as happens when earlier parts of the file changed.
+    """
+    lines = text.splitlines(keepends=True)
+    offset = 0
+    for number, hunk in enumerate(parse_unified_diff(diff), start=1):
+        expected = max(hunk.old_start - 1 + offset, 0) if hunk.old_lines else hunk.old_start + offset
+        position = _find_hunk(lines, hunk.old_lines, expected, max_offset)
+        if position is None:
+            raise PatchError(f"Hunk {number} (@@ -{hunk.old_start}) does not match the file.")
+        lines[position:position + len(hunk.old_lines)] = hunk.new_lines
+        offset += len(hunk.new_lines) - len(hunk.old_lines) + (position - expected)
+    return "".join(lines)
+
+
+def _find_hunk(lines: List[str], old_lines: List[str], expected: int, max_offset: int):
+    if not old_lines:
+        return min(expected, len(lines))
+    for distance in range(max_offset + 1):
+        for position in (expected - distance, expected + distance):
+            if 0 <= position <= len(lines) - len(old_lines) and _matches(lines, old_lines, position):
+                return position
+    return None
+
+
+def _matches(lines: List[str], old_lines: List[str], position: int) -> bool:
+    for index, old_line in enumerate(old_lines):
+        line = lines[position + index]
+        if line == old_line:
+            continue
+        # The last line of the file may lack its newline on one side only
+        if position + index != len(lines) - 1 or line.rstrip("\n") != old_line.rstrip("\n"):
+            return False
+    return True
@@ -1,29 +1,31 @@
 import json
-import openai
 import os
+import time
 import traceback
 import logging
 
+from decimal import Decimal
 from dotenv import load_dotenv
 from core.function_call_handler import FunctionCallHandler
 from core.message_stack_builder import MessageStackBuilder
+from core.openai_transport import OpenAITransport, get_default_transport
 from core.cost_helper import (
     calculate_cost,
 )
-from typing import Any
+from typing import Any, Optional
 from datetime import datetime
 from core.joe_types import TextConfig, ObjectConfig
+from core.metrics import AGENT_TURNS, COMPLETION_ERRORS, COMPLETION_LATENCY, COMPLETION_TOKENS, COST, PROMPT_TOKENS
+from core.tracing import tracer
 
 # Configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 load_dotenv()
-openai_client = openai.OpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-)
+
 class ToolAgent:
-    def __init__(self, text_config: TextConfig, object_config: ObjectConfig):
+    def __init__(self, text_config: TextConfig, object_config: ObjectConfig, transport: Optional[OpenAITransport] = None):
         # Every agent needs a key, so generate one if it is not provided.
         self.agent_key = text_config.agent_key or os.urandom(16).hex()
 
@@ -36,6 +38,12 @@ class ToolAgent:
         self.agent_service = object_config.agent_service
         self.bank_account = object_config.bank_account
 
+        # Total spent by this agent, used by the scheduler to enforce per-agent budgets.
+        self.spent = Decimal("0")
+
+        # The transport handles retries, hedging and model fallback for completions.
+        self.transport = transport or get_default_transport()
+
         self.message_stack_builder = MessageStackBuilder(
             self.agent_key, text_config, object_config
         )
@@ -44,9 +52,12 @@ class ToolAgent:
             self.agent_key, text_config, object_config
         )
 
-    def track_usage(self, usage):
-        # Calculate cost from usage and subtract from bank account
-        cost = calculate_cost(dict(usage), self.text_config.model)
+    def track_usage(self, usage, model=None):
+        # Calculate cost from usage and subtract from bank account, priced on the model that actually answered.
+        cost = calculate_cost(dict(usage), model or self.text_config.model)
+        tracer.current_span().set_attribute("cost", str(cost))
+        COST.inc(float(cost), agent=self.agent_key)
+        self.spent += cost
         if not self.bank_account.subtract_balance(cost, self.agent_key):
             logger.warning(
                 f"Insufficient funds for agent {self.agent_key}. Stopping execution."
@@ -54,7 +65,31 @@ class ToolAgent:
             return False
         return True
 
+    def log_completion_request(self, messages, kwargs):
+        # Log the completion request to a file in tmp/logs
+        logfile = f"tmp/logs/completion_requests{self.agent_key}_{datetime.now().isoformat()}.json"
+        # ensure dir exists
+        os.makedirs(os.path.dirname(logfile), exist_ok=True)
+        with open(logfile, "a") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "model": self.text_config.model,
+                        "messages": messages,
+                        "kwargs": kwargs,
+                    },
+                    indent=2,
+                )
+                + "\n"
+            )
+
     def run(self, input_messages=None, sys_message_suffix=None) -> dict[str, Any]:
+        with tracer.span("agent.run", agent=self.agent_key):
+            result = self._run(input_messages, sys_message_suffix)
+        AGENT_TURNS.inc(agent=self.agent_key, status=result.get("status"))
+        return result
+
+    def _run(self, input_messages=None, sys_message_suffix=None) -> dict[str, Any]:
         try:
             if not self.bank_account.get_balance() > 0:
                 return {"status": "error", "error": "Budget limit exceeded"}
@@ -67,7 +102,9 @@ class ToolAgent:
             tool_execution_log = []
 
             # Loop until we stop getting function calls or we exceed the budget.
+            iteration = 0
             while True:
+                iteration += 1
                 if not self.bank_account.get_balance() > 0:
                     logger.warning(
                         f"Budget exceeded for agent {self.agent_key}. Stopping execution."
@@ -92,34 +129,34 @@ class ToolAgent:
                 if available_function_definitions:
                     kwargs["tools"] = available_function_definitions
 
-                # Log the completion request to a file in tmp/logs
-                logfile = f"tmp/logs/completion_requests{self.agent_key}_{datetime.now().isoformat()}.json"
-                # ensure dir exists
-                os.makedirs(os.path.dirname(logfile), exist_ok=True)
-                with open(logfile, "a") as f:
-                    f.write(
-                        json.dumps(
-                            {
-                                "model": self.text_config.model,
-                                "messages": messages,
-                                "kwargs": kwargs,
-                            },
-                            indent=2,
-                        )
-                        + "\n"
-                    )
+                self.log_completion_request(messages, kwargs)
 
                 # TODO: If the last message on the stack, we should skip the completion and call the function(s) directly.
-                completion = openai_client.chat.completions.create(
-                    model=self.text_config.model,
-                    messages=messages,
-                    timeout=90,
-                    **kwargs,
-                )
-
-                # Track spending
-                if not self.track_usage(dict(completion).get("usage")):
-                    return {"status": "error", "error": "Insufficient funds"}
+                with tracer.span("llm.completion", agent=self.agent_key, iteration=iteration) as span:
+                    start_time = time.monotonic()
+                    try:
+                        completion, completion_model = self.transport.create_chat_completion(
+                            model=self.text_config.model,
+                            messages=messages,
+                            fallback_models=self.text_config.fallback_models,
+                            **kwargs,
+                        )
+                    except Exception:
+                        COMPLETION_ERRORS.inc(agent=self.agent_key)
+                        raise
+                    COMPLETION_LATENCY.observe(time.monotonic() - start_time, agent=self.agent_key, model=completion_model)
+
+                    usage = dict(completion).get("usage")
+                    span.set_attribute("model", completion_model)
+                    if usage:
+                        span.set_attribute("prompt_tokens", usage.prompt_tokens)
+                        span.set_attribute("completion_tokens", usage.completion_tokens)
+                        PROMPT_TOKENS.inc(usage.prompt_tokens, agent=self.agent_key, model=completion_model)
+                        COMPLETION_TOKENS.inc(usage.completion_tokens, agent=self.agent_key, model=completion_model)
+
+                    # Track spending
+                    if not self.track_usage(usage, completion_model):
+                        return {"status": "error", "error": "Insufficient funds"}
 
                 # Handle explicit function calls
                 output = dict(completion.choices[0].message)
@@ -0,0 +1,100 @@
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+from typing import Dict, List
+
+from core.atomic_file import atomic_write_bytes
+from core.tool_registry import ToolEntry, ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 2  # Manifests written in another format are rebuilt
+
+
+def source_hash(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def tool_modules(package_dir: str) -> List[str]:
+    return sorted(name[:-3] for name in os.listdir(package_dir) if name.endswith(".py") and name != "__init__.py")
+
+
+def describe_module(package: str, module_name: str) -> Dict[str, dict]:
+    """Import a tool module and return {tool name: {definition, backends}} for the tools it registers."""
+    module = importlib.import_module(f"{package}.{module_name}")
+    tools = {}
+    for name, tool in list(ToolRegistry.functions.items()):
+        if getattr(tool, "__module__", None) != module.__name__:
+            continue
+        try:
+            definition = tool.get_definition(None)
+        except Exception as e:
+            # Definitions that need a live agent are computed on use instead
+            logger.warning(f"Not caching the definition of {name}: {e}")
+            definition = None
+        tools[name] = {"definition": definition, "backends": list(getattr(tool, "backends", ()))}
+    return tools
+
+
+def load_manifest(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        return manifest.get("modules", {}) if manifest.get("version") == MANIFEST_VERSION else {}
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def register_package(package_dir: str, package: str):
+    """
+    Register every tool of a package lazily from its manifest, so a tool's module is only imported when an agent
+    uses it. Modules that are new or changed since the manifest was written are imported now, and the manifest is
+    brought up to date.
+    """
+    manifest_path = os.path.join(package_dir, MANIFEST_FILE)
+    cached = load_manifest(manifest_path)
+    modules = {}
+    changed = False
+
+    for module_name in tool_modules(package_dir):
+        digest = source_hash(os.path.join(package_dir, module_name + ".py"))
+        entry = cached.get(module_name)
+        if entry is None or entry.get("source_hash") != digest:
+            entry = {"source_hash": digest, "tools": describe_module(package, module_name)}
+            changed = True
+        modules[module_name] = entry
+        for name, tool in entry["tools"].items():
+            ToolRegistry.register_lazy(ToolEntry(name, f"{package}.{module_name}", tool["definition"], tuple(tool["backends"])))
+
+    if changed or modules.keys() != cached.keys():
+        save_manifest(manifest_path, modules)
+
+
+def save_manifest(path: str, modules: dict):
+    try:
+        manifest = {"version": MANIFEST_VERSION, "modules": modules}
+        atomic_write_bytes(path, (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+    except OSError as e:
+        # A read-only checkout still works, it just imports the changed modules on every start
+        logger.warning(f"Could not update the tool manifest {path}: {e}")
+
+
+if __name__ == "__main__":
+    # Rebuild a tool manifest from scratch, importing every tool: python -m core.tool_manifest [tools]
+    package = sys.argv[1] if len(sys.argv) > 1 else "tools"
+    package_dir = os.path.dirname(importlib.util.find_spec(package).origin)
+    modules = {
+        module_name: {
+            "source_hash": source_hash(os.path.join(package_dir, module_name + ".py")),
+            "tools": describe_module(package, module_name),
+        }
+        for module_name in tool_modules(package_dir)
+    }
+    save_manifest(os.path.join(package_dir, MANIFEST_FILE), modules)
+    print(f"Manifest written with {sum(len(module['tools']) for module in modules.values())} tools")
@@ -1,19 +1,97 @@
+import copy
+import importlib
+from typing import NamedTuple, Optional, Set, Tuple
+
+
+class ToolEntry(NamedTuple):
+    name: str
+    module: str  # Import path of the module that registers the tool
+    definition: Optional[dict]  # Cached result of get_definition, None when it has to be computed by the tool
+    backends: Tuple[str, ...] = ()  # The tool class's `backends`
+
+
+class LazyTool:
+    """
+    Stands in for a tool class whose module has not been imported yet. The definition is served from the cached
+    entry; anything else (run, validate_args, ...) imports the module and is forwarded to the real class.
+    """
+
+    def __init__(self, entry: ToolEntry):
+        self.entry = entry
+
+    def load(self):
+        return ToolRegistry.load(self.entry.name)
+
+    def get_name(self) -> str:
+        return self.entry.name
+
+    def get_definition(self, agent_self) -> dict:
+        tool = ToolRegistry.functions.get(self.entry.name)
+        if self.entry.definition is None or not isinstance(tool, LazyTool):
+            return self.load().get_definition(agent_self)
+        return copy.deepcopy(self.entry.definition)
+
+    def run(self, args: dict, agent_self) -> str:
+        return self.load().run(args, agent_self)
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        return f"LazyTool({self.entry.name!r}, module={self.entry.module!r})"
+
+
 class ToolRegistry:
+    # Tool name -> tool class, or a LazyTool until the module defining the tool is imported
     functions = {}
 
     @classmethod
     def register_function(cls, function_cls):
         cls.functions[function_cls.get_name()] = function_cls
 
+    @classmethod
+    def register_lazy(cls, entry: ToolEntry):
+        """Register a tool by import path, without importing it. A tool that is already loaded is kept."""
+        if not isinstance(cls.functions.get(entry.name, LazyTool(entry)), LazyTool):
+            return
+        cls.functions[entry.name] = LazyTool(entry)
+
+    @classmethod
+    def load(cls, name: str):
+        """The tool class registered as `name`, importing its module first if needed."""
+        tool = cls.functions[name]
+        if isinstance(tool, LazyTool):
+            importlib.import_module(tool.entry.module)
+            tool = cls.functions[name]
+            if isinstance(tool, LazyTool):
+                raise ImportError(f"Module {tool.entry.module} does not register the tool {name}")
+        return tool
+
+    @classmethod
+    def is_loaded(cls, name: str) -> bool:
+        return name in cls.functions and not isinstance(cls.functions[name], LazyTool)
+
+    @classmethod
+    def get_backends(cls, names) -> Set[str]:
+        """The backends used by the named tools, without importing them."""
+        backends = set()
+        for name in names:
+            tool = cls.functions.get(name)
+            if isinstance(tool, LazyTool):
+                backends.update(tool.entry.backends)
+            elif tool is not None:
+                backends.update(getattr(tool, "backends", ()))
+        return backends
+
     @classmethod
     def get_available_functions(cls):
         return cls.functions
-    
+
     @classmethod
     def get_available_function_names(cls):
         return list(cls.functions.keys())
-    
+
 
 def register_fn(cls):
     ToolRegistry.register_function(cls)
-    return cls
\ No newline at end of file
+    return cls
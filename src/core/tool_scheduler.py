@@ -0,0 +1,77 @@
+import os
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+# Resource keys name what a tool call reads and writes, e.g. "file:/abs/path", "kanban:<card id>", "memory:<id>" or
+# "neo4j". A key ending in "*" covers every key starting with what comes before it, so "*" alone covers everything.
+ResourceKeys = Tuple[Sequence[str], Sequence[str]]  # (reads, writes)
+
+EXCLUSIVE: ResourceKeys = ((), ("*",))  # Conflicts with every call that reads or writes anything
+NO_RESOURCES: ResourceKeys = ((), ())
+
+# Seconds a tool call may run before it is abandoned, and a whole turn of tool calls, unless the agent config sets
+# tool_timeouts ({"default": ..., "<tool name>": ...}) or turn_timeout
+DEFAULT_TOOL_TIMEOUT = 120
+DEFAULT_TURN_TIMEOUT = 900
+
+
+def file_key(path: str) -> str:
+    return "file:" + os.path.realpath(os.path.expanduser(path))
+
+
+def keys_overlap(first: str, second: str) -> bool:
+    if first.endswith("*") and second.startswith(first[:-1]):
+        return True
+    if second.endswith("*") and first.startswith(second[:-1]):
+        return True
+    return first == second
+
+
+def conflicts(first: ResourceKeys, second: ResourceKeys) -> bool:
+    """Whether two calls touch a common resource that at least one of them writes."""
+    first_reads, first_writes = first
+    second_reads, second_writes = second
+    return any(
+        keys_overlap(write, key)
+        for writes, others in ((first_writes, [*second_reads, *second_writes]), (second_writes, first_reads))
+        for write in writes
+        for key in others
+    )
+
+
+def build_dependencies(calls: List[ResourceKeys]) -> List[Set[int]]:
+    """
+    For each call, the indexes of the earlier calls it conflicts with and so has to wait for. Calls without
+    conflicts can run in parallel; conflicting ones run in the order they were made.
+    """
+    return [{earlier for earlier in range(index) if conflicts(calls[earlier], keys)} for index, keys in enumerate(calls)]
+
+
+def timeout_for(tool_name: str, tool_timeout: Optional[float], timeouts: Optional[Dict[str, float]] = None) -> float:
+    """The deadline of a call: configured for the tool, else what the tool asks for, else the configured default."""
+    timeouts = timeouts or {}
+    if tool_name in timeouts:
+        return timeouts[tool_name]
+    if tool_timeout is not None:
+        return tool_timeout
+    return timeouts.get("default", DEFAULT_TOOL_TIMEOUT)
+
+
+def run_detached(fn, *args) -> Future:
+    """
+    Run fn(*args) on a daemon thread. Unlike a thread pool worker, a call that never returns can be abandoned:
+    nothing waits for it, not even the interpreter on exit.
+    """
+    future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, name=f"tool-{getattr(fn, '__name__', 'call')}", daemon=True).start()
+    return future
@@ -0,0 +1,195 @@
+import argparse
+import atexit
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from core.idgen import generate_id
+
+
+class Span:
+    """A timed operation. Use through Tracer.span() as a context manager."""
+
+    __slots__ = ("tracer", "name", "attributes", "span_id", "parent_id", "thread_id", "start_ns", "start_wall_ns", "end_ns")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any], parent_id: Optional[str]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id = generate_id(12)
+        self.parent_id = parent_id
+        self.thread_id = threading.get_ident()
+        self.start_ns = 0
+        self.start_wall_ns = 0
+        self.end_ns = 0
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.tracer._push(self)
+        self.start_wall_ns = time.time_ns()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._pop(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "thread_id": self.thread_id,
+            "pid": os.getpid(),
+            "start_us": self.start_wall_ns // 1000,
+            "duration_us": (self.end_ns - self.start_ns) // 1000,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled, so instrumented code pays only for a method call."""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.trace_dir: Optional[str] = None
+        self._local = threading.local()
+        self._finished = deque(maxlen=100000)
+        self._jsonl_logger: Optional[logging.Logger] = None
+
+    def configure(self, trace_dir: str, max_bytes: int = 20 * 1024 * 1024, backup_count: int = 5):
+        """
+        Enable tracing. Finished spans go to a rotating trace_dir/spans.jsonl, and a Chrome/Perfetto
+        trace of the most recent spans is written to trace_dir when the process exits.
+        """
+        os.makedirs(trace_dir, exist_ok=True)
+
+        handler = logging.handlers.RotatingFileHandler(
+            os.path.join(trace_dir, "spans.jsonl"), maxBytes=max_bytes, backupCount=backup_count
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._jsonl_logger = logging.getLogger(f"{__name__}.spans")
+        self._jsonl_logger.propagate = False
+        self._jsonl_logger.setLevel(logging.INFO)
+        self._jsonl_logger.handlers = [handler]
+
+        if self.trace_dir is None:
+            atexit.register(self._export_on_exit)
+        self.trace_dir = trace_dir
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes, self._current_id())
+
+    def current_span(self):
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else NOOP_SPAN
+
+    def _current_id(self) -> Optional[str]:
+        stack = getattr(self._local, "stack", None)
+        return stack[-1].span_id if stack else None
+
+    def _push(self, span: Span):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(span)
+
+    def _pop(self, span: Span):
+        stack = self._local.stack
+        if stack and stack[-1] is span:
+            stack.pop()
+        self._finished.append(span)
+        if self._jsonl_logger:
+            self._jsonl_logger.info(json.dumps(span.to_dict(), default=str))
+
+    def finished_spans(self) -> List[Dict[str, Any]]:
+        return [span.to_dict() for span in list(self._finished)]
+
+    def export_chrome_trace(self, file_path: str):
+        write_chrome_trace(self.finished_spans(), file_path)
+
+    def _export_on_exit(self):
+        if self.enabled and self._finished:
+            self.export_chrome_trace(os.path.join(self.trace_dir, f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+
+
+def write_chrome_trace(spans: List[Dict[str, Any]], file_path: str):
+    """Write spans in the Chrome trace event format, loadable in chrome://tracing and ui.perfetto.dev."""
+    events = [
+        {
+            "name": span["name"],
+            "cat": span["name"].split(".")[0],
+            "ph": "X",
+            "ts": span["start_us"],
+            "dur": span["duration_us"],
+            "pid": span["pid"],
+            "tid": span["thread_id"],
+            "args": span["attributes"],
+        }
+        for span in spans
+    ]
+    with open(file_path, "w") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+def traced(name: str):
+    """Decorator that wraps a function in a span when tracing is enabled."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Shared tracer for the whole process, enabled by main() when JOE_TRACE_DIR is set.
+tracer = Tracer()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert span JSONL files into a Chrome/Perfetto trace.")
+    parser.add_argument("inputs", nargs="+", help="spans.jsonl files (rotated backups included)")
+    parser.add_argument("-o", "--output", default="trace.json")
+    cli_args = parser.parse_args()
+
+    all_spans = []
+    for input_path in cli_args.inputs:
+        with open(input_path, "r") as input_file:
+            all_spans.extend(json.loads(line) for line in input_file if line.strip())
+    write_chrome_trace(sorted(all_spans, key=lambda s: s["start_us"]), cli_args.output)
+    print(f"Wrote {len(all_spans)} spans to {cli_args.output}")
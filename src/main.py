@@ -1,19 +1,25 @@
 import json
 import logging
 import os
-import traceback
-import time
 from dotenv import load_dotenv
+from core.agent_scheduler import AgentScheduler
+from core.agent_wakeup import AgentWakeup
+from core.context_archive import ContextArchive
 from core.file_based_bank_account import FileBasedBankAccount
 from core.file_based_context import FileBasedContext
+from core.file_based_inbox import FileBasedInbox
 from core.file_based_kanban import FileBasedKanbanBoard
+from core.file_watcher import FileWatcher
+from core.lazy_proxy import LazyProxy
+from core.metrics import BANK_BALANCE, metrics, start_metrics_server
 from core.neo4j_client import Neo4jClient
 from core.tool_agent import ObjectConfig, TextConfig, ToolAgent
+from core.tool_registry import ToolRegistry
+from core.tracing import tracer
 from datetime import datetime
-import chromadb
 from typing import Any, Union
 
-# IMPORTANT: Import all tools so registry can be populated
+# IMPORTANT: Import the tools package so the registry is populated (tool modules load when first used)
 import tools
 
 # Configure logging
@@ -23,10 +29,23 @@ logger.setLevel(logging.INFO)
 # Load environment variables from .env file
 load_dotenv()
 
-def run_agent(task_agent: ToolAgent, user_name: str, user_input: Union[str, None] = None, sys_message_suffix: Union[str, None] = None) -> Union[dict[str, Any], None]:
+INBOX_FOLDER = "memory/inbox"
+ARCHIVE_FOLDER = "memory/context_archive"
+
+
+def run_agent(
+    task_agent: ToolAgent,
+    user_name: str,
+    user_input: Union[str, None] = None,
+    sys_message_suffix: Union[str, None] = None,
+    input_messages: Union[list[dict[str, Any]], None] = None,
+) -> Union[dict[str, Any], None]:
     logger.info(f"Running Agent {task_agent.agent_key}...")
+    input_messages = list(input_messages or [])
+    if user_input:
+        input_messages.append({"role": "user", "name": user_name, "content": user_input})
     response = task_agent.run(
-        input_messages=[{"role": "user", "name": user_name, "content": user_input}] if user_input else None,
+        input_messages=input_messages or None,
         sys_message_suffix=sys_message_suffix,
     )
     if response and response.get("status") == "success":
@@ -35,8 +54,16 @@ def run_agent(task_agent: ToolAgent, user_name: str, user_input: Union[str, None
     return None
 
 
+def open_collection(name: str):
+    import chromadb
+    client = chromadb.PersistentClient(path="memory/chroma_db")
+    collection = client.get_or_create_collection(name=name)
+    logging.info(f"Collection {name} Loaded: {collection.count()} documents")
+    return collection
+
+
 def create_agent_config(
-    agent_config, agent_id, bank_account, memory_collection, kanban, neo4j
+    agent_config, agent_id, bank_account, memory_collection, kanban, neo4j, context_archive=None
 ):
     response_format = ""
     if "response_format" in agent_config.get("kwargs", {}):
@@ -48,20 +75,25 @@ def create_agent_config(
         available_functions=agent_config["available_functions"],
         system_message=agent_config["system_message"] + response_format,
         kwargs=agent_config.get("kwargs", {}),
+        fallback_models=agent_config.get("fallback_models"),
+        tool_output_budgets=agent_config.get("tool_output_budgets"),
+        tool_timeouts=agent_config.get("tool_timeouts"),
+        turn_timeout=agent_config.get("turn_timeout"),
     )
     object_config = ObjectConfig(
         agent_id=agent_id,
-        agent_service=FileBasedContext(agent_id=agent_id, folder="memory/context"),
+        agent_service=FileBasedContext(agent_id=agent_id, folder="memory/context", archive=context_archive),
         bank_account=bank_account,
         chroma_db_collection=memory_collection,
         kanban_board=kanban,
         neo4j=neo4j,
+        inbox=FileBasedInbox(agent_id=agent_id, folder=INBOX_FOLDER),
     )
 
     return text_config, object_config
 
 
-def load_agent_configs(config_filename, bank_account, memory_collection, kanban, neo4j):
+def load_agent_configs(config_filename, bank_account, memory_collection, kanban, neo4j, context_archive=None):
     # Get the directory of the current script
     script_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -71,20 +103,50 @@ def load_agent_configs(config_filename, bank_account, memory_collection, kanban,
     with open(config_path, "r") as file:
         config = json.load(file)
 
-    # Config for the Answer Agent
-    task_agent_config = create_agent_config(
-        config["task_agent"], "ta002", bank_account, memory_collection, kanban, neo4j
-    )
-
-    return {"task_agent": task_agent_config}
+    # Every top level entry is an agent. "instances" runs several copies of it against the same board and account.
+    agent_configs = {}
+    for name, agent_config in config.items():
+        agent_id = agent_config.get("agent_id", name)
+        scheduling = {
+            "priority": agent_config.get("priority", 1),
+            "budget": agent_config.get("budget"),
+            # Idle agents back off from idle_backoff_base up to idle_backoff_max seconds between turns.
+            "idle_backoff": {"idle_base": agent_config.get("idle_backoff_base", 5.0), "idle_max": agent_config.get("idle_backoff_max", 300.0)},
+            # Directories whose changes should wake the agent, besides the kanban board and its inbox.
+            "watch_paths": agent_config.get("watch_paths", []),
+        }
+
+        for index in range(agent_config.get("instances", 1)):
+            instance_config, instance_id = agent_config, agent_id
+            if index > 0:
+                instance_config = {**agent_config, "agent_key": f"{agent_config['agent_key']}_{index + 1}"}
+                instance_id = f"{agent_id}_{index + 1}"
+
+            text_config, object_config = create_agent_config(
+                instance_config, instance_id, bank_account, memory_collection, kanban, neo4j, context_archive
+            )
+            agent_configs[text_config.agent_key] = (text_config, object_config, scheduling)
+
+    return agent_configs
 
 
 def main():
-    # Initialize Collection for this Agent
-    client = chromadb.PersistentClient(path="memory/chroma_db")
-    neo4j = Neo4jClient()
-    memory_collection = client.get_or_create_collection(name="coder_db")
-    logging.info(f"Collection Loaded: {memory_collection.count()} documents")
+    # Tracing is off unless a trace directory is configured
+    trace_dir = os.getenv("JOE_TRACE_DIR")
+    if trace_dir:
+        tracer.configure(trace_dir)
+
+    # Expose runtime metrics for scraping, set METRICS_PORT to an empty string to disable
+    metrics_port = os.getenv("METRICS_PORT", "9464")
+    if metrics_port:
+        start_metrics_server(metrics, int(metrics_port), host=os.getenv("METRICS_HOST", "127.0.0.1"))
+
+    # The memory collection and graph database connect on first use, so agents that need neither run without them
+    memory_collection = LazyProxy(lambda: open_collection("coder_db"), "chroma")
+    neo4j = LazyProxy(Neo4jClient, "neo4j")
+
+    # Messages trimmed from an agent's context are archived here rather than deleted
+    context_archive = ContextArchive(folder=ARCHIVE_FOLDER)
 
     # Initialize Kanban Board
     kanban = FileBasedKanbanBoard(board_id="kb1", folder="memory/kanban")
@@ -95,40 +157,89 @@ def main():
     )
 
     configs = load_agent_configs(
-        "agent_config.json", bank_account, memory_collection, kanban, neo4j
+        "agent_config.json", bank_account, memory_collection, kanban, neo4j, context_archive
+    )
+
+    # Connect in the background to the backends the enabled tools use, while the first turns start
+    enabled_functions = {name for text_config, _, _ in configs.values() for name in text_config.available_functions}
+    backends = {
+        "chroma": memory_collection,
+        "neo4j": neo4j,
+        "context_archive": LazyProxy(lambda: open_collection("context_archive"), "context_archive"),
+    }
+    required_backends = ToolRegistry.get_backends(enabled_functions)
+    for backend in required_backends:
+        backends[backend].warm_up()
+
+    # The archive is embedded for context_recall only when an agent can use it; segments are indexed later otherwise
+    if "context_archive" in required_backends:
+        context_archive.collection = backends["context_archive"]
+        context_archive.start_indexer()
+
+    def run_turn(task_agent: ToolAgent) -> Union[dict[str, Any], None]:
+        current_balance = bank_account.get_balance()
+        logging.info(f"Current balance: ${current_balance}")
+        BANK_BALANCE.set(float(current_balance), account=bank_account.account_id)
+
+        # Messages posted to the inbox since the last turn become this turn's input
+        inbox = task_agent.object_config.inbox
+        inbox_messages = inbox.drain() if inbox else []
+
+        suffix = f"\n\nCurrent Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\nCurrent Account Balance: ${current_balance:.2f}"
+        answer_output = run_agent(
+            task_agent=task_agent, user_name="user", user_input=None, sys_message_suffix=suffix, input_messages=inbox_messages
+        )
+        if not answer_output:
+            logging.warning(f"Agent {task_agent.agent_key} returned no output...")
+            return None
+
+        print(json.dumps(answer_output.get("output"), indent=2))
+        return answer_output
+
+    # Run every configured agent, by default all of them concurrently.
+    # The 0.2s turn delay simulates human response time between turns of the same agent.
+    scheduler = AgentScheduler(
+        bank_account,
+        run_turn,
+        max_concurrency=int(os.getenv("MAX_CONCURRENT_AGENTS", len(configs))),
+        turn_delay=0.2,
     )
 
-    task_agent = ToolAgent(*configs["task_agent"])
-
-    num_errors = 0
-    while True:
-        try:
-            current_balance = bank_account.get_balance()
-            logging.info(f"Current balance: ${current_balance}")
-
-            # Add some delay to simulate human response time
-            time.sleep(0.2)
-
-            if current_balance <= 0:
-                logging.info("Bank account balance depleted, exiting...")
-                break
-
-            suffix = f"\n\nCurrent Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\nCurrent Account Balance: ${current_balance:.2f}"
-            answer_output = run_agent(task_agent=task_agent, user_name="user", user_input=None, sys_message_suffix=suffix)
-            if not answer_output:
-                logging.warn("Agent returned no output...")
-                num_errors += 1
-                continue
-
-            print(json.dumps(answer_output.get("output"), indent=2))
-            num_errors = 0
-        except Exception as e:
-            traceback.print_exc()
-            logging.error(f"Error: {e}")
-            num_errors += 1
-            if num_errors >= 3:
-                logging.error(f"Max sequential errors reached, exiting...")
-                break
+    # Idle agents sleep until the kanban board changes, a message lands in their inbox or a watched directory changes.
+    wakeups = {}
+    watchers = {}
+
+    def notify_agents(path: str):
+        directory, filename = os.path.split(path)
+        if path == os.path.abspath(kanban.file_path):
+            for wakeup in wakeups.values():
+                wakeup.notify("kanban")
+        elif directory == os.path.abspath(INBOX_FOLDER) and filename.endswith("_inbox.jsonl"):
+            # Draining truncates the file, which is not news
+            wakeup = wakeups.get(filename[: -len("_inbox.jsonl")])
+            if wakeup and os.path.exists(path) and os.path.getsize(path) > 0:
+                wakeup.notify("inbox")
+        for wakeup in watchers.get(directory, []):
+            wakeup.notify("watch")
+
+    watcher = FileWatcher(notify_agents)
+    watcher.watch(os.path.dirname(kanban.file_path))
+    watcher.watch(INBOX_FOLDER)
+    for text_config, object_config, scheduling in configs.values():
+        wakeup = AgentWakeup(text_config.agent_key, **scheduling["idle_backoff"])
+        wakeups[object_config.agent_id] = wakeup
+        for directory in scheduling["watch_paths"]:
+            watcher.watch(directory)
+            watchers.setdefault(os.path.abspath(directory), []).append(wakeup)
+        scheduler.add_agent(ToolAgent(text_config, object_config), scheduling["priority"], scheduling["budget"], wakeup)
+
+    watcher.start()
+    try:
+        scheduler.run()
+    finally:
+        watcher.stop()
+        context_archive.stop_indexer()
+        neo4j.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+import argparse
+import glob
+import importlib
+import json
+import os
+import sys
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'benchmarks', 'baseline.json')
+
+
+def result_key(result):
+    return f"{result['benchmark']}/{result['size']}/{result['phase']}"
+
+
+def find_regressions(results, baseline, threshold, min_delta_ms):
+    """Return (key, baseline_ms, current_ms) for every result slower than baseline * threshold."""
+    regressions = []
+    for result in results:
+        previous = baseline.get(result_key(result))
+        if previous is None:
+            continue
+        current = result['median_ms']
+        if current > previous * threshold and current - previous > min_delta_ms:
+            regressions.append((result_key(result), previous, current))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the agent overhead benchmarks (no LLM latency included).")
+    parser.add_argument('--sizes', default='10,100,1000,10000', help="Comma separated synthetic history sizes")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per phase")
+    parser.add_argument('--pattern', default='*_bench.py', help="Benchmark module file pattern")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=1.5, help="Fail when median time exceeds baseline by this factor")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help="Ignore regressions smaller than this many ms")
+    parser.add_argument('--json', dest='json_path', help="Also write the raw results to this file")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    bench_dir = os.path.join(os.path.dirname(__file__), 'benchmarks')
+
+    # Discover and run benchmarks
+    results = []
+    for path in sorted(glob.glob(os.path.join(bench_dir, args.pattern))):
+        module = importlib.import_module('benchmarks.' + os.path.basename(path)[:-3])
+        results.extend(module.run_benchmarks(sizes=sizes, repeat=args.repeat))
+
+    print(f"{'benchmark':<14}{'size':>7}  {'phase':<22}{'min ms':>10}{'median ms':>11}{'peak KiB':>11}")
+    for result in results:
+        print(f"{result['benchmark']:<14}{result['size']:>7}  {result['phase']:<22}"
+              f"{result['min_ms']:>10.3f}{result['median_ms']:>11.3f}{result['peak_kib']:>11.1f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump({result_key(r): r['median_ms'] for r in results}, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.threshold, args.min_delta_ms)
+        for key, previous, current in regressions:
+            print(f"REGRESSION {key}: {previous:.3f}ms -> {current:.3f}ms")
+        if regressions:
+            sys.exit(1)
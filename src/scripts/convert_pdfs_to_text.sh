@@ -1,9 +1,4 @@
 #!/bin/bash
-# Navigate to the downloads directory
-cd downloads
-
-# Iterate over all PDF files in the current directory
-for pdf in *.pdf; do
-    # Use the pdf_to_text.py script to convert the PDF to text
-    python3 ../scripts/pdf_to_text.py "$pdf"
-done
\ No newline at end of file
+# Convert every PDF in the downloads directory to text. PDFs converted by an
+# earlier run are skipped, using the manifest pdf_to_text.py keeps in downloads/.
+python3 "$(dirname "$0")/pdf_to_text.py" downloads "$@"
@@ -1,45 +1,152 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import json
 import os
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from http_batch import HostLimiter, create_session
 
-# Ensure the downloads folder exists
-os.makedirs('downloads', exist_ok=True)
+# Download the PDFs of recent arXiv submissions into downloads/.
+#
+# Files already downloaded are skipped (or revalidated with ETag / Last-Modified with --revalidate), interrupted
+# downloads are resumed from their .part file with an HTTP Range request, and at most --per-host requests run
+# against one host at a time. downloads/manifest.json records the URL, validators and size of every file fetched.
 
-# Function to download a single PDF
-def download_pdf(pdf_url, filename):
-    response = requests.get(pdf_url)
-    response.raise_for_status()
-    file_path = os.path.join('downloads', filename+'.pdf')
-    with open(file_path, 'wb') as file:
-        file.write(response.content)
-    print(f'Downloaded {filename}.pdf')
+LIST_URL = 'https://arxiv.org/list/cs/recent'
+DOWNLOAD_FOLDER = 'downloads'
+MANIFEST_FILE = 'manifest.json'
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = (5, 60)
+
+
+class Manifest:
+    """filename -> {url, etag, last_modified, size, fetched_at}, rewritten atomically after every change."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
 
-# Endpoint for recent computer science submissions on arXiv
-url = 'https://arxiv.org/list/cs/recent'
+    def get(self, filename):
+        with self._lock:
+            return self.entries.get(filename, {})
 
-# Perform an HTTP GET request
-response = requests.get(url)
-response.raise_for_status()
+    def record(self, filename, entry):
+        with self._lock:
+            self.entries[filename] = entry
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as file:
+                json.dump(self.entries, file, indent=2)
+            os.replace(self.path + '.tmp', self.path)
 
-# Parse the HTML content
-soup = BeautifulSoup(response.text, 'html.parser')
 
-# Find all 'dt' tags because they contain the paper links
-paper_dt_tags = soup.find_all('dt')
+def find_pdf_links(session, list_url):
+    """(url, filename) of every 'Download PDF' link on an arXiv listing page."""
+    response = session.get(list_url, timeout=TIMEOUT)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, 'html.parser')
 
-# Download each paper using ThreadPoolExecutor
-with ThreadPoolExecutor(max_workers=5) as executor:
-    futures = []
-    for paper_dt in paper_dt_tags:
+    links = []
+    # The 'dt' tags contain the paper links
+    for paper_dt in soup.find_all('dt'):
         paper_link_tag = paper_dt.find('a', title='Download PDF')
-        if paper_link_tag:
-            pdf_href = paper_link_tag.get('href')
-            if pdf_href.startswith('/'):
-                pdf_href = f'https://arxiv.org{pdf_href}'
-                filename = pdf_href.split('/')[-1]
-                futures.append(executor.submit(download_pdf, pdf_href, filename))
-
-    # Wait for all downloads to complete
-    for future in futures:
-        future.result()
\ No newline at end of file
+        if paper_link_tag and paper_link_tag.get('href'):
+            pdf_href = urljoin(list_url, paper_link_tag['href'])
+            links.append((pdf_href, pdf_href.rstrip('/').split('/')[-1]))
+    return links
+
+
+def download_pdf(session, limiter, manifest, pdf_url, filename, folder, revalidate=False):
+    """Stream one PDF to <filename>.pdf.part and rename it into place. Returns 'skipped', 'unchanged' or 'downloaded'."""
+    file_path = os.path.join(folder, filename + '.pdf')
+    part_path = file_path + '.part'
+    known = manifest.get(filename)
+
+    headers = {}
+    if os.path.exists(file_path):
+        if not revalidate:
+            return 'skipped'
+        if known.get('etag'):
+            headers['If-None-Match'] = known['etag']
+        if known.get('last_modified'):
+            headers['If-Modified-Since'] = known['last_modified']
+    elif os.path.exists(part_path):
+        # Resume where the last attempt stopped; If-Range makes the server send the whole file if it changed since
+        headers['Range'] = f'bytes={os.path.getsize(part_path)}-'
+        if known.get('etag') or known.get('last_modified'):
+            headers['If-Range'] = known.get('etag') or known['last_modified']
+
+    with limiter.limit(pdf_url):
+        with session.get(pdf_url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+            if response.status_code == 304:
+                return 'unchanged'
+            if response.status_code != 416:
+                response.raise_for_status()
+                entry = save_body(response, manifest, pdf_url, filename, known, part_path)
+
+    if response.status_code == 416:
+        # The partial file is no longer a prefix of what the server has, start again
+        os.remove(part_path)
+        return download_pdf(session, limiter, manifest, pdf_url, filename, folder, revalidate)
+
+    os.replace(part_path, file_path)
+    manifest.record(filename, {**entry, 'size': os.path.getsize(file_path), 'complete': True, 'fetched_at': time.time()})
+    return 'downloaded'
+
+
+def save_body(response, manifest, pdf_url, filename, known, part_path):
+    """Stream the body to the .part file, appending to it for a 206. Returns the response's validators."""
+    entry = {
+        'url': pdf_url,
+        'etag': response.headers.get('ETag', known.get('etag')),
+        'last_modified': response.headers.get('Last-Modified', known.get('last_modified')),
+    }
+    if response.status_code != 206:
+        # Recorded before the body, so a run interrupted mid-download can resume with If-Range
+        manifest.record(filename, {**entry, 'complete': False})
+    with open(part_path, 'ab' if response.status_code == 206 else 'wb') as file:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            file.write(chunk)
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download the PDFs of recent arXiv submissions.')
+    parser.add_argument('--list-url', default=LIST_URL, help='The arXiv listing page to download from')
+    parser.add_argument('--folder', default=DOWNLOAD_FOLDER, help='Where to save the PDFs')
+    parser.add_argument('--workers', type=int, default=5, help='Number of downloads in flight')
+    parser.add_argument('--per-host', type=int, default=4, help='Maximum concurrent requests to one host')
+    parser.add_argument('--revalidate', action='store_true', help='Check downloaded files for changes instead of skipping them')
+    args = parser.parse_args()
+
+    # Ensure the downloads folder exists
+    os.makedirs(args.folder, exist_ok=True)
+    session = create_session(pool_size=args.workers)
+    limiter = HostLimiter(args.per_host)
+    manifest = Manifest(os.path.join(args.folder, MANIFEST_FILE))
+
+    def fetch(link):
+        pdf_url, filename = link
+        try:
+            outcome = download_pdf(session, limiter, manifest, pdf_url, filename, args.folder, args.revalidate)
+        except Exception as e:
+            print(f'Failed to download {filename}.pdf: {e}')
+            return 'failed'
+        if outcome == 'downloaded':
+            print(f'Downloaded {filename}.pdf')
+        return outcome
+
+    links = find_pdf_links(session, args.list_url)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        outcomes = list(executor.map(fetch, links))
+
+    print(', '.join(f'{outcomes.count(outcome)} {outcome}' for outcome in ('downloaded', 'unchanged', 'skipped', 'failed')))
+
+
+if __name__ == '__main__':
+    main()
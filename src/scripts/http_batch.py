@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlencode, urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared plumbing for the scripts that fetch many URLs: a pooled session with retries, a per-host limiter,
+# a short-lived on-disk response cache and JSON lines output. The scripts run standalone (python scripts/x.py),
+# so this sits next to them instead of in core.
+
+TIMEOUT = (5, 30)
+CACHE_FOLDER = os.path.join('tmp', 'http_cache')
+
+
+def create_session(pool_size=10):
+    """A keep-alive session that retries connection errors, 429 and 5xx with exponential backoff."""
+    retry = Retry(total=5, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504), respect_retry_after_header=True)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = 'Mozilla/5.0 (compatible; joe-sim-ai scripts)'
+    return session
+
+
+class HostLimiter:
+    """Bounds how many requests run against each host at once, and optionally how many start per second."""
+
+    def __init__(self, per_host, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._semaphores = defaultdict(lambda: threading.BoundedSemaphore(per_host))
+        self._next_start = defaultdict(float)
+
+    @contextmanager
+    def limit(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores[host]
+        with semaphore:
+            if self.interval:
+                with self._lock:
+                    # Reserve the next start slot for this host, then sleep until it comes
+                    start = max(time.monotonic(), self._next_start[host])
+                    self._next_start[host] = start + self.interval
+                time.sleep(max(0.0, start - time.monotonic()))
+            yield
+
+
+class ResponseCache:
+    """Response bodies kept on disk for `ttl` seconds, so repeated runs within the TTL make no requests."""
+
+    def __init__(self, ttl, folder=CACHE_FOLDER):
+        self.ttl = ttl
+        self.folder = folder
+
+    def _path(self, url):
+        return os.path.join(self.folder, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url):
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+        return entry['body'] if entry['expires'] >= time.time() else None
+
+    def set(self, url, body):
+        os.makedirs(self.folder, exist_ok=True)
+        path = self._path(url)
+        # Write then rename, so a concurrent reader never sees half an entry
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'body': body, 'expires': time.time() + self.ttl}, file)
+        os.replace(temp_path, path)
+
+
+class Fetcher:
+    """GETs through one session, limited per host, with successful bodies cached."""
+
+    def __init__(self, cache_ttl, per_host=4, rate=None, pool_size=10):
+        self.session = create_session(pool_size)
+        self.limiter = HostLimiter(per_host, rate)
+        self.cache = ResponseCache(cache_ttl) if cache_ttl > 0 else None
+
+    def get(self, url, params=None, headers=None):
+        """(status_code, body). Cached bodies are returned with status 200."""
+        full_url = f'{url}?{urlencode(params)}' if params else url
+        if self.cache:
+            body = self.cache.get(full_url)
+            if body is not None:
+                return 200, body
+        with self.limiter.limit(url):
+            response = self.session.get(full_url, headers=headers, timeout=TIMEOUT)
+        if response.status_code == 200 and self.cache:
+            self.cache.set(full_url, response.text)
+        return response.status_code, response.text
+
+
+def read_items(args):
+    """The items named on the command line, or one per line on stdin when there are none (or the only one is -)."""
+    if args and args != ['-']:
+        return list(dict.fromkeys(args))
+    items = (line.strip() for line in sys.stdin)
+    return list(dict.fromkeys(item for item in items if item and not item.startswith('#')))
+
+
+def emit_json_lines(func, items, workers):
+    """Run func over items concurrently, printing each result as a JSON line in input order."""
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as executor:
+        for result in executor.map(func, items):
+            print(json.dumps(result), flush=True)
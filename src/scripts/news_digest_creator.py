@@ -1,7 +1,8 @@
+import argparse
+import json
 import os
-import sys
-import requests
 from dotenv import load_dotenv
+from http_batch import Fetcher, emit_json_lines, read_items
 
 # Load the environment variables
 load_dotenv()
@@ -12,39 +13,80 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
 # News API URL for fetching top headlines
 NEWS_API_URL = 'https://newsapi.org/v2/top-headlines'
+CACHE_TTL = 600  # Headlines are reused for ten minutes
 
 # Set the headers with the News API Key
 headers = {
     'Authorization': f'Bearer {NEWS_API_KEY}'
 }
 
+_fetcher = None
+
+
+def get_fetcher():
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = Fetcher(cache_ttl=CACHE_TTL)
+    return _fetcher
+
+
 # Function to fetch top headlines
-def fetch_top_headlines(topic):
+def fetch_top_headlines(topic, fetcher=None, page_size=5):
     # Define the parameters for the query
     params = {
         'q': topic, # The topic to search for
         'language': 'en', # The language of the articles
-        'pageSize': 5 # The number of articles to return
+        'pageSize': page_size # The number of articles to return
     }
     # Make the request to the News API
-    response = requests.get(NEWS_API_URL, headers=headers, params=params)
+    status, body = (fetcher or get_fetcher()).get(NEWS_API_URL, params=params, headers=headers)
     # Check if the response is successful
-    if response.status_code == 200:
+    if status == 200:
         # Extract the articles from the response
-        return response.json().get('articles', [])
+        return json.loads(body).get('articles', [])
     else:
         # Return an error message if the call was unsuccessful
-        return f'Error: {response.status_code} with message {response.json().get("message")}'
+        try:
+            message = json.loads(body).get("message")
+        except ValueError:
+            message = body[:200]
+        return f'Error: {status} with message {message}'
 
-# Get topic from command line arguments
-if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print('Usage: python news_digest_creator.py <topic>')
-        sys.exit(1)
-    topic = sys.argv[1]
-    articles = fetch_top_headlines(topic)
+
+def digest(topic, fetcher, page_size):
+    """One JSON line: the topic's articles (title, url, description), or an error."""
+    try:
+        articles = fetch_top_headlines(topic, fetcher, page_size)
+    except Exception as e:
+        articles = f'Error: {e}'
     if isinstance(articles, str):
-        print(articles) # Print the error message
+        return {'topic': topic, 'error': articles}
+    return {
+        'topic': topic,
+        'articles': [{key: article.get(key) for key in ('title', 'url', 'description')} for article in articles]
+    }
+
+
+# Get topics from command line arguments or stdin
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fetch top headlines for topics from the News API.')
+    parser.add_argument('topics', nargs='*', help='Topics, or - (or nothing) to read one per line from stdin')
+    parser.add_argument('--json', action='store_true', help='Print JSON lines even for a single topic')
+    parser.add_argument('--page-size', type=int, default=5, help='Articles per topic')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent requests')
+    parser.add_argument('--rate', type=float, default=2, help='Requests started per second against the News API')
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL, help='Seconds to reuse fetched headlines, 0 to disable')
+    args = parser.parse_args()
+
+    topics = read_items(args.topics)
+    fetcher = Fetcher(cache_ttl=args.cache_ttl, rate=args.rate, pool_size=args.workers)
+    if len(topics) == 1 and args.topics != ['-'] and args.topics and not args.json:
+        articles = fetch_top_headlines(topics[0], fetcher, args.page_size)
+        if isinstance(articles, str):
+            print(articles) # Print the error message
+        else:
+            for article in articles:
+                print(f'{article.get("title")}\n{article.get("url")}\n{article.get("description")}\n')
     else:
-        for article in articles:
-            print(f'{article.get("title")}\n{article.get("url")}\n{article.get("description")}\n')
+        # One JSON object per topic, in the order given: {"topic", "articles"} or {"topic", "error"}
+        emit_json_lines(lambda topic: digest(topic, fetcher, args.page_size), topics, args.workers)
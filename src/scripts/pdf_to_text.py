@@ -1,22 +1,132 @@
+import argparse
+import hashlib
+import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from PyPDF2 import PdfReader
 
-# Here we're assuming that the first argument to the script is the PDF file name,
-# and the script resides in the same directory as the PDF file.
-pdf_file_path = sys.argv[1]
-text_file_path = sys.argv[1].replace('.pdf', '.txt')
+# Extract text from PDFs, one page range per worker process, streaming pages to the .txt file in order.
+#
+#   python pdf_to_text.py paper.pdf               writes paper.txt next to the PDF
+#   python pdf_to_text.py downloads other.pdf     converts every PDF in downloads/ and other.pdf
+#
+# Converted files are recorded by content hash in a manifest, so running the same batch again only
+# converts new or changed PDFs. Use --force to convert everything again.
 
-# Create a new PdfReader.
-pdf = PdfReader(pdf_file_path)
+PAGES_PER_TASK = 16
+MANIFEST_FILE = "pdf_to_text_manifest.json"
 
-text_content = ''
 
-# Extract text from each page of the PDF.
-for page in pdf.pages:
-    text_content += page.extract_text() + '\n'
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
 
-# Write the extracted text to a text file.
-with open(text_file_path, 'w', encoding='utf-8') as text_file:
-    text_file.write(text_content)
 
-print(f'Text extracted from {pdf_file_path} to {text_file_path}')
\ No newline at end of file
+def collect_pdfs(inputs):
+    pdfs = []
+    for path in inputs:
+        if os.path.isdir(path):
+            pdfs.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith('.pdf')))
+        else:
+            pdfs.append(path)
+    return list(dict.fromkeys(pdfs))
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    # Write then rename, so an interrupted run never leaves a half-written manifest
+    with open(path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def extract_pages(pdf_file_path, start, stop):
+    """Text of pages [start, stop), run in a worker process with its own reader."""
+    pdf = PdfReader(pdf_file_path)
+    return [(pdf.pages[index].extract_text() or '') + '\n' for index in range(start, stop)]
+
+
+def text_path_for(pdf_file_path, output_dir):
+    text_file_path = os.path.splitext(pdf_file_path)[0] + '.txt'
+    if output_dir:
+        text_file_path = os.path.join(output_dir, os.path.basename(text_file_path))
+    return text_file_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract the text of PDF files, in parallel, skipping ones already converted.')
+    parser.add_argument('inputs', nargs='+', help='PDF files, or directories of PDF files')
+    parser.add_argument('--output-dir', help='Where to write the .txt files (default: next to each PDF)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of worker processes')
+    parser.add_argument('--pages-per-task', type=int, default=PAGES_PER_TASK, help='Pages extracted by one task')
+    parser.add_argument('--manifest', help=f'Manifest of converted files (default: {MANIFEST_FILE} in the output directory, '
+                                           'or next to the first input)')
+    parser.add_argument('--force', action='store_true', help='Convert files even if the manifest has them')
+    args = parser.parse_args()
+
+    pdfs = collect_pdfs(args.inputs)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    first_input = args.inputs[0] if os.path.isdir(args.inputs[0]) else os.path.dirname(args.inputs[0])
+    manifest_path = args.manifest or os.path.join(args.output_dir or first_input, MANIFEST_FILE)
+    manifest = load_manifest(manifest_path)
+
+    # Hash and count pages first, so every page range can be queued on the pool up front
+    jobs = []
+    failures = 0
+    for pdf_file_path in pdfs:
+        text_file_path = text_path_for(pdf_file_path, args.output_dir)
+        try:
+            content_hash = file_sha256(pdf_file_path)
+            done = manifest.get(content_hash)
+            if not args.force and done and os.path.exists(done['output']):
+                print(f'Skipping {pdf_file_path}, already extracted to {done["output"]}')
+                continue
+            page_count = len(PdfReader(pdf_file_path).pages)
+        except Exception as e:
+            failures += 1
+            print(f'Failed to read {pdf_file_path}: {e}', file=sys.stderr)
+            continue
+        jobs.append((pdf_file_path, text_file_path, content_hash, page_count))
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        queued = [
+            [executor.submit(extract_pages, pdf_file_path, start, min(start + args.pages_per_task, page_count))
+             for start in range(0, page_count, args.pages_per_task)]
+            for pdf_file_path, _, _, page_count in jobs
+        ]
+
+        for (pdf_file_path, text_file_path, content_hash, page_count), futures in zip(jobs, queued):
+            # Ranges are written in page order as they finish, while later ranges are still being extracted
+            try:
+                with open(text_file_path + '.part', 'w', encoding='utf-8') as text_file:
+                    for future in futures:
+                        text_file.writelines(future.result())
+                os.replace(text_file_path + '.part', text_file_path)
+            except Exception as e:
+                failures += 1
+                print(f'Failed to extract {pdf_file_path}: {e}', file=sys.stderr)
+                for future in futures:
+                    future.cancel()
+                continue
+
+            manifest[content_hash] = {'source': pdf_file_path, 'output': text_file_path, 'pages': page_count}
+            save_manifest(manifest_path, manifest)
+            print(f'Text extracted from {pdf_file_path} to {text_file_path}')
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,6 @@
-import requests
+import argparse
 from bs4 import BeautifulSoup
-import sys
+from http_batch import Fetcher, emit_json_lines, read_items
 
 # Mapping of known ticker changes - this can be updated as needed
 TICKER_CHANGES = {
@@ -8,29 +8,65 @@ TICKER_CHANGES = {
     # Add more mappings here as they occur
 }
 
-def fetch_stock_price(ticker):
-    url = f"https://finance.yahoo.com/quote/{ticker}"
-    response = requests.get(url)
-    if response.status_code != 200:
+QUOTE_URL = 'https://finance.yahoo.com/quote/{}'
+CACHE_TTL = 60  # Prices are reused for a minute
+
+_fetcher = None
+
+
+def get_fetcher():
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = Fetcher(cache_ttl=CACHE_TTL)
+    return _fetcher
+
+
+def fetch_stock_price(ticker, fetcher=None):
+    # Renamed tickers are resolved up front, rather than retried after a miss
+    symbol = TICKER_CHANGES.get(ticker, ticker)
+    status, body = (fetcher or get_fetcher()).get(QUOTE_URL.format(symbol))
+    if status != 200:
         # Handle response errors (page not found, server error, etc.)
-        return f"Error fetching stock data: {response.status_code}"
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
-    price_tag = soup.find('fin-streamer', {'data-symbol': ticker})
-    
+        return f"Error fetching stock data: {status}"
+
+    soup = BeautifulSoup(body, 'html.parser')
+    price_tag = soup.find('fin-streamer', {'data-symbol': symbol})
     if not price_tag:
-        new_ticker = TICKER_CHANGES.get(ticker)
-        if new_ticker:
-            print(f"Redirecting to new ticker symbol: {new_ticker}")
-            return fetch_stock_price(new_ticker)
         return f"Stock ticker {ticker} not found."
-    
     return price_tag['value']
 
+
+def quote(ticker, fetcher):
+    """One JSON line: the price, or an error."""
+    result = {'ticker': ticker}
+    if ticker in TICKER_CHANGES:
+        result['symbol'] = TICKER_CHANGES[ticker]
+    try:
+        price = fetch_stock_price(ticker, fetcher)
+    except Exception as e:
+        price = f"Error fetching stock data: {e}"
+    if price.startswith(('Error', 'Stock ticker')):
+        result['error'] = price
+    else:
+        result['price'] = price
+    return result
+
+
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print("Usage: python stock_price_fetcher.py <ticker>")
-        sys.exit(1)
-    ticker = sys.argv[1]
-    price = fetch_stock_price(ticker)
-    print(f"Current price of {ticker} stock: {price}")
+    parser = argparse.ArgumentParser(description='Fetch current stock prices from Yahoo Finance.')
+    parser.add_argument('tickers', nargs='*', help='Ticker symbols, or - (or nothing) to read one per line from stdin')
+    parser.add_argument('--json', action='store_true', help='Print JSON lines even for a single ticker')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent requests')
+    parser.add_argument('--rate', type=float, default=5, help='Requests started per second against Yahoo')
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL, help='Seconds to reuse a fetched quote, 0 to disable')
+    args = parser.parse_args()
+
+    tickers = read_items(args.tickers)
+    fetcher = Fetcher(cache_ttl=args.cache_ttl, rate=args.rate, pool_size=args.workers)
+    if len(tickers) == 1 and args.tickers != ['-'] and args.tickers and not args.json:
+        ticker = tickers[0]
+        price = fetch_stock_price(ticker, fetcher)
+        print(f"Current price of {ticker} stock: {price}")
+    else:
+        # One JSON object per ticker, in the order given: {"ticker", "price"} or {"ticker", "error"}
+        emit_json_lines(lambda ticker: quote(ticker, fetcher), tickers, args.workers)
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+from decimal import Decimal
+from core.agent_scheduler import AgentScheduler
+
+class FakeAgent:
+    def __init__(self, agent_key):
+        self.agent_key = agent_key
+        self.spent = Decimal("0")
+
+class FakeBank:
+    def __init__(self, balance):
+        self.balance = balance
+        self.lock = threading.Lock()
+
+    def get_balance(self):
+        with self.lock:
+            return self.balance
+
+class TestAgentScheduler(unittest.TestCase):
+
+    def make_scheduler(self, bank, run_turn, **kwargs):
+        kwargs.setdefault("turn_delay", 0)
+        kwargs.setdefault("backoff_base", 0.01)
+        return AgentScheduler(bank, run_turn, **kwargs)
+
+    def test_priority_round_robin(self):
+        """Test that turns are shared round-robin, weighted by priority."""
+        bank = FakeBank(30)
+        order = []
+
+        def run_turn(agent):
+            with bank.lock:
+                order.append(agent.agent_key)
+                bank.balance -= 1
+            return {"status": "success"}
+
+        scheduler = self.make_scheduler(bank, run_turn)
+        scheduler.add_agent(FakeAgent("a"), priority=2)
+        scheduler.add_agent(FakeAgent("b"))
+        scheduler.run()
+
+        self.assertEqual(len(order), 30)
+        self.assertEqual(order.count("a"), 20)
+        # Every round of three turns has two for "a" and one for "b"
+        self.assertEqual([order[i:i + 3].count("b") for i in range(0, 30, 3)], [1] * 10)
+
+    def test_failing_agent_is_retired(self):
+        """Test that an agent is retired after repeated errors while the others keep running."""
+        bank = FakeBank(10)
+
+        def run_turn(agent):
+            if agent.agent_key == "broken":
+                raise RuntimeError("boom")
+            time.sleep(0.02)
+            with bank.lock:
+                bank.balance -= 1
+            return {"status": "success"}
+
+        scheduler = self.make_scheduler(bank, run_turn, max_concurrency=2, max_consecutive_errors=3)
+        scheduler.add_agent(FakeAgent("broken"))
+        scheduler.add_agent(FakeAgent("worker"))
+        report = {entry["agent"]: entry for entry in scheduler.run()}
+
+        self.assertEqual(report["broken"]["turns"], 3)
+        self.assertEqual(report["broken"]["retired"], "max sequential errors reached")
+        self.assertEqual(report["worker"]["turns"], 10)
+
+    def test_budget_retires_agent(self):
+        """Test that an agent stops once it spends its budget."""
+        def run_turn(agent):
+            agent.spent += Decimal("0.5")
+            return {"status": "success"}
+
+        scheduler = self.make_scheduler(FakeBank(100), run_turn)
+        scheduler.add_agent(FakeAgent("a"), budget=Decimal("2"))
+        report = scheduler.run()
+        self.assertEqual(report[0]["turns"], 4)
+        self.assertIn("budget", report[0]["retired"])
+
+if __name__ == '__main__':
+    unittest.main()
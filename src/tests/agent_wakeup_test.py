@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from decimal import Decimal
+from core.agent_scheduler import AgentScheduler
+from core.agent_wakeup import AgentWakeup
+from core.file_based_inbox import FileBasedInbox
+from core.file_watcher import FileWatcher
+
+class FakeAgent:
+    def __init__(self, agent_key):
+        self.agent_key = agent_key
+        self.spent = Decimal("0")
+
+class FakeBank:
+    def get_balance(self):
+        return 1
+
+class TestAgentWakeup(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_idle_backoff(self):
+        """Test that idle turns back off exponentially up to the cap and a productive turn resets it."""
+        wakeup = AgentWakeup("a", idle_base=1.0, idle_max=5.0)
+        self.assertEqual([wakeup.record_turn(False, 0.2) for _ in range(5)], [1.0, 2.0, 4.0, 5.0, 5.0])
+        self.assertEqual(wakeup.record_turn(True, 0.2), 0.2)
+        self.assertEqual(wakeup.record_turn(False, 0.2), 1.0)
+
+    def test_inbox_post_and_drain(self):
+        """Test that posted messages are drained once, in order."""
+        inbox = FileBasedInbox("ta001", self.temp_dir)
+        self.assertEqual(inbox.drain(), [])
+        inbox.post("first")
+        inbox.post("second", name="alice")
+        self.assertEqual(inbox.drain(), [
+            {"role": "user", "name": "user", "content": "first"},
+            {"role": "user", "name": "alice", "content": "second"},
+        ])
+        self.assertEqual(inbox.drain(), [])
+
+    def check_watcher(self, watcher):
+        changed = []
+        seen = threading.Event()
+        watcher.callback = lambda path: (changed.append(path), seen.set())
+        watcher.watch(self.temp_dir)
+        watcher.start()
+        try:
+            with open(os.path.join(self.temp_dir, "board.json"), "w") as file:
+                file.write("{}")
+            self.assertTrue(seen.wait(5))
+            self.assertIn(os.path.join(os.path.abspath(self.temp_dir), "board.json"), changed)
+        finally:
+            watcher.stop()
+
+    def test_file_watcher(self):
+        """Test that file changes are reported with inotify."""
+        watcher = FileWatcher(None, poll_interval=0.05)
+        self.check_watcher(watcher)
+
+    def test_file_watcher_polling(self):
+        """Test that file changes are reported by mtime polling when inotify is unavailable."""
+        watcher = FileWatcher(None, poll_interval=0.05)
+        watcher._libc = None
+        self.check_watcher(watcher)
+
+    def test_notify_wakes_idle_agent(self):
+        """Test that an idle agent sleeps on its backoff until an event wakes it."""
+        turns = []
+
+        def run_turn(agent):
+            turns.append(time.monotonic())
+            if len(turns) == 2:
+                scheduler.stop()
+            return {"status": "success", "tool_execution_log": []}
+
+        scheduler = AgentScheduler(FakeBank(), run_turn, turn_delay=0)
+        wakeup = AgentWakeup("a", idle_base=30.0, idle_max=60.0)
+        scheduler.add_agent(FakeAgent("a"), wakeup=wakeup)
+
+        thread = threading.Thread(target=scheduler.run)
+        thread.start()
+        time.sleep(0.2)
+        self.assertEqual(len(turns), 1)
+        wakeup.notify("inbox")
+        thread.join(5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(turns), 2)
+        self.assertLess(turns[1] - turns[0], 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import json
 import unittest
 from tools.asteval import AstEval
 
@@ -16,5 +17,24 @@ class TestAstEval(unittest.TestCase):
         actual_result = AstEval.run(args, None)
         self.assertIn('error', actual_result)
 
+    def test_state_is_reset_between_calls(self):
+        """Test that names defined or overwritten by one call are gone in the next."""
+        AstEval.run({'expression': 'leaked = 1\nsqrt = 2'}, None)
+        self.assertIn('error', AstEval.run({'expression': 'leaked'}, None))
+        self.assertEqual(AstEval.run({'expression': 'sqrt(16)'}, None), '{"result": 4.0}')
+
+    def test_numpy_and_repr_fallback(self):
+        """Test NumPy results become lists and non-JSON values fall back to repr."""
+        self.assertEqual(json.loads(AstEval.run({'expression': 'arange(3) * 2', 'use_numpy': True}, None)), {"result": [0, 2, 4]})
+        self.assertEqual(json.loads(AstEval.run({'expression': '1 + 2j'}, None)), {"result": "(1+2j)"})
+
+    def test_limits(self):
+        """Test that runaway expressions are stopped by the time and memory limits, and the pool keeps working."""
+        result = json.loads(AstEval.run({'expression': 'while True:\n    pass', 'timeout': 0.5}, None))
+        self.assertIn('timed out', result['error'])
+        result = json.loads(AstEval.run({'expression': 'x = [0] * (10 ** 10)'}, None))
+        self.assertEqual(result['error'], 'Memory limit exceeded')
+        self.assertEqual(AstEval.run({'expression': '2 + 3'}, None), '{"result": 5}')
+
 if __name__ == '__main__':
     unittest.main()
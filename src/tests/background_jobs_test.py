@@ -0,0 +1,71 @@
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from core.background_jobs import job_manager
+from core.file_based_inbox import FileBasedInbox
+from tools.bash_cancel import BashCancel
+from tools.bash_poll import BashPoll
+from tools.bash_start import BashStart
+
+class TestBackgroundJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_spool_dir = job_manager.spool_dir
+        job_manager.spool_dir = self.temp_dir
+        self.inbox = FileBasedInbox("ta001", self.temp_dir)
+        self.agent_self = SimpleNamespace(agent_id="ta001", object_config=SimpleNamespace(inbox=self.inbox))
+
+    def tearDown(self):
+        job_manager.spool_dir = self.original_spool_dir
+        shutil.rmtree(self.temp_dir)
+
+    def wait_for(self, job_id, state="exited"):
+        for _ in range(100):
+            result = json.loads(BashPoll.run({"job_id": job_id}, self.agent_self))
+            if result["state"] == state:
+                return result
+            time.sleep(0.05)
+        self.fail(f"Job {job_id} never reached {state}")
+
+    def test_poll_with_cursor(self):
+        """Test that output can be read incrementally with byte cursors and a note is posted on completion."""
+        started = json.loads(BashStart.run({"command": "echo one; echo two >&2; printf 'xxxxxxxxxxhéllo'; exit 2", "notify_on_finish": True}, self.agent_self))
+        self.assertEqual(started["state"], "running")
+        job_id = started["job_id"]
+
+        result = self.wait_for(job_id)
+        self.assertEqual(result["exit_code"], 2)
+        self.assertEqual(result["stderr"], "two\n")
+
+        first = json.loads(BashPoll.run({"job_id": job_id, "max_bytes": 16, "stdout_cursor": 0}, self.agent_self))
+        self.assertTrue(first["more_stdout"])
+        # The 16 byte read splits "é", so the cursor stops before it
+        self.assertEqual(first["stdout_cursor"], 15)
+        rest = json.loads(BashPoll.run({"job_id": job_id, "stdout_cursor": first["stdout_cursor"]}, self.agent_self))
+        self.assertEqual(first["stdout"] + rest["stdout"], "one\nxxxxxxxxxxhéllo")
+        self.assertFalse(rest["more_stdout"])
+
+        time.sleep(0.1)
+        notes = self.inbox.drain()
+        self.assertEqual(len(notes), 1)
+        self.assertIn(f"Background job {job_id}", notes[0]["content"])
+
+    def test_cancel(self):
+        """Test that a cancelled job stops, and jobs are private to the agent that started them."""
+        job_id = json.loads(BashStart.run({"command": "sleep 30"}, self.agent_self))["job_id"]
+
+        other_agent = SimpleNamespace(agent_id="ta002")
+        self.assertIn("error", json.loads(BashCancel.run({"job_id": job_id}, other_agent)))
+
+        result = json.loads(BashCancel.run({"job_id": job_id}, self.agent_self))
+        self.assertEqual(result["state"], "cancelled")
+        self.assertLess(float(result["runtime"][:-1]), 10)
+        listed = json.loads(BashPoll.run({}, self.agent_self))["jobs"]
+        self.assertEqual([job["job_id"] for job in listed if job["job_id"] == job_id], [job_id])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 import json
+import os
+import tempfile
 from tools.bash import RunBashCommand
 
 class TestRunBashCommand(unittest.TestCase):
@@ -50,6 +52,65 @@ class TestRunBashCommand(unittest.TestCase):
         # Checking if the output is truncated to MAX_OUTPUT_LENGTH
         self.assertEqual(len(actual_result_dict.get('output')), RunBashCommand.MAX_OUTPUT_LENGTH)
 
+    def test_head_and_tail_of_large_output(self):
+        """Test that large output keeps its start and end, and reports the total bytes."""
+        args = {'command': 'echo START; head -c 5000000 /dev/zero | tr "\\0" "y"; echo; echo END'}
+        actual_result_dict = json.loads(RunBashCommand.run(args, None))
+        output = actual_result_dict.get('output')
+        self.assertTrue(output.startswith('START'))
+        self.assertEqual(output.strip()[-3:], 'END')
+        self.assertIn('bytes omitted', output)
+        self.assertEqual(len(output), RunBashCommand.MAX_OUTPUT_LENGTH)
+        self.assertEqual(actual_result_dict.get('output_bytes'), 5000011)
+
+    def test_stderr_and_exit_code(self):
+        """Test that stderr is captured separately and the exit code is reported."""
+        args = {'command': 'echo out; echo oops >&2; exit 3'}
+        actual_result_dict = json.loads(RunBashCommand.run(args, None))
+        self.assertEqual(actual_result_dict.get('status'), 3)
+        self.assertEqual(actual_result_dict.get('output').strip(), 'out')
+        self.assertEqual(actual_result_dict.get('stderr').strip(), 'oops')
+        self.assertIn('error', actual_result_dict)
+
+    def test_timeout_kills_process_group(self):
+        """Test that a timeout kills the children of the command, not just the shell."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pid_file = os.path.join(temp_dir, 'pid')
+            args = {'command': f'sleep 30 & echo $! > {pid_file}; wait', 'timeout': 0.5}
+            actual_result = RunBashCommand.run(args, None)
+            self.assertIn('Command timed out', actual_result)
+            with open(pid_file) as file:
+                child_pid = int(file.read())
+            # The child is either gone or a zombie waiting for init to reap it
+            try:
+                with open(f'/proc/{child_pid}/stat') as file:
+                    self.assertEqual(file.read().rsplit(')', 1)[1].split()[0], 'Z')
+            except FileNotFoundError:
+                pass
+
+    def test_persistent_session(self):
+        """Test that a persistent session keeps the working directory and variables between calls."""
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                RunBashCommand.run({'command': f'cd {temp_dir} && export JOE_TEST_VAR=kept', 'persistent': True}, None)
+                result = json.loads(RunBashCommand.run({'command': 'pwd; printf "$JOE_TEST_VAR"', 'persistent': True}, None))
+                self.assertEqual(result.get('status'), 0)
+                self.assertEqual(result.get('output'), f'{os.path.realpath(temp_dir)}\nkept')
+
+                result = json.loads(RunBashCommand.run({'command': 'echo oops >&2; false', 'persistent': True}, None))
+                self.assertEqual(result.get('status'), 1)
+                self.assertEqual(result.get('stderr').strip(), 'oops')
+
+            # A shell that exits or times out is replaced by a fresh one
+            result = json.loads(RunBashCommand.run({'command': 'exit 4', 'persistent': True}, None))
+            self.assertEqual(result.get('status'), 4)
+            result = json.loads(RunBashCommand.run({'command': 'sleep 10', 'persistent': True, 'timeout': 0.2}, None))
+            self.assertIn('Command timed out', result.get('error'))
+            result = json.loads(RunBashCommand.run({'command': 'echo "back ${JOE_TEST_VAR:-fresh}"', 'persistent': True}, None))
+            self.assertEqual(result.get('output').strip(), 'back fresh')
+        finally:
+            RunBashCommand.close_sessions()
+
     def test_max_input_length(self):
         """Test the handling of command longer than MAX_INPUT_LENGTH."""
         long_string = "echo '" + "x" * (RunBashCommand.MAX_INPUT_LENGTH + 100) + "'"
@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import unittest
+import tools
+from core.completion_recorder import CompletionRecorder, request_key
+from core.file_based_bank_account import FileBasedBankAccount
+from core.file_based_context import FileBasedContext
+from core.joe_types import ObjectConfig, TextConfig
+from core.openai_stub_server import OpenAIStubServer, ReplayResponder, ScriptedResponder
+from core.openai_transport import OpenAITransport
+from core.tool_agent import ToolAgent
+
+SCRIPT = [
+    {"tool_calls": [{"id": "call_1", "name": "asteval", "arguments": {"expression": "2 + 3"}}]},
+    {"content": "The answer is 5"},
+]
+
+
+class TestCompletionReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.original_cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)  # ToolAgent logs requests relative to the working directory
+        self.recording_path = os.path.join(self.tmp_dir.name, "recording.jsonl")
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        self.tmp_dir.cleanup()
+
+    def make_agent(self, base_url, agent_id, recorder=None):
+        text_config = TextConfig(
+            agent_key="task_agent",
+            model="gpt-4-1106-preview",
+            available_functions=["asteval"],
+            system_message="You are a test agent.",
+            kwargs={},
+        )
+        object_config = ObjectConfig(
+            agent_id=agent_id,
+            agent_service=FileBasedContext(agent_id=agent_id, folder="memory/context"),
+            bank_account=FileBasedBankAccount(account_id="ba_test", folder="memory/bank_account"),
+            chroma_db_collection=None,
+            kanban_board=None,
+            neo4j=None,
+        )
+        transport = OpenAITransport(api_key="test", base_url=base_url, recorder=recorder)
+        return ToolAgent(text_config, object_config, transport=transport)
+
+    def test_normalized_key_ignores_volatile_lines(self):
+        """Test that the time and balance suffix does not change the request key."""
+        def request(suffix):
+            return {"model": "m", "messages": [{"role": "system", "content": f"Hi\n\nCurrent Time: {suffix}\nCurrent Account Balance: ${suffix}"}]}
+        self.assertEqual(request_key(request("1")), request_key(request("2")))
+
+    def test_record_then_replay(self):
+        """Test that a recorded session replays offline with identical output."""
+        with OpenAIStubServer(ScriptedResponder(SCRIPT)) as server:
+            agent = self.make_agent(server.base_url, "recorded", CompletionRecorder(self.recording_path))
+            recorded = agent.run(sys_message_suffix="\n\nCurrent Time: 2024-01-01 00:00:00")
+
+        responder = ReplayResponder(self.recording_path)
+        with OpenAIStubServer(responder) as server:
+            agent = self.make_agent(server.base_url, "replayed")
+            replayed = agent.run(sys_message_suffix="\n\nCurrent Time: 2024-06-01 12:00:00")
+
+        self.assertEqual(recorded["status"], "success")
+        self.assertEqual(replayed["output"], "The answer is 5")
+        self.assertEqual(responder.misses, [])
+        self.assertEqual(len(server.requests), 2)
+        tool_message = agent.agent_service.update_context_memory()[1]
+        self.assertEqual(json.loads(tool_message["content"]), {"result": 5})
+
+if __name__ == '__main__':
+    unittest.main()
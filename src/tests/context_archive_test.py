@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import unittest
+from core.context_archive import ContextArchive, group_messages
+from core.file_based_context import FileBasedContext
+from core.joe_types import ObjectConfig, TextConfig
+from core.message_stack_builder import MessageStackBuilder
+
+class RecordingCollection:
+    """Stores upserts like a Chroma collection, without embeddings."""
+
+    def __init__(self):
+        self.records = {}
+
+    def upsert(self, ids, documents, metadatas):
+        self.records.update({id: (document, metadata) for id, document, metadata in zip(ids, documents, metadatas)})
+
+    def count(self):
+        return len(self.records)
+
+    def query(self, query_texts, n_results, where):
+        matches = [(id, record) for id, record in self.records.items() if record[1]["agent_id"] == where["agent_id"]]
+        matches = matches[:n_results]
+        return {
+            "ids": [[id for id, _ in matches]],
+            "distances": [[0.0 for _ in matches]],
+            "metadatas": [[metadata for _, (_, metadata) in matches]],
+            "documents": [[document for _, (document, _) in matches]],
+        }
+
+def tool_exchange(call_id, command, output):
+    return [
+        {"role": "assistant", "content": None, "tool_calls": [
+            {"id": call_id, "type": "function", "function": {"name": "bash", "arguments": json.dumps({"command": command})}}
+        ]},
+        {"tool_call_id": call_id, "role": "tool", "name": "bash", "content": output},
+    ]
+
+class TestContextArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.archive = ContextArchive(os.path.join(self.temp_dir.name, "archive"))
+
+    def tearDown(self):
+        self.archive.stop_indexer()
+        self.temp_dir.cleanup()
+
+    def test_groups_keep_tool_responses_with_their_call(self):
+        """Test that tool responses are archived in the same group as the call that produced them."""
+        messages = [{"role": "user", "content": "build it"}, *tool_exchange("c1", "make", "ok")]
+        self.assertEqual([len(group) for group in group_messages(messages)], [1, 2])
+
+    def test_keyword_search_without_index(self):
+        """Test that archived groups are read back newest first and found by keyword."""
+        self.archive.append("a1", [{"role": "user", "content": "The payments service fails to build"}])
+        self.archive.append("a1", [*tool_exchange("c1", "make payments", "error: missing header stripe.h")])
+        self.archive.append("a2", [{"role": "user", "content": "payments for another agent"}])
+
+        self.assertEqual(len(list(self.archive.records("a1"))), 2)
+        results = self.archive.search("a1", "payments header error", n_results=5)
+        self.assertEqual(len(results), 2)
+        self.assertIn("stripe.h", results[0]["text"])
+
+    def test_incremental_indexing(self):
+        """Test that each indexing pass embeds only the groups archived since the last one."""
+        self.archive.collection = RecordingCollection()
+        self.archive.append("a1", [{"role": "user", "content": "first"}, {"role": "user", "content": "second"}])
+        self.assertEqual(self.archive.index_pending(), 2)
+        self.assertEqual(self.archive.index_pending(), 0)
+
+        self.archive.append("a1", [{"role": "user", "content": "third"}])
+        reopened = ContextArchive(self.archive.folder, self.archive.collection)
+        self.assertEqual(reopened.index_pending(), 1)
+        results = reopened.search("a1", "third")
+        self.assertEqual(len(results), 3)
+        self.assertEqual({result["text"] for result in results}, {"user: first", "user: second", "user: third"})
+
+    def test_trimmed_history_is_archived(self):
+        """Test that trimming the message stack persists the shorter history and archives what was evicted."""
+        context = FileBasedContext("a1", os.path.join(self.temp_dir.name, "context"), archive=self.archive)
+        history = [{"role": "user", "content": f"message {i} " + "word " * 1000} for i in range(12)]
+        context.update_context_memory(history)
+
+        text_config = TextConfig(agent_key="agent", model="gpt-4", available_functions=[], system_message=None, kwargs={})
+        object_config = ObjectConfig(agent_id="a1", agent_service=context, bank_account=None, chroma_db_collection=None,
+                                     kanban_board=None, neo4j=None)
+        messages = MessageStackBuilder("agent", text_config, object_config).build_message_stack()
+
+        kept = len(messages) - 1
+        self.assertLess(kept, len(history))
+        self.assertEqual(len(context.update_context_memory()), kept)
+        archived = list(self.archive.records("a1"))
+        self.assertEqual(len(archived), len(history) - kept)
+        self.assertTrue(archived[-1]["text"].startswith("user: message 0 "))
+
+if __name__ == '__main__':
+    unittest.main()
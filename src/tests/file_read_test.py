@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import unittest
+from core import line_index
+from tools.file_read import MAX_FILE_SIZE, FileRead
+
+class TestFileRead(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, content: str) -> str:
+        path = os.path.join(self.temp_dir.name, "file.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def read(self, **args) -> dict:
+        return json.loads(FileRead.run(args, None))
+
+    def test_page_with_byte_cursor(self):
+        """Test that paging by byte cursor returns every character exactly once, multi-byte ones included."""
+        content = "héllo wörld ✓\n" * 1000
+        path = self.write_file(content)
+
+        pages, cursor = [], 0
+        while True:
+            result = self.read(filename=path, cursor=cursor)
+            pages.append(result["content"])
+            cursor = result["continuation"]["final_cursor"]
+            if not result["continuation"]["truncated"]:
+                break
+        self.assertEqual("".join(pages), content)
+        self.assertEqual(cursor, len(content.encode("utf-8")))
+
+    def test_read_line_ranges(self):
+        """Test reading line ranges across index checkpoints, including a last line without a newline."""
+        lines = [f"line {i}" for i in range(1, 5001)]
+        path = self.write_file("\n".join(lines))
+
+        result = self.read(filename=path, start_line=2500, line_count=3)
+        self.assertEqual(result["content"], "line 2500\nline 2501\nline 2502\n")
+        self.assertEqual(result["continuation"]["next_line"], 2503)
+
+        result = self.read(filename=path, start_line=4999)
+        self.assertEqual(result["content"], "line 4999\nline 5000")
+        self.assertFalse(result["continuation"]["truncated"])
+
+        result = self.read(filename=path, start_line=5001)
+        self.assertIn("5000 lines", result["error"])
+
+    def test_index_is_built_incrementally(self):
+        """Test that the line index scans only as far as needed, in chunks."""
+        path = self.write_file("".join(f"{i}\n" for i in range(100000)))
+        original_chunk_size = line_index.CHUNK_SIZE
+        line_index.CHUNK_SIZE = 4096
+        try:
+            self.assertEqual(self.read(filename=path, start_line=10, line_count=1)["content"], "9\n")
+            index = line_index.line_index_cache.get(path, os.stat(path))
+            self.assertLess(index.scan_pos, os.path.getsize(path))
+
+            self.assertEqual(self.read(filename=path, start_line=99999, line_count=1)["content"], "99998\n")
+            self.assertIn("100000 lines", self.read(filename=path, start_line=100001)["error"])
+            self.assertTrue(index.complete)
+        finally:
+            line_index.CHUNK_SIZE = original_chunk_size
+
+    def test_search(self):
+        """Test that search returns matching line numbers and continues from its cursor when limited."""
+        path = self.write_file("".join(f"{'ERROR' if i % 10 == 0 else 'info'} event {i}\n" for i in range(1, 101)))
+
+        result = self.read(filename=path, search=r"^error", ignore_case=True, max_matches=4)
+        self.assertEqual([match["line"] for match in result["matches"]], [10, 20, 30, 40])
+        self.assertEqual(result["matches"][0]["text"], "ERROR event 10")
+        self.assertTrue(result["continuation"]["truncated"])
+
+        result = self.read(filename=path, search=r"^error", ignore_case=True, cursor=result["continuation"]["final_cursor"])
+        self.assertEqual([match["line"] for match in result["matches"]], [50, 60, 70, 80, 90, 100])
+        self.assertFalse(result["continuation"]["truncated"])
+
+        self.assertIn("error", self.read(filename=path, search="("))
+
+    def test_empty_and_missing_files(self):
+        """Test that empty files read as empty and missing files report an error."""
+        result = self.read(filename=self.write_file(""))
+        self.assertEqual(result["content"], "")
+        self.assertEqual(result["continuation"]["eof"], 0)
+        self.assertIn("File not found", self.read(filename=os.path.join(self.temp_dir.name, "missing.txt"))["error"])
+
+    def test_long_line(self):
+        """Test that a line longer than the output limit is returned in part with a byte cursor to continue."""
+        path = self.write_file("x" * (MAX_FILE_SIZE * 2) + "\nend\n")
+        result = self.read(filename=path, start_line=1)
+        self.assertEqual(len(result["content"]), MAX_FILE_SIZE)
+        self.assertEqual(result["continuation"]["final_cursor"], MAX_FILE_SIZE)
+        self.assertIsNone(result["continuation"]["next_line"])
+
+if __name__ == '__main__':
+    unittest.main()
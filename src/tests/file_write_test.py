@@ -0,0 +1,81 @@
+import difflib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import unittest
+from tools.file_write import FileWrite
+
+class TestFileWrite(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "nested", "file.txt")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, **args) -> dict:
+        return json.loads(FileWrite.run({"filepath": self.path, **args}, None))
+
+    def read(self) -> str:
+        with open(self.path, encoding="utf-8") as file:
+            return file.read()
+
+    def test_overwrite_reports_size_and_hash(self):
+        """Test that overwrite creates the directories and reports the resulting size and sha256."""
+        result = self.write(contents="héllo\n")
+        self.assertEqual(result["size"], len("héllo\n".encode("utf-8")))
+        self.assertEqual(result["sha256"], hashlib.sha256("héllo\n".encode("utf-8")).hexdigest())
+        self.assertEqual(self.read(), "héllo\n")
+        # No temp files are left behind
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["file.txt"])
+
+    def test_append_and_insert(self):
+        """Test appending and inserting lines."""
+        self.write(contents="one\nthree")
+        self.write(contents="\nfour\n", mode="append")
+        self.write(contents="two", mode="insert_at_line", line=2)
+        self.write(contents="zero\n", mode="insert_at_line", line=1)
+        self.write(contents="five\n", mode="insert_at_line", line=6)
+        self.assertEqual(self.read(), "zero\none\ntwo\nthree\nfour\nfive\n")
+        self.assertIn("error", self.write(contents="x", mode="insert_at_line", line=9))
+
+    def test_replace(self):
+        """Test that replace requires a unique match unless replace_all is set."""
+        self.write(contents="a = 1\nb = 1\n")
+        self.assertIn("2 times", self.write(contents="2", mode="replace", search="1")["error"])
+        self.assertIn("not found", self.write(contents="2", mode="replace", search="c = 1")["error"])
+        self.write(contents="b = 2", mode="replace", search="b = 1")
+        self.assertEqual(self.read(), "a = 1\nb = 2\n")
+        self.write(contents="x", mode="replace", search=" = ", replace_all=True)
+        self.assertEqual(self.read(), "ax1\nbx2\n")
+
+    def test_patch(self):
+        """Test applying a unified diff, including one whose hunks have moved, and rejecting one that doesn't match."""
+        original = "".join(f"line {i}\n" for i in range(1, 101))
+        changed = original.replace("line 10\n", "line ten\n").replace("line 90\n", "")
+        diff = "".join(difflib.unified_diff(original.splitlines(True), changed.splitlines(True), "a/file.txt", "b/file.txt"))
+
+        self.write(contents="new first line\n" + original)
+        result = self.write(contents=diff, mode="patch")
+        self.assertNotIn("error", result)
+        self.assertEqual(self.read(), "new first line\n" + changed)
+
+        result = self.write(contents=diff, mode="patch")
+        self.assertIn("Patch failed", result["error"])
+        self.assertEqual(self.read(), "new first line\n" + changed)
+
+    def test_concurrent_appends(self):
+        """Test that concurrent appends to the same file are all kept."""
+        self.write(contents="")
+        threads = [threading.Thread(target=self.write, kwargs={"contents": f"{i}\n", "mode": "append"}) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(self.read().split()), sorted(str(i) for i in range(20)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from core.cost_helper import get_encoding
+from core.ingestion import chunk_paragraphs, collect_files, ingest
+
+class MemoryCollection:
+    """Keeps upserted documents in a dict, failing the upsert numbered `fail_on` to simulate a crash."""
+
+    def __init__(self, fail_on=None):
+        self.documents = {}
+        self.upserts = 0
+        self.fail_on = fail_on
+
+    def get(self, ids, include):
+        return {"ids": [id for id in ids if id in self.documents]}
+
+    def upsert(self, ids, documents, metadatas):
+        self.upserts += 1
+        if self.upserts == self.fail_on:
+            raise RuntimeError("embedding service unavailable")
+        self.documents.update(zip(ids, documents))
+
+class TestIngestion(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.docs = os.path.join(self.temp_dir.name, "docs")
+        os.makedirs(self.docs)
+        self.checkpoint = os.path.join(self.temp_dir.name, "checkpoint.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.docs, name), "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def test_chunks_respect_token_budget(self):
+        """Test that chunks stay within max_tokens, keep short paragraphs whole and overlap their neighbours."""
+        paragraphs = [f"Paragraph {i} " + "lorem ipsum " * 20 for i in range(30)] + ["long " * 500]
+        chunks = list(chunk_paragraphs("doc", paragraphs, max_tokens=200, overlap=20))
+        encoding = get_encoding()
+        self.assertTrue(all(chunk.tokens <= 200 for chunk in chunks))
+        self.assertEqual([chunk.index for chunk in chunks], list(range(len(chunks))))
+        self.assertTrue(chunks[0].text.startswith("Paragraph 0"))
+        self.assertTrue(chunks[0].text.endswith("lorem ipsum"))
+        tail = encoding.decode(encoding.encode(chunks[0].text + "\n\n")[-20:]).strip()
+        self.assertTrue(chunks[1].text.startswith(tail))
+        self.assertIn("Paragraph 29", "".join(chunk.text for chunk in chunks))
+
+    def test_collect_prefers_converted_text(self):
+        """Test that a PDF with a .txt conversion next to it is read from the .txt, and other files are ignored."""
+        for name in ("a.pdf", "a.txt", "b.pdf", "notes.md", "image.png"):
+            self.write(name, "x")
+        self.assertEqual([os.path.basename(path) for path in collect_files([self.docs])], ["a.txt", "b.pdf", "notes.md"])
+
+    def test_dedupe_and_rerun(self):
+        """Test that repeated text is stored once and a second run skips unchanged files."""
+        shared = "\n\n".join(f"Shared paragraph {i}." for i in range(5))
+        self.write("one.txt", shared)
+        self.write("two.txt", shared)
+        collection = MemoryCollection()
+
+        stats = ingest([self.docs], collection, self.checkpoint, max_tokens=50, batch_size=2)
+        self.assertEqual(stats["files"], 2)
+        self.assertEqual(stats["upserted"], len(collection.documents))
+        self.assertEqual(stats["duplicates"], stats["chunks"] - stats["upserted"])
+        self.assertGreater(stats["duplicates"], 0)
+
+        stats = ingest([self.docs], collection, self.checkpoint, max_tokens=50, batch_size=2)
+        self.assertEqual(stats["files_skipped"], 2)
+        self.assertEqual(stats["upserted"], 0)
+
+        # A changed file is ingested again
+        self.write("two.txt", shared + "\n\nA new ending.")
+        stats = ingest([self.docs], collection, self.checkpoint, max_tokens=50, batch_size=2)
+        self.assertEqual((stats["files"], stats["upserted"]), (1, 1))
+
+    def test_resume_after_crash(self):
+        """Test that an ingestion that failed part way resumes after the last stored batch."""
+        self.write("book.txt", "\n\n".join(f"Chapter {i}. " + "words " * 30 for i in range(20)))
+        crashing = MemoryCollection(fail_on=3)
+        stats = ingest([self.docs], crashing, self.checkpoint, max_tokens=60, batch_size=2)
+        self.assertEqual(stats["files_failed"], 1)
+        stored = dict(crashing.documents)
+
+        resumed = MemoryCollection()
+        stats = ingest([self.docs], resumed, self.checkpoint, max_tokens=60, batch_size=2)
+        self.assertEqual(stats["files"], 1)
+        self.assertFalse(set(stored) & set(resumed.documents))
+
+        complete = MemoryCollection()
+        ingest([self.docs], complete, os.path.join(self.temp_dir.name, "fresh.json"), max_tokens=60, batch_size=2)
+        self.assertEqual({**stored, **resumed.documents}, complete.documents)
+
+if __name__ == '__main__':
+    unittest.main()
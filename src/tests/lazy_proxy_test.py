@@ -0,0 +1,64 @@
+import threading
+import unittest
+from core.lazy_proxy import LazyProxy
+
+class FlakyBackend:
+    """Fails to connect the first `failures` times, like a database that is still starting."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.connects = 0
+        self.closed = False
+
+    def connect(self):
+        self.connects += 1
+        if self.connects <= self.failures:
+            raise ConnectionError("backend is down")
+        return self
+
+    def count(self):
+        return 42
+
+    def close(self):
+        self.closed = True
+
+class TestLazyProxy(unittest.TestCase):
+
+    def test_connects_on_first_use(self):
+        """Test that the backend is created on first attribute access, once, even with concurrent callers."""
+        backend = FlakyBackend()
+        proxy = LazyProxy(backend.connect, "test")
+        self.assertFalse(proxy.is_ready)
+        self.assertEqual(backend.connects, 0)
+
+        threads = [threading.Thread(target=proxy.count) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(proxy.count(), 42)
+        self.assertEqual(backend.connects, 1)
+        self.assertTrue(proxy.is_ready)
+
+    def test_failures_are_retried(self):
+        """Test that a failed connection reaches the caller, and the next use connects again."""
+        backend = FlakyBackend(failures=2)
+        proxy = LazyProxy(backend.connect, "test")
+        proxy.warm_up().join()
+        self.assertFalse(proxy.is_ready)
+        with self.assertRaises(ConnectionError):
+            proxy.count()
+        self.assertEqual(proxy.count(), 42)
+
+    def test_close_only_when_created(self):
+        """Test that closing a proxy that never connected does not connect it."""
+        backend = FlakyBackend()
+        proxy = LazyProxy(backend.connect, "test")
+        proxy.close()
+        self.assertEqual(backend.connects, 0)
+        proxy.count()
+        proxy.close()
+        self.assertTrue(backend.closed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import urllib.request
+from core.function_call_handler import is_error_response
+from core.metrics import MetricsRegistry, start_metrics_server
+
+class TestMetrics(unittest.TestCase):
+
+    def test_render_counter_and_histogram(self):
+        """Test the Prometheus text rendering of counters and cumulative histogram buckets."""
+        registry = MetricsRegistry()
+        calls = registry.counter("tool_calls_total", "Tool calls.", ["tool", "status"])
+        latency = registry.histogram("tool_seconds", "Tool latency.", ["tool"], buckets=[0.1, 1.0])
+        calls.inc(tool="bash", status="ok")
+        calls.inc(2, tool="bash", status="error")
+        latency.observe(0.05, tool="bash")
+        latency.observe(0.5, tool="bash")
+        latency.observe(5, tool="bash")
+
+        output = registry.render()
+        self.assertIn("# TYPE tool_calls_total counter", output)
+        self.assertIn('tool_calls_total{tool="bash",status="error"} 2', output)
+        self.assertIn('tool_seconds_bucket{tool="bash",le="0.1"} 1', output)
+        self.assertIn('tool_seconds_bucket{tool="bash",le="1"} 2', output)
+        self.assertIn('tool_seconds_bucket{tool="bash",le="+Inf"} 3', output)
+        self.assertIn('tool_seconds_count{tool="bash"} 3', output)
+
+    def test_metrics_server(self):
+        """Test that the registry is served over HTTP."""
+        registry = MetricsRegistry()
+        registry.gauge("balance", "Balance.").set(42.5)
+        server = start_metrics_server(registry, 0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            body = urllib.request.urlopen(url, timeout=5).read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn("balance 42.5", body)
+
+    def test_is_error_response(self):
+        """Test the detection of tool error responses."""
+        self.assertTrue(is_error_response('{"error": "boom"}'))
+        self.assertFalse(is_error_response('{"result": 5}'))
+        self.assertFalse(is_error_response('not json'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import time
+import unittest
+import openai
+from core.openai_stub_server import OpenAIStubServer, ScriptedResponder, StubResponse, make_chat_completion
+from core.openai_transport import OpenAITransport
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class TestOpenAITransport(unittest.TestCase):
+
+    def make_transport(self, server, **kwargs):
+        kwargs.setdefault("backoff_base", 0.01)
+        return OpenAITransport(api_key="test", base_url=server.base_url, **kwargs)
+
+    def test_retries_server_errors(self):
+        """Test that 5xx responses are retried until a completion succeeds."""
+        responder = ScriptedResponder([{"status": 500}, {"status": 503}, {"content": "hello"}])
+        with OpenAIStubServer(responder) as server:
+            completion, model = self.make_transport(server).create_chat_completion("gpt-4", MESSAGES)
+        self.assertEqual(completion.choices[0].message.content, "hello")
+        self.assertEqual(model, "gpt-4")
+        self.assertEqual(len(server.requests), 3)
+
+    def test_does_not_retry_client_errors(self):
+        """Test that a 400 fails immediately without retrying."""
+        responder = ScriptedResponder([{"status": 400}, {"content": "hello"}])
+        with OpenAIStubServer(responder) as server:
+            with self.assertRaises(openai.BadRequestError):
+                self.make_transport(server).create_chat_completion("gpt-4", MESSAGES)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_falls_back_on_timeouts(self):
+        """Test that repeated timeouts move on to the next model in the chain."""
+        def responder(request):
+            delay = 1.0 if request["model"] == "slow-model" else 0.0
+            return StubResponse(200, make_chat_completion(request["model"], "ok"), delay)
+
+        with OpenAIStubServer(responder) as server:
+            transport = self.make_transport(server, timeout=0.2, timeouts_before_fallback=2)
+            completion, model = transport.create_chat_completion("slow-model", MESSAGES, fallback_models=["fast-model"])
+        self.assertEqual(model, "fast-model")
+        self.assertEqual([r["model"] for r in server.requests], ["slow-model", "slow-model", "fast-model"])
+        outcomes = [attempt["outcome"] for attempt in transport.attempt_log]
+        self.assertEqual(outcomes, ["APITimeoutError", "APITimeoutError", "ok"])
+
+    def test_hedged_request(self):
+        """Test that a slow request is hedged and the faster answer wins."""
+        responder = ScriptedResponder([
+            {"content": "slow", "delay": 2.0},
+            {"content": "fast"},
+        ])
+        with OpenAIStubServer(responder) as server:
+            transport = self.make_transport(server, hedge_after=0.1)
+            start_time = time.monotonic()
+            completion, _ = transport.create_chat_completion("gpt-4", MESSAGES)
+            elapsed = time.monotonic() - start_time
+        self.assertEqual(completion.choices[0].message.content, "fast")
+        self.assertLess(elapsed, 1.5)
+
+if __name__ == '__main__':
+    unittest.main()
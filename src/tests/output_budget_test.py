@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from core import output_budget
+from core.function_call_handler import FunctionCallHandler
+from core.output_budget import apply_budget, budget_for, count_tokens
+
+class FloodTool:
+    """Returns a search-like result far over any reasonable budget."""
+
+    @classmethod
+    def run(cls, args, agent_self):
+        return json.dumps({"results": [{"title": f"result {i}", "snippet": "lorem ipsum " * 30} for i in range(100)]})
+
+class RecordingContext:
+    def __init__(self):
+        self.messages = []
+
+    def update_context_memory(self, messages):
+        self.messages.extend(messages)
+
+class TestOutputBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def spill_path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_under_budget_is_unchanged(self):
+        """Test that a response within budget is passed through and nothing is spilled."""
+        response = json.dumps({"result": "short"})
+        self.assertEqual(apply_budget(response, 100, self.spill_path("short.json")), (response, False))
+        self.assertEqual(apply_budget(response * 100, 0, self.spill_path("short.json"))[1], False)
+        self.assertFalse(os.path.exists(self.spill_path("short.json")))
+
+    def test_lists_are_truncated_structurally(self):
+        """Test that an oversized JSON result keeps its shape, says what was omitted and spills the full result."""
+        rows = [{"row": i, "name": f"node {i}"} for i in range(1000)]
+        response = json.dumps({"result": rows, "query": "MATCH (n) RETURN n"})
+        truncated, was_truncated = apply_budget(response, 500, self.spill_path("rows.json"))
+
+        self.assertTrue(was_truncated)
+        self.assertLessEqual(count_tokens(truncated), 500)
+        output = json.loads(truncated)
+        self.assertEqual(output["query"], "MATCH (n) RETURN n")
+        self.assertEqual(output["result"], rows[:len(output["result"])])
+        self.assertEqual(output["truncated"]["omitted"], {"result": 1000 - len(output["result"])})
+        with open(output["truncated"]["full_output"], "r", encoding="utf-8") as file:
+            self.assertEqual(json.load(file), json.loads(response))
+
+    def test_plain_text_keeps_the_beginning(self):
+        """Test that a non-JSON response is cut down to its first tokens."""
+        response = "".join(f"line {i}\n" for i in range(5000))
+        truncated, was_truncated = apply_budget(response, 300, self.spill_path("text.json"))
+
+        self.assertTrue(was_truncated)
+        self.assertLessEqual(count_tokens(truncated), 300)
+        self.assertTrue(response.startswith(json.loads(truncated)["result"]))
+        with open(self.spill_path("text.json"), "r", encoding="utf-8") as file:
+            self.assertEqual(file.read(), response)
+
+    def test_budgets_per_tool(self):
+        """Test that configured budgets override the defaults, per tool or for all of them."""
+        self.assertEqual(budget_for("web_search"), output_budget.DEFAULT_TOOL_OUTPUT_BUDGETS["web_search"])
+        self.assertEqual(budget_for("bash"), output_budget.DEFAULT_TOOL_OUTPUT_BUDGET)
+        self.assertEqual(budget_for("bash", {"default": 800}), 800)
+        self.assertEqual(budget_for("web_search", {"web_search": 0}), 0)
+
+    def test_handler_applies_budget(self):
+        """Test that the function call handler puts the truncated response in the context."""
+        context = RecordingContext()
+        text_config = SimpleNamespace(available_functions=[], tool_output_budgets={"flood": 400})
+        object_config = SimpleNamespace(agent_id="a1", agent_service=context)
+        handler = FunctionCallHandler("agent", text_config, object_config)
+        handler.available_functions = {"flood": FloodTool}
+
+        tool_call = {"id": "call_1", "type": "function", "function": {"name": "flood", "arguments": "{}"}}
+        with patch.object(output_budget, "SPILL_FOLDER", self.temp_dir.name):
+            handler.handle_fn_calls([tool_call])
+
+        content = context.messages[0]["content"]
+        self.assertLessEqual(count_tokens(content), 400)
+        full_output = json.loads(content)["truncated"]["full_output"]
+        self.assertEqual(full_output, os.path.join(self.temp_dir.name, "a1", "flood_call_1.json"))
+        self.assertTrue(os.path.exists(full_output))
+
+if __name__ == '__main__':
+    unittest.main()
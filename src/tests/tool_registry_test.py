@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from core.tool_manifest import MANIFEST_FILE, register_package
+from core.tool_registry import LazyTool, ToolRegistry
+
+TOOL_SOURCE = '''
+from core.tool_registry import register_fn
+
+@register_fn
+class Echo:
+    @classmethod
+    def get_name(cls):
+        return "{name}"
+
+    @classmethod
+    def get_definition(cls, agent_self):
+        return {{"name": cls.get_name(), "description": "{description}", "parameters": {{"type": "object"}}}}
+
+    @classmethod
+    def run(cls, args, agent_self):
+        return "{description}: " + args["text"]
+'''
+
+class TestToolRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.package = f"lazy_tools_{id(self)}"
+        self.package_dir = os.path.join(self.temp_dir.name, self.package)
+        os.makedirs(self.package_dir)
+        open(os.path.join(self.package_dir, "__init__.py"), "w").close()
+        sys.path.insert(0, self.temp_dir.name)
+        self.original_functions = dict(ToolRegistry.functions)
+
+    def tearDown(self):
+        sys.path.remove(self.temp_dir.name)
+        for module in [name for name in sys.modules if name.startswith(self.package)]:
+            del sys.modules[module]
+        ToolRegistry.functions.clear()
+        ToolRegistry.functions.update(self.original_functions)
+        self.temp_dir.cleanup()
+
+    def write_tool(self, module, name, description):
+        with open(os.path.join(self.package_dir, module + ".py"), "w") as file:
+            file.write(TOOL_SOURCE.format(name=name, description=description))
+
+    def restart(self):
+        """Forget the imported tool modules and registrations, as a new process would."""
+        for module in [name for name in sys.modules if name.startswith(self.package + ".")]:
+            del sys.modules[module]
+        ToolRegistry.functions.clear()
+        register_package(self.package_dir, self.package)
+
+    def test_tools_load_on_first_run(self):
+        """Test that with a manifest, definitions come from the cache and the module is imported only when run."""
+        self.write_tool("echo", "echo_tool", "first")
+        register_package(self.package_dir, self.package)
+        with open(os.path.join(self.package_dir, MANIFEST_FILE)) as file:
+            manifest = json.load(file)
+        self.assertEqual(list(manifest["modules"]["echo"]["tools"]), ["echo_tool"])
+
+        self.restart()
+        tool = ToolRegistry.functions["echo_tool"]
+        self.assertIsInstance(tool, LazyTool)
+        self.assertEqual(tool.get_definition(None)["description"], "first")
+        self.assertNotIn(f"{self.package}.echo", sys.modules)
+
+        self.assertEqual(tool.run({"text": "hi"}, None), "first: hi")
+        self.assertIn(f"{self.package}.echo", sys.modules)
+        self.assertTrue(ToolRegistry.is_loaded("echo_tool"))
+
+    def test_changed_and_removed_modules_refresh_manifest(self):
+        """Test that a changed module is described again and a deleted one drops out of the manifest."""
+        self.write_tool("echo", "echo_tool", "first")
+        self.write_tool("other", "other_tool", "other")
+        register_package(self.package_dir, self.package)
+
+        self.write_tool("echo", "echo_tool", "second")
+        os.remove(os.path.join(self.package_dir, "other.py"))
+        self.restart()
+        self.assertEqual(ToolRegistry.functions["echo_tool"].get_definition(None)["description"], "second")
+        self.assertNotIn("other_tool", ToolRegistry.functions)
+        with open(os.path.join(self.package_dir, MANIFEST_FILE)) as file:
+            self.assertEqual(list(json.load(file)["modules"]), ["echo"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from core.function_call_handler import FunctionCallHandler
+from core.tool_scheduler import DEFAULT_TOOL_TIMEOUT, EXCLUSIVE, build_dependencies, conflicts, keys_overlap, timeout_for
+
+class SlowTool:
+    """Sleeps while recording which calls were running at the same time."""
+    lock = threading.Lock()
+    active = set()
+    overlaps = set()
+
+    @classmethod
+    def get_resource_keys(cls, args, agent_self):
+        return args.get("reads", ()), args.get("writes", ())
+
+    @classmethod
+    def run(cls, args, agent_self):
+        with cls.lock:
+            cls.overlaps.update(frozenset((args["name"], other)) for other in cls.active)
+            cls.active.add(args["name"])
+        time.sleep(0.1)
+        with cls.lock:
+            cls.active.discard(args["name"])
+        return json.dumps({"result": args["name"]})
+
+class HangingTool:
+    """Blocks until released, like a request without a timeout."""
+    release = threading.Event()
+
+    @classmethod
+    def get_resource_keys(cls, args, agent_self):
+        return (), ("file:/notes.txt",)
+
+    @classmethod
+    def run(cls, args, agent_self):
+        cls.release.wait()
+        return json.dumps({"result": "finally"})
+
+class RecordingContext:
+    def __init__(self):
+        self.messages = []
+
+    def update_context_memory(self, messages):
+        self.messages.extend(messages)
+
+def call(name, reads=(), writes=(), tool="slow"):
+    arguments = json.dumps({"name": name, "reads": list(reads), "writes": list(writes)})
+    return {"id": name, "type": "function", "function": {"name": tool, "arguments": arguments}}
+
+def make_handler(context, **text_config):
+    handler = FunctionCallHandler("agent", SimpleNamespace(available_functions=[], **text_config),
+                                  SimpleNamespace(agent_id="a1", agent_service=context))
+    handler.available_functions = {"slow": SlowTool, "hang": HangingTool}
+    return handler
+
+class TestToolScheduler(unittest.TestCase):
+
+    def test_keys(self):
+        """Test that wildcards cover the keys they prefix, and only writes make calls conflict."""
+        self.assertTrue(keys_overlap("kanban:*", "kanban:42"))
+        self.assertTrue(keys_overlap("memory:7", "*"))
+        self.assertFalse(keys_overlap("kanban:42", "kanban:43"))
+
+        self.assertFalse(conflicts((["file:/a"], []), (["file:/a"], [])))
+        self.assertTrue(conflicts((["file:/a"], []), ([], ["file:/a"])))
+        self.assertFalse(conflicts(([], []), EXCLUSIVE))
+        self.assertTrue(conflicts((["neo4j"], []), EXCLUSIVE))
+
+    def test_dependencies_follow_call_order(self):
+        """Test that a call waits for the earlier calls it conflicts with, and nothing else."""
+        calls = [([], ["file:/a"]), (["file:/a"], []), (["file:/b"], []), ([], ["file:/b"]), (["file:/a"], [])]
+        self.assertEqual(build_dependencies(calls), [set(), {0}, set(), {2}, {0}])
+
+    def test_conflicting_calls_are_serialized(self):
+        """Test that the handler runs conflicting calls one after another and the rest in parallel."""
+        SlowTool.active.clear()
+        SlowTool.overlaps.clear()
+        context = RecordingContext()
+        handler = make_handler(context)
+
+        handler.handle_fn_calls([
+            call("write", writes=["file:/notes.txt"]),
+            call("read", reads=["file:/notes.txt"]),
+            call("search"),
+            call("card", writes=["kanban:1"]),
+        ])
+
+        self.assertNotIn(frozenset(("write", "read")), SlowTool.overlaps)
+        self.assertIn(frozenset(("write", "search")), SlowTool.overlaps)
+        self.assertIn(frozenset(("write", "card")), SlowTool.overlaps)
+        order = [message["tool_call_id"] for message in context.messages]
+        self.assertLess(order.index("write"), order.index("read"))
+        self.assertEqual(len(order), 4)
+
+    def test_timeouts(self):
+        """Test that configured timeouts win over the tool's own, which win over the default."""
+        self.assertEqual(timeout_for("bash", None), DEFAULT_TOOL_TIMEOUT)
+        self.assertEqual(timeout_for("bash", 72), 72)
+        self.assertEqual(timeout_for("bash", 72, {"default": 10}), 72)
+        self.assertEqual(timeout_for("bash", 72, {"bash": 5}), 5)
+        self.assertEqual(timeout_for("web_search", None, {"default": 10}), 10)
+
+    def test_hung_call_is_abandoned(self):
+        """Test that a call past its deadline gets a timeout error, its dependents are skipped, and the rest run."""
+        HangingTool.release.clear()
+        context = RecordingContext()
+        handler = make_handler(context, tool_timeouts={"hang": 0.2})
+        try:
+            start = time.monotonic()
+            log = handler.handle_fn_calls([
+                call("hang", tool="hang"),
+                call("read", reads=["file:/notes.txt"]),
+                call("search"),
+            ])
+            self.assertLess(time.monotonic() - start, 2)
+        finally:
+            HangingTool.release.set()
+        time.sleep(0.1)  # Let the abandoned call finish; its result must not be logged
+
+        responses = {message["tool_call_id"]: json.loads(message["content"]) for message in context.messages}
+        self.assertTrue(responses["hang"]["timed_out"])
+        self.assertEqual(responses["hang"]["timeout"], 0.2)
+        self.assertEqual(responses["read"]["waiting_for"], ["hang"])
+        self.assertEqual(responses["search"], {"result": "search"})
+        self.assertEqual(len(log), 3)
+
+    def test_turn_deadline(self):
+        """Test that calls still running or waiting when the turn runs out of time are abandoned."""
+        HangingTool.release.clear()
+        context = RecordingContext()
+        handler = make_handler(context, turn_timeout=0.2)
+        try:
+            handler.handle_fn_calls([call("hang", tool="hang"), call("write", writes=["file:/notes.txt"])])
+        finally:
+            HangingTool.release.set()
+
+        responses = {message["tool_call_id"]: json.loads(message["content"]) for message in context.messages}
+        self.assertIn("the turn's time limit", responses["hang"]["error"])
+        self.assertTrue(responses["write"]["skipped"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+from core.tracing import NOOP_SPAN, Tracer, write_chrome_trace
+
+class TestTracing(unittest.TestCase):
+
+    def test_disabled_tracer_returns_noop(self):
+        """Test that a disabled tracer hands out the shared no-op span."""
+        tracer = Tracer()
+        self.assertIs(tracer.span("anything", key="value"), NOOP_SPAN)
+        self.assertEqual(tracer.finished_spans(), [])
+
+    def test_nested_spans_and_exports(self):
+        """Test span nesting, attributes, the JSONL log and the Chrome trace export."""
+        tracer = Tracer()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tracer.configure(tmp_dir)
+            with tracer.span("agent.run", agent="a1") as outer:
+                with tracer.span("tool.call", tool="bash") as inner:
+                    tracer.current_span().set_attribute("response_chars", 12)
+            tracer.disable()
+
+            spans = tracer.finished_spans()
+            self.assertEqual([s["name"] for s in spans], ["tool.call", "agent.run"])
+            self.assertEqual(spans[0]["parent_id"], outer.span_id)
+            self.assertEqual(spans[0]["attributes"], {"tool": "bash", "response_chars": 12})
+
+            with open(os.path.join(tmp_dir, "spans.jsonl")) as file:
+                self.assertEqual(len(file.readlines()), 2)
+
+            trace_path = os.path.join(tmp_dir, "trace.json")
+            write_chrome_trace(spans, trace_path)
+            with open(trace_path) as file:
+                events = json.load(file)["traceEvents"]
+            self.assertEqual(events[1]["ph"], "X")
+            self.assertEqual(events[1]["args"], {"agent": "a1"})
+            self.assertGreaterEqual(events[1]["dur"], events[0]["dur"])
+
+if __name__ == '__main__':
+    unittest.main()
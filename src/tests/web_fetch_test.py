@@ -0,0 +1,107 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from tools import web_fetch
+from tools.web_fetch import WebFetch
+
+ARTICLE = " ".join(f"word{i}" for i in range(3000))
+PAGE = f"""<html><head><title>Stub page</title><style>body {{ color: red; }}</style></head>
+<body><nav>Home | About</nav><main><h1>Heading</h1><p>{ARTICLE}</p></main>
+<script>var tracking = true;</script><footer>Copyright</footer></body></html>""".encode()
+
+class StubSite(BaseHTTPRequestHandler):
+    """Serves an HTML page with an ETag, a PDF and an oversized text file."""
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/page":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.reply(PAGE, "text/html; charset=utf-8", {"ETag": '"v1"'})
+        elif self.path == "/paper.pdf":
+            self.reply(b"%PDF-1.4", "application/pdf")
+        elif self.path == "/big.txt":
+            self.reply(b"a" * (web_fetch.MAX_DOWNLOAD_BYTES + 100_000), "text/plain")
+        else:
+            self.reply(b"Not found", "text/plain", status=404)
+
+    def reply(self, body, content_type, headers={}, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestWebFetch(unittest.TestCase):
+
+    def setUp(self):
+        StubSite.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubSite)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.original_cache_folder = web_fetch.page_cache.folder
+        web_fetch.page_cache.folder = self.cache_dir.name
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        web_fetch.page_cache.folder = self.original_cache_folder
+        self.cache_dir.cleanup()
+
+    def test_extracts_and_pages_text(self):
+        """Test that markup and boilerplate are dropped and the text is returned a page of tokens at a time."""
+        result = json.loads(WebFetch.run({"url": f"{self.base_url}/page", "max_tokens": 500}, None))
+        self.assertEqual(result["title"], "Stub page")
+        self.assertTrue(result["content"].startswith("Heading\nword0 word1"))
+        for noise in ("Home | About", "tracking", "color: red", "Copyright"):
+            self.assertNotIn(noise, result["content"])
+        self.assertEqual(result["cursor"], 0)
+        self.assertEqual(result["next_cursor"], 500)
+        self.assertFalse(result["cached"])
+
+        # Following next_cursor reads the rest from the cache until it runs out
+        pages = [result]
+        while pages[-1]["next_cursor"] is not None:
+            pages.append(json.loads(WebFetch.run({"url": f"{self.base_url}/page", "cursor": pages[-1]["next_cursor"], "max_tokens": 4000}, None)))
+        self.assertTrue(pages[-1]["cached"])
+        self.assertTrue("".join(page["content"] for page in pages).endswith("word2999"))
+        self.assertEqual(len(StubSite.requests), 1)
+
+    def test_expired_page_is_revalidated(self):
+        """Test that an expired entry is revalidated with its ETag and a 304 keeps the cached text."""
+        first = json.loads(WebFetch.run({"url": f"{self.base_url}/page"}, None))
+        web_fetch.page_cache.set(f"{self.base_url}/page", web_fetch.page_cache.get(f"{self.base_url}/page"), ttl=-1)
+
+        second = json.loads(WebFetch.run({"url": f"{self.base_url}/page"}, None))
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["content"], first["content"])
+        self.assertEqual(StubSite.requests, [("/page", None), ("/page", '"v1"')])
+        self.assertGreater(web_fetch.page_cache.get_entry(f"{self.base_url}/page")["expires"], time.time())
+
+    def test_unsupported_and_failed_fetches(self):
+        """Test that binary content types, HTTP errors and non-http URLs return errors."""
+        self.assertIn("application/pdf", json.loads(WebFetch.run({"url": f"{self.base_url}/paper.pdf"}, None))["error"])
+        self.assertIn("404", json.loads(WebFetch.run({"url": f"{self.base_url}/missing"}, None))["error"])
+        self.assertIn("error", json.loads(WebFetch.run({"url": "file:///etc/passwd"}, None)))
+
+    def test_download_is_capped(self):
+        """Test that a body larger than MAX_DOWNLOAD_BYTES is cut short and flagged."""
+        result = json.loads(WebFetch.run({"url": f"{self.base_url}/big.txt"}, None))
+        self.assertIn("note", result)
+        self.assertIsNotNone(result["next_cursor"])
+
+if __name__ == '__main__':
+    unittest.main()
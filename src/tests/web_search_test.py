@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from tools import web_search
+from tools.web_search import WebSearch
+
+class StubSerper(BaseHTTPRequestHandler):
+    """Answers like the Serper search endpoint, failing the first request for "flaky" with a 503."""
+    requests = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.lock:
+            self.requests.append(payload["q"])
+            first_try = self.requests.count(payload["q"]) == 1
+        if payload["q"] == "flaky" and first_try:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = json.dumps({
+            "organic": [{"title": f"{payload['q']} {i}", "link": f"https://example.com/{i}"} for i in range(payload["num"])]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestWebSearch(unittest.TestCase):
+
+    def setUp(self):
+        StubSerper.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubSerper)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.original_url = os.environ.get("SERPER_API_URL")
+        os.environ["SERPER_API_URL"] = f"http://127.0.0.1:{self.server.server_address[1]}/search"
+
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.original_cache_folder = web_search.search_cache.folder
+        web_search.search_cache.folder = self.cache_dir.name
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.original_url is None:
+            del os.environ["SERPER_API_URL"]
+        else:
+            os.environ["SERPER_API_URL"] = self.original_url
+        web_search.search_cache.folder = self.original_cache_folder
+        self.cache_dir.cleanup()
+
+    def test_single_query_is_cached(self):
+        """Test that a query returns the organic results and a repeat is served from the cache."""
+        result = json.loads(WebSearch.run({"query": "python", "num": 2}, None))
+        self.assertEqual([r["title"] for r in result["top_results"]], ["python 0", "python 1"])
+        self.assertEqual(result["knowledge_graph"], {})
+
+        self.assertEqual(json.loads(WebSearch.run({"query": "python", "num": 2}, None)), result)
+        self.assertEqual(StubSerper.requests, ["python"])
+
+        # A different num is a different cache entry
+        WebSearch.run({"query": "python", "num": 3}, None)
+        self.assertEqual(StubSerper.requests, ["python", "python"])
+
+    def test_batched_queries_and_retry(self):
+        """Test that several queries run together, and a 503 is retried."""
+        result = json.loads(WebSearch.run({"queries": ["a", "b", "flaky"], "num": 1}, None))
+        self.assertEqual([r["query"] for r in result["results"]], ["a", "b", "flaky"])
+        self.assertEqual([r["top_results"][0]["title"] for r in result["results"]], ["a 0", "b 0", "flaky 0"])
+        self.assertEqual(StubSerper.requests.count("flaky"), 2)
+
+    def test_missing_query(self):
+        """Test that a call without query or queries is rejected."""
+        self.assertIn("error", json.loads(WebSearch.run({"num": 1}, None)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,6 @@
 import os
-import importlib
+from core.tool_manifest import register_package
 
-# Automatically import all modules in the current directory
-for file in os.listdir(os.path.dirname(__file__)):
-    if file.endswith('.py') and file != '__init__.py':
-        module_name = file[:-3]
-        importlib.import_module('.' + module_name, package='tools')
+# Register all tools in the current directory from manifest.json. A tool's module is only imported once an
+# agent uses it; modules changed since the manifest was written are imported now and the manifest updated.
+register_package(os.path.dirname(__file__), 'tools')
@@ -1,11 +1,17 @@
 import json
+import threading
 import time
+from typing import Optional
 from core.base_tool import BaseTool
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
 
 @register_fn
 class AskHuman(BaseTool):
+    # Several agents may run at once, only one of them can prompt the human at a time.
+    _input_lock = threading.Lock()
+    ANSWER_TIMEOUT = 600  # Seconds to wait for the human before the call is abandoned
 
     @classmethod
     def get_name(cls) -> str:
@@ -28,6 +34,15 @@ class AskHuman(BaseTool):
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        # One question to the human at a time
+        return (), ("human",)
+
+    @classmethod
+    def get_timeout(cls, args: dict, agent_self: ToolAgent) -> Optional[float]:
+        return cls.ANSWER_TIMEOUT
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         validation_error = cls.validate_args(args, agent_self)
@@ -41,11 +56,12 @@ class AskHuman(BaseTool):
         start_time = time.time()
 
         # Loop to ensure non-empty input
-        while not user_input.strip():
-            user_input = input(f"{question}\nEnter your response: ").strip()
+        with AskHuman._input_lock:
+            while not user_input.strip():
+                user_input = input(f"{question}\nEnter your response: ").strip()
 
-            if not user_input:
-                print("Input cannot be empty, please try again.")
+                if not user_input:
+                    print("Input cannot be empty, please try again.")
 
         # Stop the timer
         end_time = time.time()
@@ -3,10 +3,13 @@ import logging
 from core.base_tool import BaseTool
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
-from asteval import Interpreter
+from core.tool_scheduler import NO_RESOURCES, ResourceKeys
+from core.asteval_pool import get_asteval_pool
 
 @register_fn
 class AstEval(BaseTool):
+    MAX_TIMEOUT = 30
+
     @classmethod
     def get_name(cls) -> str:
         return "asteval"
@@ -15,19 +18,35 @@ class AstEval(BaseTool):
     def get_definition(cls, agent_self: dict) -> dict:
         return {
             "name": cls.get_name(),
-            "description": "Evaluate an expression using Python asteval.",
+            "description": (f"Evaluate an expression using Python asteval, in a sandboxed worker with a time limit of "
+                            f"{cls.MAX_TIMEOUT}s at most. Several statements may be given; the value of the last one is returned, "
+                            "along with anything printed."),
             "parameters": {
                 "type": "object",
                 "properties": {
                     "expression": {
                         "type": "string",
                         "description": "Expression to evaluate."
+                    },
+                    "use_numpy": {
+                        "type": "boolean",
+                        "description": "Optional. Make NumPy functions available for vectorized math."
+                    },
+                    "timeout": {
+                        "type": "number",
+                        "exclusiveMinimum": 0,
+                        "maximum": cls.MAX_TIMEOUT,
+                        "description": "Optional. Seconds before the evaluation is stopped."
                     }
                 },
                 "required": ["expression"]
             }
         }
     
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return NO_RESOURCES
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         validation_error = cls.validate_args(args, agent_self)
@@ -36,15 +55,13 @@ class AstEval(BaseTool):
         
         expression = args['expression']
 
-        # Use asteval for safe evaluation
-        safe_eval = Interpreter()
+        # Evaluate in a warm, resource-limited worker process
         try:
-            result = safe_eval(expression)
+            response = get_asteval_pool().evaluate(expression, use_numpy=args.get("use_numpy", False), timeout=args.get("timeout"))
         except Exception as e:
             return json.dumps({"error": str(e)})
 
-        if result is None:
+        if "error" not in response and response.get("result") is None and "output" not in response:
             return json.dumps({"error": "Invalid expression"})
 
-        return json.dumps({"result": result})
-
+        return json.dumps(response)
@@ -1,16 +1,31 @@
+import atexit
 import json
+import os
+import signal
 import subprocess
+import threading
 import time
+from typing import Dict, Optional
 from core.base_tool import BaseTool
+from core.output_capture import BoundedCapture, pump
+from core.shell_session import ShellSession
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
 
 @register_fn
 class RunBashCommand(BaseTool):
     MAX_OUTPUT_LENGTH = 5000
+    HEAD_OUTPUT_LENGTH = 1000  # Part of MAX_OUTPUT_LENGTH kept from the start of long output, the rest comes from the end
+    MAX_STDERR_LENGTH = 2000
+    HEAD_STDERR_LENGTH = 500
     MAX_INPUT_LENGTH = 2000
+    KILL_GRACE_PERIOD = 2  # Seconds between SIGTERM and SIGKILL when a command times out
     DEFAULT_COMMAND_TIMEOUT = 60  # Default timeout for command execution in seconds
 
+    # Long-lived shells for persistent calls, one per agent
+    _sessions: Dict[str, ShellSession] = {}
+    _sessions_lock = threading.Lock()
+
     @classmethod
     def get_name(cls) -> str:
         return "bash"
@@ -19,8 +34,9 @@ class RunBashCommand(BaseTool):
     def get_definition(cls, agent_self: dict) -> dict:
         return {
             "name": cls.get_name(),
-            "description": (f"Executes a specified bash command within a timeout and returns its output, "
-                            f"limiting the output to the last {RunBashCommand.MAX_OUTPUT_LENGTH} characters. IMPORTANT: "
+            "description": (f"Executes a specified bash command within a timeout and returns its exit status, output and stderr. "
+                            f"Long output is limited to {RunBashCommand.MAX_OUTPUT_LENGTH} characters: the first "
+                            f"{RunBashCommand.HEAD_OUTPUT_LENGTH} and the rest from the end. IMPORTANT: "
                             "Pay very close attention to escaping quotes and other special characters like newlines when needed "
                             "when writing commands that write to files."),
             "parameters": {
@@ -35,12 +51,29 @@ class RunBashCommand(BaseTool):
                     "timeout": {
                         "type": "number",
                         "description": "Optional custom timeout in seconds for the command execution."
+                    },
+                    "persistent": {
+                        "type": "boolean",
+                        "description": ("Run the command in your long-lived shell session, which keeps the working directory, "
+                                        "exported variables and activated virtualenvs between calls. A timeout resets the session.")
+                    },
+                    "reset_session": {
+                        "type": "boolean",
+                        "description": "Start a fresh persistent shell session before running the command."
                     }
                 },
                 "required": ["command"]
             }
         }
 
+    @classmethod
+    def get_timeout(cls, args: dict, agent_self: ToolAgent) -> Optional[float]:
+        # Leave the command's own timeout room to fire first, so its output is still returned
+        try:
+            return float(args.get("timeout", cls.DEFAULT_COMMAND_TIMEOUT)) + cls.KILL_GRACE_PERIOD + 10
+        except (TypeError, ValueError):
+            return None
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         validation_error = cls.validate_args(args, agent_self)
@@ -54,30 +87,128 @@ class RunBashCommand(BaseTool):
             return json.dumps({"error": f"Command exceeds the maximum length of {RunBashCommand.MAX_INPUT_LENGTH} characters."})
 
         try:
-            start_time = time.time()
+            if args.get("persistent") or args.get("reset_session"):
+                return json.dumps(cls.execute_persistent(command, custom_timeout, agent_self, args.get("reset_session", False)))
+            return json.dumps(cls.execute(command, custom_timeout))
+        except Exception as e:
+            return json.dumps({"error": f"Unexpected error: {str(e)}"})
 
-            # Using subprocess.check_output
-            output = subprocess.check_output(command, shell=True, text=True, timeout=custom_timeout)
-            was_truncated = len(output) > RunBashCommand.MAX_OUTPUT_LENGTH
-            output = output[-RunBashCommand.MAX_OUTPUT_LENGTH:]  # Truncate the output if it's too long
+    @classmethod
+    def execute(cls, command: str, timeout: float) -> dict:
+        """
+        Run a command in its own process group, streaming stdout and stderr into bounded head/tail buffers so
+        memory stays flat however much the command prints. On timeout the whole process group is killed.
+        """
+        start_time = time.time()
+        stdout, stderr = cls.make_captures()
 
-            end_time = time.time()
-            duration = end_time - start_time
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+        readers = [pump(process.stdout.fileno(), stdout), pump(process.stderr.fileno(), stderr)]
 
-            result = {
-                "status": 0,
-                "output": output,
-                "duration": f"{duration:.2f}s",
-            }
-            # if was_truncated, add the truncated key
-            if was_truncated:
-                result["truncated"] = f"NOTE: output was truncated to the last {RunBashCommand.MAX_OUTPUT_LENGTH} characters."
-            return json.dumps(result)
+        timed_out = False
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            cls.kill_process_group(process)
+
+        # Background children may keep the pipes open after the shell exits; stop waiting at the deadline.
+        deadline = start_time + timeout + (cls.KILL_GRACE_PERIOD if timed_out else 0)
+        for reader in readers:
+            reader.join(max(deadline - time.time(), 0))
+        still_open = any(reader.is_alive() for reader in readers)
+        if not still_open:
+            process.stdout.close()
+            process.stderr.close()
+
+        result = cls.build_result(process.returncode, stdout, stderr, start_time)
+        if still_open:
+            result["note"] = "Background processes still hold the output open; capture stopped at the timeout."
+        if timed_out:
+            result["error"] = f"Command timed out in {timeout}s. Its process group was killed."
+        return result
+
+    @classmethod
+    def execute_persistent(cls, command: str, timeout: float, agent_self: ToolAgent, reset: bool = False) -> dict:
+        """Run a command in the calling agent's shell session, starting or restarting it as needed."""
+        session = cls.get_session(agent_self)
+        if reset:
+            session.close()
+
+        start_time = time.time()
+        stdout, stderr = cls.make_captures()
+        status, timed_out, lost = session.run(command, timeout, stdout, stderr)
 
+        result = cls.build_result(status, stdout, stderr, start_time)
+        if timed_out:
+            result["error"] = f"Command timed out in {timeout}s. The shell session was killed and will restart on the next call."
+        elif lost:
+            result["note"] = "The shell session exited or was restarted, so the working directory and variables were reset."
+        return result
+
+    @classmethod
+    def get_session(cls, agent_self: ToolAgent) -> ShellSession:
+        key = getattr(agent_self, "agent_id", None) or "default"
+        with cls._sessions_lock:
+            if key not in cls._sessions:
+                cls._sessions[key] = ShellSession()
+            return cls._sessions[key]
+
+    @classmethod
+    def close_sessions(cls):
+        with cls._sessions_lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions.clear()
+
+    @classmethod
+    def make_captures(cls):
+        return (
+            BoundedCapture(cls.HEAD_OUTPUT_LENGTH, cls.MAX_OUTPUT_LENGTH - cls.HEAD_OUTPUT_LENGTH),
+            BoundedCapture(cls.HEAD_STDERR_LENGTH, cls.MAX_STDERR_LENGTH - cls.HEAD_STDERR_LENGTH),
+        )
+
+    @classmethod
+    def build_result(cls, status, stdout: BoundedCapture, stderr: BoundedCapture, start_time: float) -> dict:
+        result = {
+            "status": status,
+            "output": stdout.render(),
+            "duration": f"{time.time() - start_time:.2f}s",
+            "output_bytes": stdout.total_bytes,
+        }
+        if stderr.total_bytes:
+            result["stderr"] = stderr.render()
+            result["stderr_bytes"] = stderr.total_bytes
+        if stdout.truncated:
+            result["truncated"] = (f"NOTE: output was {stdout.total_bytes} bytes, showing the first {cls.HEAD_OUTPUT_LENGTH} "
+                                   f"and the last {cls.MAX_OUTPUT_LENGTH - cls.HEAD_OUTPUT_LENGTH} characters.")
+        if status is not None and status != 0:
+            result["error"] = f"Command exited with status {status}."
+        return result
+
+    @classmethod
+    def kill_process_group(cls, process: subprocess.Popen):
+        """SIGTERM the command and everything it started, then SIGKILL whatever is left after a grace period."""
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        try:
+            process.wait(timeout=cls.KILL_GRACE_PERIOD)
         except subprocess.TimeoutExpired:
-            return json.dumps({"error": f"Command timed out in {custom_timeout}s."})
-        except subprocess.CalledProcessError as e:
-            return json.dumps({"error": f"{e}"})
-        except Exception as e:
-            return json.dumps({"error": f"Unexpected error: {str(e)}"})
+            pass
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
+
 
+atexit.register(RunBashCommand.close_sessions)
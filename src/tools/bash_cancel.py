@@ -0,0 +1,45 @@
+import json
+from core.background_jobs import job_manager
+from core.base_tool import BaseTool
+from core.tool_agent import ToolAgent
+from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
+
+@register_fn
+class BashCancel(BaseTool):
+    @classmethod
+    def get_name(cls) -> str:
+        return "bash_cancel"
+
+    @classmethod
+    def get_definition(cls, agent_self: dict) -> dict:
+        return {
+            "name": cls.get_name(),
+            "description": "Stops a background job started with bash_start, along with every process it started.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "The job to cancel."
+                    }
+                },
+                "required": ["job_id"]
+            }
+        }
+
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return (), (f"bash_job:{args.get('job_id')}",)
+
+    @classmethod
+    def run(cls, args: dict, agent_self: ToolAgent) -> str:
+        validation_error = cls.validate_args(args, agent_self)
+        if validation_error:
+            return json.dumps({"error": f"Invalid arguments: {validation_error}"})
+
+        try:
+            job = job_manager.cancel(args["job_id"], getattr(agent_self, "agent_id", None) or "default")
+        except ValueError as e:
+            return json.dumps({"error": str(e)})
+        return json.dumps(job.summary())
@@ -0,0 +1,80 @@
+import json
+from core.background_jobs import job_manager, read_spool
+from core.base_tool import BaseTool
+from core.tool_agent import ToolAgent
+from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
+
+@register_fn
+class BashPoll(BaseTool):
+    DEFAULT_MAX_BYTES = 4000
+    MAX_BYTES_LIMIT = 20000
+
+    @classmethod
+    def get_name(cls) -> str:
+        return "bash_poll"
+
+    @classmethod
+    def get_definition(cls, agent_self: dict) -> dict:
+        return {
+            "name": cls.get_name(),
+            "description": ("Returns the state of a background job started with bash_start and its output from the given byte "
+                            "cursors. Pass back the returned stdout_cursor and stderr_cursor to read only new output. "
+                            "Without a job_id, lists your jobs."),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Optional. The job to poll."
+                    },
+                    "stdout_cursor": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "Optional. Byte offset to read stdout from, 0 by default."
+                    },
+                    "stderr_cursor": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "Optional. Byte offset to read stderr from, 0 by default."
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "minimum": 16,
+                        "maximum": cls.MAX_BYTES_LIMIT,
+                        "description": f"Optional. Most bytes to return per stream, {cls.DEFAULT_MAX_BYTES} by default."
+                    }
+                },
+                "required": []
+            }
+        }
+
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return (f"bash_job:{args.get('job_id') or '*'}",), ()
+
+    @classmethod
+    def run(cls, args: dict, agent_self: ToolAgent) -> str:
+        validation_error = cls.validate_args(args, agent_self)
+        if validation_error:
+            return json.dumps({"error": f"Invalid arguments: {validation_error}"})
+
+        agent_id = getattr(agent_self, "agent_id", None) or "default"
+        if not args.get("job_id"):
+            return json.dumps({"jobs": [job.summary() for job in job_manager.list(agent_id)]})
+
+        try:
+            job = job_manager.get(args["job_id"], agent_id)
+        except ValueError as e:
+            return json.dumps({"error": str(e)})
+
+        # Take the summary first, so output written after it is never reported as the final chunk of a finished job
+        result = job.summary()
+        max_bytes = args.get("max_bytes", cls.DEFAULT_MAX_BYTES)
+        for stream, path in (("stdout", job.stdout_path), ("stderr", job.stderr_path)):
+            cursor = args.get(f"{stream}_cursor", 0)
+            text, next_cursor = read_spool(path, cursor, max_bytes)
+            result[stream] = text
+            result[f"{stream}_cursor"] = next_cursor
+            result[f"more_{stream}"] = next_cursor < result[f"{stream}_bytes"]
+        return json.dumps(result)
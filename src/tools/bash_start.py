@@ -0,0 +1,80 @@
+import json
+import logging
+from core.background_jobs import Job, job_manager
+from core.base_tool import BaseTool
+from core.tool_agent import ToolAgent
+from core.tool_registry import register_fn
+
+logger = logging.getLogger(__name__)
+
+@register_fn
+class BashStart(BaseTool):
+    MAX_INPUT_LENGTH = 2000
+    DEFAULT_JOB_TIMEOUT = 3600  # Seconds before a background job is killed
+
+    @classmethod
+    def get_name(cls) -> str:
+        return "bash_start"
+
+    @classmethod
+    def get_definition(cls, agent_self: dict) -> dict:
+        return {
+            "name": cls.get_name(),
+            "description": ("Starts a long-running bash command (a build, a large download, a test suite) in the background and "
+                            "returns a job id immediately, so you can keep working. Read its output with bash_poll and stop it "
+                            "with bash_cancel."),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "command": {
+                        "type": "string",
+                        "description": f"The bash command to run, at most {cls.MAX_INPUT_LENGTH} characters."
+                    },
+                    "timeout": {
+                        "type": "number",
+                        "description": f"Optional. Seconds before the job is killed, {cls.DEFAULT_JOB_TIMEOUT} by default."
+                    },
+                    "notify_on_finish": {
+                        "type": "boolean",
+                        "description": "Optional. Post a note into your context when the job finishes."
+                    }
+                },
+                "required": ["command"]
+            }
+        }
+
+    @classmethod
+    def run(cls, args: dict, agent_self: ToolAgent) -> str:
+        validation_error = cls.validate_args(args, agent_self)
+        if validation_error:
+            return json.dumps({"error": f"Invalid arguments: {validation_error}"})
+
+        command = args["command"]
+        if len(command) > cls.MAX_INPUT_LENGTH:
+            return json.dumps({"error": f"Command exceeds the maximum length of {cls.MAX_INPUT_LENGTH} characters."})
+
+        on_finish = None
+        inbox = getattr(getattr(agent_self, "object_config", None), "inbox", None)
+        if args.get("notify_on_finish"):
+            if inbox is None:
+                return json.dumps({"error": "Completion notes are not available for this agent."})
+            on_finish = lambda job: inbox.post(cls.completion_note(job), name="bash_jobs")
+
+        try:
+            job = job_manager.start(
+                command,
+                getattr(agent_self, "agent_id", None) or "default",
+                timeout=float(args.get("timeout", cls.DEFAULT_JOB_TIMEOUT)),
+                on_finish=on_finish,
+            )
+        except Exception as e:
+            logger.error(f"Error starting background job: {e}")
+            return json.dumps({"error": str(e)})
+
+        return json.dumps(job.summary())
+
+    @staticmethod
+    def completion_note(job: Job) -> str:
+        summary = job.summary()
+        return (f"Background job {job.job_id} ({job.command}) {job.state} with exit code {job.exit_code} after {summary['runtime']}, "
+                f"{summary['stdout_bytes']} bytes of output and {summary['stderr_bytes']} bytes of stderr. Use bash_poll to read them.")
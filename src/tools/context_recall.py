@@ -0,0 +1,64 @@
+import json
+import logging
+import traceback
+from core.base_tool import BaseTool
+from core.tool_agent import ToolAgent
+from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
+
+logger = logging.getLogger(__name__)
+
+@register_fn
+class ContextRecall(BaseTool):
+    backends = ("context_archive",)
+
+    @classmethod
+    def get_name(cls) -> str:
+        return "context_recall"
+
+    @classmethod
+    def get_definition(cls, agent_self: ToolAgent) -> dict:
+        return {
+            "name": cls.get_name(),
+            "description": ("Search your own earlier conversation, including messages that no longer fit in your context, "
+                            "and return the most relevant fragments with when they were archived."),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "What to look for, e.g. 'the build error we saw in the payments service'."
+                    },
+                    "n_results": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": 20,
+                        "description": "Optional. The number of fragments to return, 5 by default."
+                    }
+                },
+                "required": ["query"]
+            }
+        }
+
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return ("context_archive",), ()
+
+    @classmethod
+    def run(cls, args: dict, agent_self: ToolAgent) -> str:
+        validation_error = cls.validate_args(args, agent_self)
+        if validation_error:
+            return json.dumps({"error": f"Invalid arguments: {validation_error}"})
+
+        archive = getattr(agent_self.object_config.agent_service, "archive", None)
+        if archive is None:
+            return json.dumps({"error": "No context archive is configured for this agent."})
+
+        try:
+            results = archive.search(agent_self.agent_id, args["query"], int(args.get("n_results", 5)))
+        except Exception as e:
+            traceback.print_exc()
+            logger.error(f"Error in recalling context: {e}")
+            return json.dumps({"error": str(e)})
+
+        return json.dumps({"result": results})
@@ -1,15 +1,22 @@
 import json
 import logging
+import re
 import traceback
 from core.base_tool import BaseTool
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
 
 # Configure logger for the CypherQuery class
 logger = logging.getLogger(__name__)
 
+# Clauses that change the graph; queries without them only read it
+WRITE_CLAUSES = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|LOAD\s+CSV|CALL)\b", re.IGNORECASE)
+
 @register_fn
 class CypherQuery(BaseTool):
+    backends = ("neo4j",)
+
     @classmethod
     def get_name(cls) -> str:
         return "cypher_query"
@@ -36,6 +43,12 @@ class CypherQuery(BaseTool):
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        if WRITE_CLAUSES.search(str(args.get("query", ""))):
+            return (), ("neo4j",)
+        return ("neo4j",), ()
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         try:
@@ -1,9 +1,17 @@
 import json
+import mmap
+import os
+import re
 from core.base_tool import BaseTool
+from core.line_index import char_boundary, count_newlines, decode_prefix, line_index_cache
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys, file_key
 
-MAX_FILE_SIZE = 5000  # Maximum characters to output
+MAX_FILE_SIZE = 5000  # Maximum bytes to output
+MAX_MATCHES = 50  # Maximum search results per call
+MAX_SEARCH_BYTES = 256 * 1024 * 1024  # Bytes scanned per search call before returning a cursor to continue from
+MAX_MATCH_LINE_LENGTH = 300
 
 @register_fn
 class FileRead(BaseTool):
@@ -11,12 +19,14 @@ class FileRead(BaseTool):
     @classmethod
     def get_name(cls) -> str:
         return "file_read"
-    
+
     @classmethod
     def get_definition(cls, agent_self: dict) -> dict:
         return {
             "name": cls.get_name(),
-            "description": "Reads contents from a file, providing details for continuation if the content is truncated due to size limits.",
+            "description": (f"Reads up to {MAX_FILE_SIZE} bytes from a file, from a byte cursor or a line number, providing details "
+                            "for continuation if the content is truncated due to size limits. With search, returns the numbers "
+                            "and text of lines matching a regular expression instead, so you can jump straight to them."),
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -25,14 +35,44 @@ class FileRead(BaseTool):
                         "description": "The filename of the file to read"
                     },
                     "cursor": {
-                        "type": "number",
-                        "description": "The cursor position to start reading from (optional)"
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "The byte position to start reading or searching from (optional)"
+                    },
+                    "start_line": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "description": "The 1-based line to start reading from (optional, instead of cursor)"
+                    },
+                    "line_count": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "description": "The number of lines to read from start_line (optional, output is still limited in size)"
+                    },
+                    "search": {
+                        "type": "string",
+                        "maxLength": 500,
+                        "description": "A regular expression to search for, line by line (optional)"
+                    },
+                    "ignore_case": {
+                        "type": "boolean",
+                        "description": "Match search case-insensitively (optional)"
+                    },
+                    "max_matches": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": MAX_MATCHES,
+                        "description": f"The maximum number of matching lines to return, {MAX_MATCHES} by default (optional)"
                     }
                 },
                 "required": ["filename"]
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return (file_key(str(args.get("filename", ""))),), ()
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         validation_error = cls.validate_args(args, agent_self)
@@ -40,33 +80,126 @@ class FileRead(BaseTool):
             return json.dumps({"error": f"Invalid arguments: {validation_error}"})
 
         filename = args["filename"]
-        cursor = args.get("cursor", 0)
 
         try:
-            with open(filename, 'r', encoding='utf-8') as file:
-                file.seek(0,2)  # Move to the end of the file
-                eof = file.tell()  # Get the position (char count)
-
-                file.seek(cursor)  # Set cursor to the required position
-                content = file.read(MAX_FILE_SIZE)
+            with open(filename, 'rb') as file:
+                stat = os.fstat(file.fileno())
+                if stat.st_size == 0:
+                    return json.dumps({
+                        "filename": filename,
+                        "content": "",
+                        "continuation": {"final_cursor": 0, "eof": 0, "truncated": False}
+                    })
 
-                final_cursor = file.tell()  # The new cursor position after reading
-                truncated = final_cursor < eof  # Check if we reached the end of file
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    index = line_index_cache.get(filename, stat)
+                    if "search" in args:
+                        result = cls.search(mm, index, args)
+                    elif "start_line" in args:
+                        result = cls.read_lines(mm, index, int(args["start_line"]), args.get("line_count"))
+                    else:
+                        result = cls.read_bytes(mm, int(args.get("cursor", 0)))
 
-                # Construct the continuation hints
-                continuation = {
-                    "final_cursor": final_cursor,  # Updating to final_cursor
-                    "eof": eof,
-                    "truncated": truncated
-                }
-
-                return json.dumps({
-                    "filename": filename,
-                    "content": content,
-                    "continuation": continuation
-                })
+            return json.dumps({"filename": filename, **result})
 
         except FileNotFoundError:
-            return json.dumps({"error": "File not found: {filename}"})
-        except IOError as e:
+            return json.dumps({"error": f"File not found: {filename}"})
+        except re.error as e:
+            return json.dumps({"error": f"Invalid search pattern: {str(e)}"})
+        except (IOError, ValueError) as e:
             return json.dumps({"error": f"Error reading file: {str(e)}"})
+
+    @classmethod
+    def read_bytes(cls, mm: mmap.mmap, cursor: int) -> dict:
+        start = char_boundary(mm, min(cursor, len(mm)))
+        content, used = decode_prefix(mm[start:start + MAX_FILE_SIZE])
+        final_cursor = start + used
+        return {
+            "content": content,
+            "continuation": {
+                "final_cursor": final_cursor,
+                "eof": len(mm),
+                "truncated": final_cursor < len(mm)
+            }
+        }
+
+    @classmethod
+    def read_lines(cls, mm: mmap.mmap, index, start_line: int, line_count: int = None) -> dict:
+        start = index.line_offset(mm, start_line - 1)
+        if start is None:
+            return {"error": f"Line {start_line} is past the end of the file, which has {index.count_lines(mm)} lines."}
+
+        end = min(start + MAX_FILE_SIZE, len(mm))
+        lines_read = 0
+        position = start
+        while position < end and (line_count is None or lines_read < line_count):
+            newline = mm.find(b"\n", position, end)
+            if newline < 0:
+                # A partial last line only counts if it is the end of the file
+                if end == len(mm):
+                    position = end
+                    lines_read += 1
+                break
+            position = newline + 1
+            lines_read += 1
+
+        if lines_read == 0:
+            # A single line longer than the output limit: return its start, continue by byte cursor
+            content, used = decode_prefix(mm[start:end])
+            position = start + used
+        else:
+            content = mm[start:position].decode("utf-8", errors="replace")
+
+        return {
+            "content": content,
+            "start_line": start_line,
+            "end_line": start_line + max(lines_read, 1) - 1,
+            "continuation": {
+                "final_cursor": position,
+                "next_line": start_line + lines_read if lines_read else None,
+                "eof": len(mm),
+                "truncated": position < len(mm)
+            }
+        }
+
+    @classmethod
+    def search(cls, mm: mmap.mmap, index, args: dict) -> dict:
+        pattern = re.compile(args["search"].encode("utf-8"), re.MULTILINE | (re.IGNORECASE if args.get("ignore_case") else 0))
+        max_matches = args.get("max_matches", MAX_MATCHES)
+
+        # Search from the start of the line containing the cursor, and at most MAX_SEARCH_BYTES per call
+        cursor = min(int(args.get("cursor", 0)), len(mm))
+        start = mm.rfind(b"\n", 0, cursor) + 1
+        limit = min(start + MAX_SEARCH_BYTES, len(mm))
+        if limit < len(mm):
+            limit = mm.rfind(b"\n", start, limit) + 1 or limit
+
+        line_number = count_newlines(mm, 0, start) + 1
+        counted_to = start
+        matches = []
+        next_cursor = limit
+        for match in pattern.finditer(mm, start, limit):
+            line_start = mm.rfind(b"\n", counted_to, match.start()) + 1 or counted_to
+            line_number += count_newlines(mm, counted_to, line_start)
+            counted_to = line_start
+            if matches and matches[-1]["line"] == line_number:
+                continue
+            if len(matches) >= max_matches:
+                next_cursor = line_start
+                break
+            line_end = mm.find(b"\n", match.start())
+            line_end = len(mm) if line_end < 0 else line_end
+            text = mm[line_start:min(line_end, line_start + MAX_MATCH_LINE_LENGTH)].decode("utf-8", errors="replace")
+            matches.append({"line": line_number, "cursor": line_start, "text": text})
+
+        result = {
+            "matches": matches,
+            "continuation": {
+                "final_cursor": next_cursor,
+                "eof": len(mm),
+                "truncated": next_cursor < len(mm)
+            }
+        }
+        if index.complete:
+            result["total_lines"] = index.total_lines
+        return result
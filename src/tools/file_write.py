@@ -1,12 +1,15 @@
 import json
-import os
-import stat
+from core.atomic_file import atomic_append, atomic_write_bytes, path_lock
 from core.base_tool import BaseTool
+from core.text_patch import PatchError, apply_unified_diff
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys, file_key
 
 @register_fn
 class FileWrite(BaseTool):
+    # Modes other than overwrite and append are edits, implemented by the static method of the same name
+    MODES = ("overwrite", "append", "insert_at_line", "replace", "patch")
 
     @classmethod
     def get_name(cls) -> str:
@@ -16,7 +19,9 @@ class FileWrite(BaseTool):
     def get_definition(cls, agent_self: dict) -> dict:
         return {
             "name": cls.get_name(),
-            "description": "Writes contents to a specified file, creating the directory path if it does not exist, with optional chmod permissions.",
+            "description": ("Writes contents to a specified file, creating the directory path if it does not exist. Besides overwriting, "
+                            "it can append, insert at a line, replace an exact snippet or apply a unified diff, so small edits to large "
+                            "files don't need the whole file. Writes are atomic. Returns the resulting size and sha256."),
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -26,13 +31,36 @@ class FileWrite(BaseTool):
                     },
                     "contents": {
                         "type": "string",
-                        "description": "The contents to write to the file"
+                        "description": ("The contents to write to the file. For insert_at_line the lines to insert, for replace the "
+                                        "replacement text, and for patch a unified diff of the file (@@ -start,count +start,count @@ hunks).")
+                    },
+                    "mode": {
+                        "type": "string",
+                        "enum": list(cls.MODES),
+                        "description": "Optional. How to write contents, overwrite by default."
+                    },
+                    "line": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "description": "For insert_at_line: the 1-based line to insert before. One past the last line appends."
+                    },
+                    "search": {
+                        "type": "string",
+                        "description": "For replace: the exact text to replace. It must occur exactly once unless replace_all is set."
+                    },
+                    "replace_all": {
+                        "type": "boolean",
+                        "description": "For replace: replace every occurrence of search."
                     }
                 },
                 "required": ["filepath", "contents"]
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return (), (file_key(str(args.get("filepath", ""))),)
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         validation_error = cls.validate_args(args, agent_self)
@@ -42,19 +70,65 @@ class FileWrite(BaseTool):
         try:
             filepath = args["filepath"]
             contents = args["contents"]
+            mode = args.get("mode", "overwrite")
 
-            dir_path = os.path.dirname(filepath)
-            if dir_path:
-                os.makedirs(dir_path, exist_ok=True)
-
-            with open(filepath, 'w', encoding='utf-8') as file:
-                file.write(contents)
+            with path_lock(filepath):
+                if mode == "overwrite":
+                    size, sha256 = atomic_write_bytes(filepath, contents.encode("utf-8"))
+                elif mode == "append":
+                    size, sha256 = atomic_append(filepath, contents.encode("utf-8"))
+                else:
+                    with open(filepath, "r", encoding="utf-8", newline="") as file:
+                        text = file.read()
+                    text = getattr(cls, mode)(text, args)
+                    size, sha256 = atomic_write_bytes(filepath, text.encode("utf-8"))
 
-            return json.dumps({"message": f"File written successfully at {filepath}"})
+            return json.dumps({
+                "message": f"File written successfully at {filepath}",
+                "mode": mode,
+                "size": size,
+                "sha256": sha256,
+            })
 
+        except FileNotFoundError:
+            return json.dumps({"error": f"File not found: {args['filepath']}. Use overwrite or append to create it."})
+        except PatchError as e:
+            return json.dumps({"error": f"Patch failed, file unchanged: {str(e)}"})
         except IOError as e:
             return json.dumps({"error": f"Error writing to file: {str(e)}"})
         except ValueError as e:
-            return json.dumps({"error": f"Invalid permissions value: {str(e)}"})
+            return json.dumps({"error": str(e)})
         except Exception as e:
             return json.dumps({"error": f"Unexpected error: {str(e)}"})
+
+    @staticmethod
+    def insert_at_line(text: str, args: dict) -> str:
+        if "line" not in args:
+            raise ValueError("insert_at_line needs a line number.")
+        lines = text.splitlines(keepends=True)
+        index = int(args["line"]) - 1
+        if index > len(lines):
+            raise ValueError(f"Line {args['line']} is past the end of the file, which has {len(lines)} lines.")
+        contents = args["contents"]
+        if index > 0 and not lines[index - 1].endswith("\n"):
+            lines[index - 1] += "\n"
+        if index < len(lines) and not contents.endswith("\n"):
+            contents += "\n"
+        lines.insert(index, contents)
+        return "".join(lines)
+
+    @staticmethod
+    def replace(text: str, args: dict) -> str:
+        search = args.get("search")
+        if not search:
+            raise ValueError("replace needs the text to search for.")
+        count = text.count(search)
+        if count == 0:
+            raise ValueError("The search text was not found, file unchanged.")
+        if count > 1 and not args.get("replace_all"):
+            raise ValueError(f"The search text occurs {count} times, file unchanged. Add context to make it unique or set replace_all.")
+        return text.replace(search, args["contents"])
+
+    @staticmethod
+    def patch(text: str, args: dict) -> str:
+        return apply_unified_diff(text, args["contents"])
@@ -4,6 +4,7 @@ import traceback
 from core.base_tool import BaseTool
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
 
 # Configure logger for the KanbanDelete class
 logger = logging.getLogger(__name__)
@@ -31,6 +32,10 @@ class KanbanDelete(BaseTool):
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return (), (f"kanban:{args.get('card_id')}",)
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         card_id = args.get('card_id')
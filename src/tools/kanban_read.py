@@ -4,6 +4,7 @@ import traceback
 from core.base_tool import BaseTool
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
 from core.file_based_kanban import Stage
 
 # Configure logger for the KanbanRead class
@@ -34,6 +35,10 @@ class KanbanRead(BaseTool):
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return ("kanban:*",), ()
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         try:
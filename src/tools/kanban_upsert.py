@@ -4,6 +4,7 @@ import traceback
 from core.base_tool import BaseTool
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
 from core.file_based_kanban import Stage
 
 # Configure logger for the KanbanUpsert class
@@ -46,6 +47,11 @@ class KanbanUpsert(BaseTool):
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        # New cards share a key, so they are created in the order they were asked for
+        return (), (f"kanban:{args.get('id') or 'new'}",)
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         validation_error = cls.validate_args(args, agent_self)
@@ -4,12 +4,15 @@ import traceback
 import chromadb
 from core.base_tool import BaseTool
 from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
 
 # Configure logger for the MemoryDelete class
 logger = logging.getLogger(__name__)
 
 @register_fn
 class MemoryDelete(BaseTool):
+    backends = ("chroma",)
+
     @classmethod
     def get_name(cls) -> str:
         return "memory_delete"
@@ -36,6 +39,12 @@ class MemoryDelete(BaseTool):
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: dict) -> ResourceKeys:
+        if args.get("ids") and "where" not in args:
+            return (), tuple(f"memory:{id}" for id in args["ids"])
+        return (), ("memory:*",)
+
     @classmethod
     def run(cls, args: dict, agent_self: dict) -> str:
         validation_error = cls.validate_args(args, agent_self)
@@ -0,0 +1,67 @@
+import json
+import logging
+import traceback
+from core.base_tool import BaseTool
+from core.ingestion import CHECKPOINT_FILE, DEFAULT_CHUNK_TOKENS, ingest
+from core.tool_agent import ToolAgent
+from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys, file_key
+
+logger = logging.getLogger(__name__)
+
+@register_fn
+class MemoryIngest(BaseTool):
+    backends = ("chroma",)
+
+    @classmethod
+    def get_name(cls) -> str:
+        return "memory_ingest"
+
+    @classmethod
+    def get_definition(cls, agent_self: ToolAgent) -> dict:
+        return {
+            "name": cls.get_name(),
+            "description": ("Store documents in ChromaDB memory, split into chunks, so they can be found with memory_query. "
+                            "Takes .txt, .md and .pdf files or directories of them (e.g. downloads). Files already "
+                            "ingested and unchanged are skipped, and an interrupted ingestion resumes where it stopped."),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "paths": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "minItems": 1,
+                        "description": "Files or directories to ingest."
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "minimum": 50,
+                        "maximum": 2000,
+                        "description": f"Optional. Tokens per chunk, {DEFAULT_CHUNK_TOKENS} by default."
+                    }
+                },
+                "required": ["paths"]
+            }
+        }
+
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        # A folder path covers the files in it
+        return tuple(file_key(str(path)) + "*" for path in args.get("paths", [])), ("memory:*",)
+
+    @classmethod
+    def run(cls, args: dict, agent_self: ToolAgent) -> str:
+        validation_error = cls.validate_args(args, agent_self)
+        if validation_error:
+            return json.dumps({"error": f"Invalid arguments: {validation_error}"})
+
+        collection = agent_self.object_config.chroma_db_collection
+        try:
+            stats = ingest(args["paths"], collection, CHECKPOINT_FILE, max_tokens=args.get("max_tokens", DEFAULT_CHUNK_TOKENS))
+        except Exception as e:
+            traceback.print_exc()
+            logger.error(f"Error in ingesting documents: {e}")
+            return json.dumps({"error": str(e)})
+
+        logger.info(f"Documents ingested: {stats}")
+        return json.dumps({"result": "Documents ingested", **stats})
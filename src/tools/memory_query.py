@@ -5,12 +5,15 @@ import chromadb
 from core.base_tool import BaseTool
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
 
 # Configure logger for the QueryMemories class
 logger = logging.getLogger(__name__)
 
 @register_fn
 class MemoryQuery(BaseTool):
+    backends = ("chroma",)
+
     @classmethod
     def get_name(cls) -> str:
         return "memory_query"
@@ -44,6 +47,10 @@ class MemoryQuery(BaseTool):
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return ("memory:*",), ()
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         validation_error = cls.validate_args(args, agent_self)
@@ -5,12 +5,15 @@ from core.base_tool import BaseTool
 from core.idgen import generate_id
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
+from core.tool_scheduler import ResourceKeys
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 @register_fn
 class MemoryUpsert(BaseTool):
+    backends = ("chroma",)
+
     @classmethod
     def get_name(cls) -> str:
         return "memory_upsert"
@@ -44,6 +47,10 @@ class MemoryUpsert(BaseTool):
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return (), (f"memory:{args.get('id') or 'new'}",)
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         if "id" not in args:
@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import re
+import time
+from bs4 import BeautifulSoup
+from core.base_tool import BaseTool
+from core.cost_helper import get_encoding
+from core.disk_cache import DiskTTLCache
+from core.http_session import DEFAULT_TIMEOUT, get_http_session
+from core.tool_agent import ToolAgent
+from core.tool_registry import register_fn
+from core.tool_scheduler import NO_RESOURCES, ResourceKeys
+
+logger = logging.getLogger(__name__)
+
+MAX_DOWNLOAD_BYTES = 2 * 1024 * 1024  # Stop reading a response after this many bytes
+DEFAULT_PAGE_TOKENS = 1500
+MAX_PAGE_TOKENS = 4000
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+TEXT_TYPES = ("text/", "application/json", "application/xml", "application/javascript", "application/x-yaml")
+# Elements that hold navigation, code or decoration rather than readable text
+NOISE_TAGS = ["script", "style", "noscript", "svg", "template", "iframe", "form", "nav", "header", "footer", "aside"]
+
+# Extracted page text, revalidated with the ETag once it is older than WEB_FETCH_CACHE_TTL seconds (an hour by default)
+page_cache = DiskTTLCache("memory/cache/web_fetch", ttl=float(os.getenv("WEB_FETCH_CACHE_TTL", "3600")))
+
+
+def extract_text(html: bytes, charset: str = None) -> dict:
+    """Readable text and title of an HTML page, preferring its <main> or <article> when it has one."""
+    soup = BeautifulSoup(html, "html.parser", from_encoding=charset)
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    for element in soup(NOISE_TAGS):
+        element.decompose()
+
+    root = soup.find("main") or soup.find("article") or soup.body or soup
+    text = root.get_text("\n")
+    if len(text.strip()) < 200 and root is not soup:
+        # Too little content in the main element, fall back to the whole page
+        text = (soup.body or soup).get_text("\n")
+    return {"title": title, "text": clean_whitespace(text)}
+
+
+def clean_whitespace(text: str) -> str:
+    lines = (re.sub(r"[ \t\u00a0]+", " ", line).strip() for line in text.splitlines())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+class FetchError(Exception):
+    pass
+
+
+@register_fn
+class WebFetch(BaseTool):
+
+    @classmethod
+    def get_name(cls) -> str:
+        return "web_fetch"
+
+    @classmethod
+    def get_definition(cls, agent_self: dict) -> dict:
+        return {
+            "name": cls.get_name(),
+            "description": ("Fetch a web page and return its readable text, without markup, a page of tokens at a time. "
+                            "Pass back next_cursor to continue reading. Only text content types are supported; download "
+                            "other files with bash."),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "url": {
+                        "type": "string",
+                        "description": "The http or https URL to fetch"
+                    },
+                    "cursor": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "Optional. The token position to continue reading from, 0 by default."
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "minimum": 100,
+                        "maximum": MAX_PAGE_TOKENS,
+                        "description": f"Optional. The number of tokens to return, {DEFAULT_PAGE_TOKENS} by default."
+                    }
+                },
+                "required": ["url"]
+            }
+        }
+
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return NO_RESOURCES
+
+    @classmethod
+    def run(cls, args: dict, agent_self: ToolAgent) -> str:
+        validation_error = cls.validate_args(args, agent_self)
+        if validation_error:
+            return json.dumps({"error": f"Invalid arguments: {validation_error}"})
+
+        url = args["url"]
+        if not re.match(r"^https?://", url, re.IGNORECASE):
+            return json.dumps({"error": "Only http and https URLs are supported."})
+
+        try:
+            page, cached = cls.fetch(url)
+        except FetchError as e:
+            return json.dumps({"error": str(e)})
+        except Exception as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return json.dumps({"error": f"Error fetching {url}: {e}"})
+
+        encoding = get_encoding()
+        tokens = encoding.encode(page["text"], disallowed_special=())
+        cursor = int(args.get("cursor", 0))
+        end = min(cursor + int(args.get("max_tokens", DEFAULT_PAGE_TOKENS)), len(tokens))
+
+        result = {
+            "url": page["url"],
+            "title": page["title"],
+            "content": encoding.decode(tokens[cursor:end]),
+            "cursor": cursor,
+            "next_cursor": end if end < len(tokens) else None,
+            "total_tokens": len(tokens),
+            "cached": cached,
+        }
+        if page.get("truncated"):
+            result["note"] = f"The page is larger than {MAX_DOWNLOAD_BYTES} bytes, only its beginning was read."
+        return json.dumps(result)
+
+    @classmethod
+    def fetch(cls, url: str):
+        """Return (page, from_cache). Expired pages with an ETag are revalidated with If-None-Match instead of downloaded again."""
+        entry = page_cache.get_entry(url)
+        if entry is not None and entry["expires"] >= time.time():
+            return entry["value"], True
+
+        headers = {"Accept": "text/html,application/xhtml+xml,text/plain;q=0.9,*/*;q=0.5"}
+        if entry is not None and entry["value"].get("etag"):
+            headers["If-None-Match"] = entry["value"]["etag"]
+
+        with get_http_session().get(url, headers=headers, stream=True, timeout=DEFAULT_TIMEOUT) as response:
+            if response.status_code == 304 and entry is not None:
+                page_cache.set(url, entry["value"])
+                return entry["value"], True
+            if response.status_code >= 400:
+                raise FetchError(f"HTTP {response.status_code} fetching {url}")
+
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            is_html = content_type in HTML_TYPES
+            if content_type and not is_html and not content_type.startswith(TEXT_TYPES):
+                raise FetchError(f"Unsupported content type {content_type}. Download the file with bash instead.")
+
+            body, truncated = cls.read_capped(response)
+            charset = response.encoding if "charset" in response.headers.get("Content-Type", "").lower() else None
+            if is_html or (not content_type and b"<html" in body[:1024].lower()):
+                page = extract_text(body, charset)
+            else:
+                page = {"title": "", "text": clean_whitespace(body.decode(charset or "utf-8", errors="replace"))}
+
+            page.update({"url": response.url, "etag": response.headers.get("ETag"), "truncated": truncated})
+
+        page_cache.set(url, page)
+        return page, False
+
+    @staticmethod
+    def read_capped(response):
+        """Stream the body, stopping at MAX_DOWNLOAD_BYTES. Returns the bytes read and whether the body was cut short."""
+        chunks, size = [], 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= MAX_DOWNLOAD_BYTES:
+                return b"".join(chunks)[:MAX_DOWNLOAD_BYTES], True
+        return b"".join(chunks), False
@@ -1,10 +1,25 @@
 import json
+import logging
 import os
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from core.base_tool import BaseTool
+from core.disk_cache import DiskTTLCache
+from core.http_session import DEFAULT_TIMEOUT, get_http_session
 from core.tool_agent import ToolAgent
 from core.tool_registry import register_fn
+from core.tool_scheduler import NO_RESOURCES, ResourceKeys
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables once, when the tool is imported
+load_dotenv()
+
+DEFAULT_SERPER_API_URL = "https://google.serper.dev/search"
+MAX_QUERIES = 10
+
+# Search results for the same (query, num) are reused for a day unless WEB_SEARCH_CACHE_TTL says otherwise
+search_cache = DiskTTLCache("memory/cache/web_search", ttl=float(os.getenv("WEB_SEARCH_CACHE_TTL", "86400")))
 
 @register_fn
 class WebSearch(BaseTool):
@@ -12,12 +27,12 @@ class WebSearch(BaseTool):
     @classmethod
     def get_name(cls) -> str:
         return "web_search"
-    
+
     @classmethod
     def get_definition(cls, agent_self: dict) -> dict:
         return {
             "name": cls.get_name(),
-            "description": "Search the web using the Serper API",
+            "description": "Search the web using the Serper API. Pass several queries at once to run them concurrently.",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -25,52 +40,79 @@ class WebSearch(BaseTool):
                         "type": "string",
                         "description": "The search query"
                     },
+                    "queries": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "minItems": 1,
+                        "maxItems": MAX_QUERIES,
+                        "description": f"Several search queries to run together, instead of query (up to {MAX_QUERIES})"
+                    },
                     "num": {
                         "type": "number",
-                        "description": "Number of search results to return"
+                        "description": "Number of search results to return per query"
                     }
                 },
-                "required": ["query"]
+                "required": []
             }
         }
 
+    @classmethod
+    def get_resource_keys(cls, args: dict, agent_self: ToolAgent) -> ResourceKeys:
+        return NO_RESOURCES
+
     @classmethod
     def run(cls, args: dict, agent_self: ToolAgent) -> str:
         validation_error = cls.validate_args(args, agent_self)
         if validation_error:
             return json.dumps({"error": f"Invalid arguments: {validation_error}"})
 
-        # Load environment variables
-        load_dotenv()
+        num = int(args.get("num", 5))
+        if "queries" in args:
+            queries = list(dict.fromkeys(args["queries"]))
+            with ThreadPoolExecutor(max_workers=min(len(queries), MAX_QUERIES)) as executor:
+                results = list(executor.map(lambda query: cls.search(query, num), queries))
+            return json.dumps({"results": [{"query": query, **result} for query, result in zip(queries, results)]})
+
+        if "query" not in args:
+            return json.dumps({"error": "Invalid arguments: either query or queries is required"})
+        return json.dumps(cls.search(args["query"], num))
 
-        # Retrieve the Serper API key from environment variables
-        SERPER_API = os.getenv("SERPER_API")
+    @classmethod
+    def search(cls, query: str, num: int) -> dict:
+        """Run one query, from the cache when possible. Failures are returned as an error entry."""
+        cached = search_cache.get([query, num])
+        if cached is not None:
+            return cached
 
         # Prepare API request
-        url = "https://google.serper.dev/search"
-        payload = json.dumps({
-            "q": args["query"],
+        payload = {
+            "q": query,
             "gl": "us",
             "hl": "en",
-            "num": args.get("num", 5),  # Default to 4 if num is not provided
+            "num": num,
             "page": 1,
             "type": "search",
             "engine": "google"
-        })
+        }
         headers = {
-          'X-API-KEY': SERPER_API,
+          'X-API-KEY': os.getenv("SERPER_API"),
           'Content-Type': 'application/json'
         }
 
-        # Make API call
-        response = requests.request("POST", url, headers=headers, data=payload)
-        response_data = json.loads(response.text)
+        try:
+            response = get_http_session().post(
+                os.getenv("SERPER_API_URL", DEFAULT_SERPER_API_URL), headers=headers, json=payload, timeout=DEFAULT_TIMEOUT
+            )
+            response.raise_for_status()
+            response_data = response.json()
+        except Exception as e:
+            logger.error(f"Web search failed for {query!r}: {e}")
+            return {"error": f"Search failed: {e}"}
 
         # Extract knowledgeGraph and top organic results
-        knowledge_graph = response_data.get('knowledgeGraph', {})
-        top_results = response_data.get('organic', [])
-
-        return json.dumps({
-            "knowledge_graph": knowledge_graph,
-            "top_results": top_results
-        })
+        result = {
+            "knowledge_graph": response_data.get('knowledgeGraph', {}),
+            "top_results": response_data.get('organic', [])
+        }
+        search_cache.set([query, num], result)
+        return result